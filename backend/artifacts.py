@@ -0,0 +1,316 @@
+"""
+Shared model artifacts - trained forests and feature frames published as
+read-only memory-mapped files, so every worker on a host shares one copy.
+
+Layout under ARTIFACT_DIR:
+
+    current.json                 {"version": ..., "source_mtime": ...}
+    <version>/dataset.joblib     the load_data() DataFrame
+    <version>/<league>/<schema>/features.joblib   (may exist before the model does)
+    <version>/<league>/<schema>/fast.joblib       fast-tier model (see tiers.py)
+    <version>/<league>/<schema>/forest-<params>/meta.json
+    <version>/<league>/<schema>/forest-<params>/*.npy   flattened forest (see CompiledForest)
+
+<version> is the dataset version (predictor.data_version()). <schema> is
+a hash of the model's feature list and FORMAT_VERSION, so artifacts built
+by code with other features (or an older layout) are never loaded for
+the same CSVs; <params> is a hash of the forest's hyperparameters, so
+newly tuned ones are trained rather than mapped from an older forest.
+meta.json records all of these and is checked on load. Numeric
+DataFrame columns are dumped uncompressed by joblib and loaded with
+mmap_mode="r", so their pages are shared; text columns are still loaded
+per worker. sklearn copies tree nodes into private buffers when it
+unpickles a forest, so forests are stored as flat NumPy arrays instead and
+evaluated directly from the mapped files by CompiledForest.
+
+Files are written under a temporary name and renamed into place, so a
+reader never sees half an artifact.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import joblib
+import numpy as np
+
+ARTIFACT_DIR = os.getenv(
+    "MODEL_ARTIFACT_DIR",
+    os.path.join(os.path.dirname(__file__), "cache", "models"),
+)
+
+# Set MODEL_ARTIFACTS=0 to keep everything in process memory (the old behaviour)
+ENABLED = os.getenv("MODEL_ARTIFACTS", "1") != "0"
+
+# Dataset versions kept on disk (older ones are deleted when a new one is published)
+KEEP_VERSIONS = 2
+
+# Bump when what is stored for a league changes without the feature list
+# changing (engineer_features semantics, file layout...)
+FORMAT_VERSION = 2
+
+_FOREST_ARRAYS = ("children_left", "children_right", "feature", "threshold", "proba", "roots")
+
+
+class CompiledForest:
+    """
+    A fitted RandomForestClassifier flattened into plain arrays: the nodes
+    of every tree concatenated, child indices offset to match, and each
+    node's normalized class distribution. predict/predict_proba give the
+    same results as the forest they were built from.
+    """
+
+    def __init__(self, arrays, classes, feature_names, max_depth):
+        self.children_left = arrays["children_left"]
+        self.children_right = arrays["children_right"]
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.proba = arrays["proba"]
+        self.roots = arrays["roots"]
+        self.classes_ = np.asarray(classes)
+        self.feature_names = list(feature_names) if feature_names is not None else None
+        self.max_depth = max_depth
+
+    @classmethod
+    def from_forest(cls, forest):
+        left, right, feature, threshold, proba, roots = [], [], [], [], [], []
+        offset = 0
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            roots.append(offset)
+            # Leaves keep -1; internal nodes point at their children's global index
+            left.append(np.where(tree.children_left == -1, -1, tree.children_left + offset))
+            right.append(np.where(tree.children_right == -1, -1, tree.children_right + offset))
+            feature.append(tree.feature)
+            threshold.append(tree.threshold)
+            # Same normalization DecisionTreeClassifier.predict_proba applies
+            value = tree.value[:, 0, :]
+            total = value.sum(axis=1, keepdims=True)
+            total[total == 0] = 1
+            proba.append(value / total)
+            offset += tree.node_count
+
+        arrays = {
+            "children_left": np.concatenate(left).astype(np.int32),
+            "children_right": np.concatenate(right).astype(np.int32),
+            "feature": np.concatenate(feature).astype(np.int32),
+            "threshold": np.concatenate(threshold),
+            "proba": np.concatenate(proba),
+            "roots": np.asarray(roots, dtype=np.int32),
+        }
+        max_depth = max(estimator.tree_.max_depth for estimator in forest.estimators_)
+        return cls(arrays, forest.classes_, getattr(forest, "feature_names_in_", None), max_depth)
+
+    def _as_array(self, X):
+        if self.feature_names is not None and hasattr(X, "columns"):
+            X = X[self.feature_names]
+        # Trees compare float32 feature values, as sklearn does
+        return np.asarray(X, dtype=np.float32)
+
+    def predict_proba(self, X):
+        X = self._as_array(X)
+        rows = np.arange(len(X))[:, None]
+        nodes = np.broadcast_to(self.roots, (len(X), len(self.roots))).copy()
+
+        # Walk every tree for every row at once, one level per step
+        for _ in range(self.max_depth):
+            left = self.children_left[nodes]
+            internal = left != -1
+            if not internal.any():
+                break
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(internal, np.where(go_left, left, self.children_right[nodes]), nodes)
+
+        return self.proba[nodes].mean(axis=1)
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        for name in _FOREST_ARRAYS:
+            _atomic(os.path.join(path, f"{name}.npy"), lambda tmp, name=name: np.save(tmp, getattr(self, name)))
+
+    @classmethod
+    def load(cls, path, meta):
+        arrays = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+            for name in _FOREST_ARRAYS
+        }
+        return cls(arrays, meta["classes"], meta["feature_names"], meta["max_depth"])
+
+
+def _atomic(path, write):
+    """Call write(tmp_path), then rename the result to path"""
+    tmp = f"{path}.tmp-{os.getpid()}"
+    if path.endswith(".npy"):
+        tmp += ".npy"  # np.save adds the suffix otherwise
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def _version_dir(version):
+    return os.path.join(ARTIFACT_DIR, str(version))
+
+
+def schema_key(features):
+    """Short hash of a feature list and FORMAT_VERSION"""
+    data = json.dumps({"format": FORMAT_VERSION, "features": list(features)})
+    return hashlib.sha1(data.encode()).hexdigest()[:12]
+
+
+def _league_dir(version, league, features):
+    return os.path.join(_version_dir(version), league, schema_key(features))
+
+
+def _model_dir(version, league, features, params):
+    key = hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()[:12]
+    return os.path.join(_league_dir(version, league, features), f"forest-{key}")
+
+
+def read_current():
+    """The published current.json, or None"""
+    try:
+        with open(os.path.join(ARTIFACT_DIR, "current.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def load_dataset(version):
+    """Memory-mapped dataset for a version, or None if it isn't published"""
+    path = os.path.join(_version_dir(version), "dataset.joblib")
+    if not os.path.exists(path):
+        return None
+    return joblib.load(path, mmap_mode="r")
+
+
+def publish_dataset(df, source_mtime=None):
+    """
+    Publish df (a load_data() DataFrame) as the current version and return
+    its memory-mapped copy to use in place of df.
+    """
+    version = df.attrs["version"]
+    os.makedirs(_version_dir(version), exist_ok=True)
+
+    path = os.path.join(_version_dir(version), "dataset.joblib")
+    if not os.path.exists(path):
+        _atomic(path, lambda tmp: joblib.dump(df, tmp))
+
+    current = {"version": version, "source_mtime": source_mtime, "published_at": time.time()}
+    os.makedirs(ARTIFACT_DIR, exist_ok=True)
+    _atomic(os.path.join(ARTIFACT_DIR, "current.json"), lambda tmp: _write_json(tmp, current))
+    _prune(keep=version)
+
+    return load_dataset(version)
+
+
+def load_league(version, league, features, params):
+    """(model, df_league) for a league from the artifact store, or None"""
+    path = _model_dir(version, league, features, params)
+    try:
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        # Built from other features or parameters, or an older layout: a miss
+        if (meta.get("format") != FORMAT_VERSION or meta.get("features") != list(features)
+                or meta.get("params") != params):
+            return None
+        if meta["kind"] == "forest":
+            model = CompiledForest.load(path, meta)
+        else:
+            model = joblib.load(os.path.join(path, "model.joblib"), mmap_mode="r")
+        df_league = joblib.load(
+            os.path.join(_league_dir(version, league, features), "features.joblib"), mmap_mode="r",
+        )
+    except (OSError, ValueError, KeyError):
+        return None
+    return model, df_league
+
+
+def load_features(version, league, features):
+    """Memory-mapped feature frame for a league, or None if it isn't published"""
+    try:
+        df_league = joblib.load(
+            os.path.join(_league_dir(version, league, features), "features.joblib"), mmap_mode="r",
+        )
+    except (OSError, ValueError):
+        return None
+    return df_league if set(features) <= set(df_league.columns) else None
+
+
+def publish_features(version, league, df_league, features):
+    """
+    Publish a league's feature frame on its own (before any model is
+    trained on it) and return its memory-mapped copy.
+    """
+    path = _league_dir(version, league, features)
+    os.makedirs(path, exist_ok=True)
+    _atomic(os.path.join(path, "features.joblib"), lambda tmp: joblib.dump(df_league, tmp))
+    return load_features(version, league, features)
+
+
+def load_fast_model(version, league, features):
+    """The league's fast-tier model, or None if it isn't published"""
+    try:
+        return joblib.load(os.path.join(_league_dir(version, league, features), "fast.joblib"))
+    except (OSError, ValueError):
+        return None
+
+
+def publish_fast_model(version, league, model, features):
+    """Publish a league's fast-tier model (a few KB, so loaded, not mapped)"""
+    path = _league_dir(version, league, features)
+    os.makedirs(path, exist_ok=True)
+    _atomic(os.path.join(path, "fast.joblib"), lambda tmp: joblib.dump(model, tmp))
+
+
+def publish_league(version, league, model, df_league, features, params):
+    """
+    Publish a league forest trained with params and its feature frame, and
+    return the memory-mapped (model, df_league) to use in their place.
+    """
+    path = _model_dir(version, league, features, params)
+    os.makedirs(path, exist_ok=True)
+
+    if hasattr(model, "estimators_") and hasattr(model.estimators_[0], "tree_"):
+        compiled = CompiledForest.from_forest(model)
+        compiled.save(path)
+        meta = {
+            "kind": "forest",
+            "classes": compiled.classes_.tolist(),
+            "feature_names": compiled.feature_names,
+            "max_depth": compiled.max_depth,
+        }
+    else:
+        _atomic(os.path.join(path, "model.joblib"), lambda tmp: joblib.dump(model, tmp))
+        meta = {"kind": "joblib"}
+    meta.update(format=FORMAT_VERSION, features=list(features), params=params)
+
+    features_path = os.path.join(_league_dir(version, league, features), "features.joblib")
+    _atomic(features_path, lambda tmp: joblib.dump(df_league, tmp))
+    # meta.json goes last: its presence means the league is complete
+    _atomic(os.path.join(path, "meta.json"), lambda tmp: _write_json(tmp, meta))
+
+    return load_league(version, league, features, params)
+
+
+def _write_json(path, data):
+    with open(path, "w") as f:
+        json.dump(data, f)
+
+
+def _prune(keep):
+    """Delete all but the newest KEEP_VERSIONS version directories"""
+    try:
+        versions = [
+            entry for entry in os.scandir(ARTIFACT_DIR)
+            if entry.is_dir() and entry.name != str(keep)
+        ]
+    except OSError:
+        return
+    versions.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    for entry in versions[KEEP_VERSIONS - 1:]:
+        # Workers still mapping old files keep their pages until they remap
+        shutil.rmtree(entry.path, ignore_errors=True)
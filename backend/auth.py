@@ -3,21 +3,43 @@ Authentication utilities:
 - Password hashing/verification (bcrypt via Passlib)
 - JWT creation and validation
 - FastAPI dependency for extracting the current user from a bearer token
+
+bcrypt is deliberately slow (~250ms of CPU at the default cost), so routes
+hash and verify through hash_password_async/verify_password_async, which
+run on a small dedicated process pool. Work beyond PASSWORD_HASH_MAX_PENDING
+is turned away with a 503 rather than queued without bound.
 """
 
+import asyncio
+import multiprocessing
 import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta
 
 from dotenv import load_dotenv
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 load_dotenv()
 
+# bcrypt work factor (each +1 doubles the cost). Hashes made with a
+# different cost are transparently rehashed at the next successful login.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+
+# Processes dedicated to hashing (0 = use the shared threadpool instead),
+# and how many hashes may be running or waiting before we answer 503
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", min(2, os.cpu_count() or 1)))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", max(PASSWORD_HASH_WORKERS, 1) * 8))
+
 # Configure password hashing (bcrypt is widely used and secure for password storage)
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
 
 # Extracts tokens from "Authorization: Bearer <token>"
 # tokenUrl is used by Swagger UI to understand where login happens
@@ -28,6 +50,73 @@ SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 hours
 
+# Verified tokens remembered so repeat requests skip signature checks,
+# and user profiles remembered per user ID so /me skips the users table
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", 10_000))
+PROFILE_CACHE_SIZE = int(os.getenv("PROFILE_CACHE_SIZE", 10_000))
+PROFILE_CACHE_TTL = int(os.getenv("PROFILE_CACHE_TTL", 5 * 60))  # seconds
+
+# User IDs allowed to use the admin endpoints (comma-separated). IDs, not
+# usernames, as a listed name that isn't registered yet could be claimed
+# by anyone. Empty means nobody.
+ADMIN_USER_IDS = {int(user_id) for user_id in os.getenv("ADMIN_USER_IDS", "").split(",") if user_id.strip()}
+
+
+class LRUCache:
+    """
+    Small thread-safe LRU where every entry has its own expiry time
+    (a unix timestamp). Expired entries count as misses.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and item[1] > time.time():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return item[0]
+            if item is not None:
+                del self._data[key]
+            self.misses += 1
+            return None
+
+    def set(self, key, value, expires_at):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else None,
+        }
+
+
+# token -> verified payload, kept until the token's exp
+_token_cache = LRUCache(TOKEN_CACHE_SIZE)
+
+# user ID -> profile dict returned by /me
+_profile_cache = LRUCache(PROFILE_CACHE_SIZE)
+
 
 def hash_password(password: str) -> str:
     """
@@ -45,6 +134,77 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(plain_password: str, hashed_password: str):
+    """
+    Verify a password and, if its hash uses an outdated cost or scheme,
+    return a replacement hash. Returns (matches, new_hash or None).
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+_executor = None
+_pending = 0
+
+
+def _get_executor():
+    """Start the hashing process pool on first use"""
+    global _executor
+    if _executor is None:
+        # spawn rather than fork: the server process already has threads running
+        _executor = ProcessPoolExecutor(
+            max_workers=PASSWORD_HASH_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def shutdown_password_hasher():
+    """Stop the hashing processes (called on server shutdown)"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def _run_hashing(func, *args):
+    """Run func on the hashing pool, refusing work once it is backed up"""
+    global _pending, _executor
+
+    if _pending >= PASSWORD_HASH_MAX_PENDING:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-in requests right now - please try again shortly",
+            headers={"Retry-After": "1"},
+        )
+
+    _pending += 1
+    try:
+        if PASSWORD_HASH_WORKERS <= 0:
+            return await run_in_threadpool(func, *args)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(_get_executor(), func, *args)
+        except BrokenProcessPool:
+            # A worker died; start a fresh pool for the next request
+            _executor = None
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Password service restarting - please try again",
+                headers={"Retry-After": "1"},
+            )
+    finally:
+        _pending -= 1
+
+
+async def hash_password_async(password: str) -> str:
+    """hash_password on the hashing pool"""
+    return await _run_hashing(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str):
+    """verify_and_update_password on the hashing pool"""
+    return await _run_hashing(verify_and_update_password, plain_password, hashed_password)
+
+
 def create_access_token(data: dict) -> str:
     """
     Create a signed JWT access token from a payload dict.
@@ -64,20 +224,54 @@ def decode_token(token: str) -> dict:
     """
     Decode and validate a JWT token.
     Raises 401 if the token is invalid or expired.
+    Tokens that verified before are answered from the cache until their exp
+    (invalid tokens are never cached).
     """
+    payload = _token_cache.get(token)
+    if payload is not None:
+        return payload
+
     try:
-        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired token",
         )
 
+    if isinstance(payload.get("exp"), (int, float)):
+        _token_cache.set(token, payload, payload["exp"])
+    return payload
+
 
-def get_current_user(token: str = Depends(oauth2_scheme)) -> int:
+def get_cached_profile(user_id: int):
+    """Profile dict for a user if one was cached recently, else None"""
+    return _profile_cache.get(user_id)
+
+
+def cache_profile(user) -> dict:
+    """Remember a user's public profile (as returned by /me) and return it"""
+    profile = {
+        "id": user.id,
+        "email": user.email,
+        "username": user.username,
+        "created_at": user.created_at,
+    }
+    _profile_cache.set(user.id, profile, time.time() + PROFILE_CACHE_TTL)
+    return profile
+
+
+def auth_cache_stats() -> dict:
+    """Hit rates for the verified-token and profile caches"""
+    return {"tokens": _token_cache.stats(), "profiles": _profile_cache.stats()}
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> int:
     """
     FastAPI dependency that returns the current user's ID from a JWT.
     Expects the token payload to contain a 'sub' claim (subject) with the user ID.
+    Async so that checking a token (a few microseconds of HMAC) doesn't
+    cost a trip through the threadpool.
     """
     payload = decode_token(token)
     user_id = payload.get("sub")
@@ -89,3 +283,17 @@ def get_current_user(token: str = Depends(oauth2_scheme)) -> int:
         )
 
     return int(user_id)
+
+
+async def get_current_admin(user_id: int = Depends(get_current_user)) -> int:
+    """
+    FastAPI dependency for admin-only routes: the current user's ID if it
+    is listed in ADMIN_USER_IDS, else 403.
+    """
+    if user_id not in ADMIN_USER_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required",
+        )
+
+    return user_id
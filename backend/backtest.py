@@ -0,0 +1,253 @@
+"""
+Walk-forward backtest of the league models.
+
+    python -m backtest                        # every league, refit every 28 days
+    python -m backtest --refit-days 7 --leagues England --jobs 4
+    python -m backtest --pipeline-training   # train on the pipeline's features, for comparison
+
+Each league's history is replayed in date order. At every refit date the
+forest (with the league's registry parameters) and the fast tier are
+trained on the matches before that date only, and predict every match up
+to the next refit date. Training and prediction both use as-of features:
+values a prediction made on the morning of the match could have seen.
+(engineer_features' rolling form columns include the match's own goals;
+the as-of versions use the five matches before it. H2H and Elo features
+already only look back.) --pipeline-training trains on engineer_features
+rows instead, as the pipeline does, to see how much that look-ahead
+flatters the models. Replays start once MIN_TRAIN_MATCHES matches are
+available.
+
+Predictions for a whole refit window are made in one call and scored with
+NumPy (accuracy, log-loss, Brier score), overall and per season. Leagues
+replay in parallel, and features come from predictor.get_league_features,
+so they are computed at most once per dataset version. Results go to the
+model registry ("backtest:<league>") and show up in /api/pipeline/status.
+"""
+
+import argparse
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.ensemble import RandomForestClassifier
+
+# Days between refits
+REFIT_DAYS = 28
+
+# Matches of history needed before the first refit
+MIN_TRAIN_MATCHES = 200
+
+# Predictions are clipped away from 0 before taking logs
+_EPS = 1e-15
+
+
+def asof_features(df_league, features):
+    """
+    Copy of an engineer_features frame whose columns only use matches
+    before each row's date (missing values, i.e. a team's first match,
+    become 0 as in predict_match).
+    """
+    df = df_league.sort_values('Date', kind='stable').copy()
+
+    def recent(team_col, goals_col):
+        # Mean of the team's previous five values, excluding this match
+        previous = df.groupby(team_col)[goals_col].shift()
+        return previous.groupby(df[team_col]).rolling(5, min_periods=1).mean().reset_index(0, drop=True)
+
+    df['home_recent_goals'] = recent('home_team', 'home_goals')
+    df['home_recent_conceded'] = recent('home_team', 'away_goals')
+    df['away_recent_goals'] = recent('away_team', 'away_goals')
+    df['away_recent_conceded'] = recent('away_team', 'home_goals')
+    df['home_form'] = df['home_recent_goals'] - df['home_recent_conceded']
+    df['away_form'] = df['away_recent_goals'] - df['away_recent_conceded']
+
+    home_team_home_form = df.groupby('home_team')['home_form'].rolling(5, min_periods=1).mean().reset_index(0, drop=True)
+    away_team_away_form = df.groupby('away_team')['away_form'].rolling(5, min_periods=1).mean().reset_index(0, drop=True)
+    df['home_advantage'] = home_team_home_form - away_team_away_form
+
+    df[features] = df[features].fillna(0)
+    return df
+
+
+def season_label(dates):
+    """"2024-25" style season for each date (seasons start in August)"""
+    start = np.where(dates.dt.month >= 8, dates.dt.year, dates.dt.year - 1)
+    return pd.Series([f"{year}-{(year + 1) % 100:02d}" for year in start], index=dates.index)
+
+
+def score(probs, y):
+    """Accuracy, log-loss and Brier score of (n x 3) probabilities for labels y"""
+    rows = np.arange(len(y))
+    onehot = np.zeros_like(probs)
+    onehot[rows, y] = 1
+    return {
+        "accuracy": round(float((probs.argmax(axis=1) == y).mean()), 4),
+        "log_loss": round(float(-np.log(np.clip(probs[rows, y], _EPS, 1)).mean()), 4),
+        "brier": round(float(((probs - onehot) ** 2).sum(axis=1).mean()), 4),
+    }
+
+
+def replay(train, test, features, params, refit_days=REFIT_DAYS):
+    """
+    Walk forward over one league. train holds the training rows (the as-of
+    rows again, or the pipeline's) and test the as-of rows, both with an
+    encoded 'y'. Returns the
+    predictions made for each tier, their labels and test index, and the
+    number of refits.
+    """
+    from tiers import LinearModel
+
+    test = test.sort_values('Date', kind='stable')
+    start = train['Date'].sort_values().iloc[MIN_TRAIN_MATCHES]
+    refits = pd.date_range(start, test['Date'].max() + pd.Timedelta(days=1), freq=f"{refit_days}D")
+
+    probs = {"forest": [], "fast": []}
+    labels, index = [], []
+
+    for cutoff, until in zip(refits, refits[1:].append(pd.DatetimeIndex([pd.Timestamp.max]))):
+        window = test[(test['Date'] >= cutoff) & (test['Date'] < until)]
+        if window.empty:
+            continue
+        past = train[train['Date'] < cutoff]
+        X, y = past[features].to_numpy(), past['y'].to_numpy()
+
+        models = {
+            "forest": RandomForestClassifier(**params, class_weight='balanced', random_state=42).fit(X, y),
+            "fast": LinearModel.fit(X, y),
+        }
+        X_window = window[features].to_numpy()
+        for tier, model in models.items():
+            # Classes missing from a short history get probability 0
+            p = np.zeros((len(window), 3))
+            p[:, model.classes_] = model.predict_proba(X_window)
+            probs[tier].append(p)
+        labels.append(window['y'].to_numpy())
+        index.append(window.index.to_numpy())
+
+    return (
+        {tier: np.concatenate(p) for tier, p in probs.items()},
+        np.concatenate(labels),
+        np.concatenate(index),
+        len(refits),
+    )
+
+
+def _backtest_league(league, train, test, features, params, refit_days, pipeline_training):
+    start = time.perf_counter()
+    probs, y, index, refits = replay(train if pipeline_training else test, test, features, params, refit_days)
+    seasons = season_label(test.loc[index, 'Date']).to_numpy()
+
+    result = {
+        "training_features": "pipeline" if pipeline_training else "asof",
+        "matches": int(len(y)),
+        "refits": refits,
+        "refit_days": refit_days,
+        "first_match": str(test.loc[index, 'Date'].min().date()),
+        "params": params,
+        "tiers": {tier: score(p, y) for tier, p in probs.items()},
+        "baseline_home_win_accuracy": round(float((y == 2).mean()), 4),
+        "seasons": {
+            season: {
+                "matches": int((seasons == season).sum()),
+                **{tier: score(p[seasons == season], y[seasons == season]) for tier, p in probs.items()},
+            }
+            for season in sorted(set(seasons))
+        },
+    }
+    result["seconds"] = round(time.perf_counter() - start, 2)
+    return league, result
+
+
+def run_backtest(leagues=None, refit_days=REFIT_DAYS, n_jobs=-1, save=True, pipeline_training=False):
+    """
+    Backtest leagues (default: all) in parallel; returns {league: result}.
+    Raises ValueError for leagues that aren't in the dataset. Leagues with
+    no more than MIN_TRAIN_MATCHES matches to train on are skipped.
+    """
+    import predictor
+    import registry
+
+    known = sorted(predictor._df['league'].unique())
+    unknown = [league for league in leagues or [] if league not in known]
+    if unknown:
+        raise ValueError(f"Unknown leagues: {', '.join(unknown)} (known: {', '.join(known)})")
+    leagues = leagues or known
+
+    tasks = []
+    for league in leagues:
+        df_league = predictor.get_league_features(league)
+        train = df_league.dropna(subset=predictor.FEATURES + ['winner']).copy()
+        train['y'] = predictor._le.transform(train['winner'])
+        test = asof_features(df_league.dropna(subset=['winner']), predictor.FEATURES)
+        test['y'] = predictor._le.transform(test['winner'])
+
+        available = len(train if pipeline_training else test)
+        if available <= MIN_TRAIN_MATCHES:
+            print(f"⏭️ {league}: only {available} matches, need more than {MIN_TRAIN_MATCHES} - skipped")
+            continue
+        tasks.append((
+            league, train, test, predictor.FEATURES, predictor.model_params(league),
+            refit_days, pipeline_training,
+        ))
+
+    results = dict(Parallel(n_jobs=n_jobs)(delayed(_backtest_league)(*task) for task in tasks))
+
+    for league, result in results.items():
+        result["data_version"] = predictor.data_version()
+        result["run_at"] = datetime.now().isoformat()
+        if save:
+            registry.put("backtest", league, result)
+    return results
+
+
+def summary():
+    """Latest backtest per league from the registry, without the per-season detail"""
+    import registry
+
+    return {
+        league: {key: value for key, value in result.items() if key != "seasons"}
+        for league, result in registry.get_all("backtest").items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Walk-forward backtest of the league models")
+    parser.add_argument("--leagues", nargs="*", help="default: every league in the dataset")
+    parser.add_argument("--refit-days", type=int, default=REFIT_DAYS, help="days between refits")
+    parser.add_argument("--jobs", type=int, default=-1, help="leagues replayed at once (-1 = all cores)")
+    parser.add_argument("--pipeline-training", action="store_true",
+                        help="train on engineer_features rows (with look-ahead) instead of as-of features")
+    parser.add_argument("--dry-run", action="store_true", help="report without saving to the registry")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        results = run_backtest(
+            args.leagues, args.refit_days, args.jobs,
+            save=not args.dry_run, pipeline_training=args.pipeline_training,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+
+    for league, result in results.items():
+        print(f"📈 {league}: {result['matches']} matches from {result['first_match']}, "
+              f"{result['refits']} refits, {result['seconds']:.1f}s "
+              f"(always home: {result['baseline_home_win_accuracy']:.1%})")
+        for season, detail in result["seasons"].items():
+            for tier in ("forest", "fast"):
+                m = detail[tier]
+                print(f"    {season} {tier:>6}: accuracy {m['accuracy']:.1%}  log-loss {m['log_loss']:.4f}  "
+                      f"Brier {m['brier']:.4f}  ({detail['matches']} matches)")
+
+    if not args.dry_run:
+        # Status polls read the summary from the pipeline status, not the registry
+        from pipeline import publish_backtest_summary
+        publish_backtest_summary()
+
+    print(f"✅ Backtest finished in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
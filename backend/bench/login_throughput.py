@@ -0,0 +1,144 @@
+"""
+Benchmark login throughput and what a login burst does to other routes.
+
+    python -m bench.login_throughput --logins 200 --concurrency 50
+    python -m bench.login_throughput --workers 4 --rounds 10
+
+Runs the real /api/auth/login route in-process against a scratch SQLite
+database, once with bcrypt on the shared threadpool (the old behaviour)
+and once on the dedicated hashing pool. While the logins run, a plain sync
+route is polled to show how long other requests wait for a thread.
+Logins turned away by the admission limit (503) are counted separately.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")
+
+import anyio
+import httpx
+from fastapi import FastAPI
+
+import auth
+import models
+from database import engine
+from routers import auth as auth_router
+
+EMAIL = "bench@example.com"
+PASSWORD = "correct horse battery staple"
+
+
+def build_app(threads):
+    app = FastAPI()
+    app.include_router(auth_router.router, prefix="/api/auth")
+
+    @app.on_event("startup")
+    async def limit_threadpool():
+        anyio.to_thread.current_default_thread_limiter().total_tokens = threads
+
+    @app.get("/ping")
+    def ping():
+        # Stands in for any other sync route sharing the threadpool
+        return {"ok": True}
+
+    return app
+
+
+async def run_mode(app, args):
+    transport = httpx.ASGITransport(app=app)
+    semaphore = asyncio.Semaphore(args.concurrency)
+    statuses = []
+    ping_latencies = []
+    done = asyncio.Event()
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as client:
+        async def login():
+            async with semaphore:
+                res = await client.post("/api/auth/login", json={"email": EMAIL, "password": PASSWORD})
+                statuses.append(res.status_code)
+
+        async def poll():
+            while not done.is_set():
+                start = time.perf_counter()
+                await client.get("/ping")
+                ping_latencies.append(time.perf_counter() - start)
+                await asyncio.sleep(0.01)
+
+        # Warm up (starts the hashing processes)
+        await client.post("/api/auth/login", json={"email": EMAIL, "password": PASSWORD})
+
+        poller = asyncio.create_task(poll())
+        start = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(args.logins)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await poller
+
+    ok = statuses.count(200)
+    rejected = statuses.count(503)
+    ping_ms = sorted(latency * 1000 for latency in ping_latencies)
+    return {
+        "logins_per_s": ok / elapsed,
+        "ok": ok,
+        "rejected": rejected,
+        "elapsed": elapsed,
+        "ping_p50_ms": statistics.median(ping_ms) if ping_ms else 0,
+        "ping_max_ms": ping_ms[-1] if ping_ms else 0,
+    }
+
+
+async def main_async(args):
+    app = build_app(args.threads)
+
+    models.Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(models.User.__table__.delete())
+        conn.execute(models.User.__table__.insert(), {
+            "email": EMAIL,
+            "username": "bench",
+            "hashed_password": auth.hash_password(PASSWORD),
+        })
+
+    print(f"threadpool={args.threads} bcrypt rounds={auth.BCRYPT_ROUNDS} logins={args.logins} "
+          f"concurrency={args.concurrency} max pending={auth.PASSWORD_HASH_MAX_PENDING}")
+
+    async with app.router.lifespan_context(app):
+        for name, workers in (("threadpool", 0), ("process pool", args.workers)):
+            auth.PASSWORD_HASH_WORKERS = workers
+            result = await run_mode(app, args)
+            auth.shutdown_password_hasher()
+            print(f"  {name:>12}: {result['logins_per_s']:6.1f} logins/s  "
+                  f"ok {result['ok']}  503 {result['rejected']}  "
+                  f"other route p50 {result['ping_p50_ms']:.1f}ms max {result['ping_max_ms']:.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Login throughput benchmark")
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--threads", type=int, default=4, help="shared threadpool size")
+    parser.add_argument("--workers", type=int, default=auth.PASSWORD_HASH_WORKERS or 2,
+                        help="hashing processes")
+    parser.add_argument("--rounds", type=int, help="bcrypt work factor (default BCRYPT_ROUNDS)")
+    parser.add_argument("--max-pending", type=int, help="admission limit (default PASSWORD_HASH_MAX_PENDING)")
+    args = parser.parse_args()
+
+    if args.max_pending:
+        auth.PASSWORD_HASH_MAX_PENDING = args.max_pending
+
+    if args.rounds:
+        auth.BCRYPT_ROUNDS = args.rounds
+        auth.pwd_context.update(bcrypt__rounds=args.rounds)
+        # Hashing processes read the work factor from the environment
+        os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
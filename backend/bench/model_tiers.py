@@ -0,0 +1,89 @@
+"""
+Accuracy and latency of the model tiers (forest vs fast) per league.
+
+    python -m bench.model_tiers --repeat 200
+
+For each league, trains both tiers on the first 80% of matches (as
+train_model does) and scores them on the last 20%: accuracy and log-loss.
+Then times a single-row predict_proba for each tier as served (the forest
+as a CompiledForest), and whole predict_match calls with each tier forced,
+which is what a /predict request costs.
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("MODEL_ARTIFACT_DIR", tempfile.mkdtemp())
+
+from sklearn.metrics import accuracy_score, log_loss
+
+import predictor
+from artifacts import CompiledForest
+
+
+def timed(fn, repeat):
+    """(p50, p95) of fn() in ms"""
+    fn()  # warm up
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+
+def bench_league(league, repeat):
+    df_league = predictor.get_league_features(league).dropna(subset=predictor.FEATURES + ['winner'])
+    split = int(len(df_league) * 0.8)
+    X_test = df_league[predictor.FEATURES][split:]
+    y_test = predictor._le.transform(df_league['winner'][split:])
+
+    forest = predictor.train_model(df_league, predictor._le, predictor.model_params(league))
+    models = {
+        "forest": CompiledForest.from_forest(forest),
+        "fast": predictor.train_fast_model(df_league, predictor._le),
+    }
+
+    # A fixture from the latest matchday, so predict_match has recent form to use
+    last = df_league.iloc[-1]
+    row = X_test.iloc[[-1]]
+
+    results = {}
+    for tier, model in models.items():
+        probs = model.predict_proba(X_test)
+        results[tier] = {
+            "accuracy": accuracy_score(y_test, model.classes_[probs.argmax(axis=1)]),
+            "log_loss": log_loss(y_test, probs, labels=[0, 1, 2]),
+            "model": timed(lambda: model.predict_proba(row), repeat),
+            "predict_match": timed(
+                lambda: predictor.predict_match(last['home_team'], last['away_team'], tier=tier),
+                repeat,
+            ),
+        }
+    return len(X_test), results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Accuracy and latency of each model tier")
+    parser.add_argument("--repeat", type=int, default=200, help="timed calls per measurement")
+    parser.add_argument("--leagues", nargs="*", help="default: every league in the dataset")
+    args = parser.parse_args()
+
+    for league in args.leagues or sorted(predictor._df['league'].unique()):
+        n_test, results = bench_league(league, args.repeat)
+        print(f"{league} (holdout {n_test} matches, forest {predictor.model_params(league)})")
+        for tier, r in results.items():
+            print(
+                f"  {tier:>6}: accuracy {r['accuracy']:.1%}  log-loss {r['log_loss']:.4f}  "
+                f"predict_proba p50 {r['model'][0]:.3f}ms p95 {r['model'][1]:.3f}ms  "
+                f"predict_match p50 {r['predict_match'][0]:.2f}ms p95 {r['predict_match'][1]:.2f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""
+How predictor.py scales with the amount of match data.
+
+    python -m bench.predictor_scaling                          # 1x, 10x, 100x
+    python -m bench.predictor_scaling --scales 1 10 --save-baseline
+    python -m bench.predictor_scaling --baseline bench/results/baseline.json
+
+Generates seeded synthetic data (bench.synthetic_data) at each scale
+(1x is about the bundled data: 5 leagues x 20 teams x 3 seasons) and
+times, against that data:
+
+    load_data            reading and preparing every CSV
+    engineer_features    one league (the pipeline repeats it per league)
+    train_model          one league's forest
+    predict_match        p50 over --repeat calls, model already trained
+    h2h                  the /api/predictions/h2h handler, p50
+
+Results are written as JSON (--output). With a baseline file (a previous
+run's output) each timing is compared against it and anything more than
+--tolerance slower is flagged as a regression; the exit status is 1 if
+there are any. --save-baseline writes this run as the new baseline.
+
+Timings only mean something on the machine they were taken on, so the
+report records the Python version, architecture, CPU model and CPU count,
+and a baseline from a different machine is refused (exit status 2) unless
+--any-machine is given. The committed baseline
+(bench/results/predictor_scaling_baseline.json) is from the machine listed
+in it; save your own before comparing on another one.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# Bench data must never reach the shared model store or registry
+os.environ["MODEL_ARTIFACTS"] = "0"
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import predictor
+from bench.synthetic_data import generate
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+# scale -> (leagues, teams per league, seasons). Past 10x the extra data is
+# more leagues rather than longer histories, so a single league (the unit
+# engineer_features and training work on) stays at most 10x the bundled size.
+SCALES = {
+    1: (5, 20, 3),
+    10: (5, 20, 30),
+    100: (50, 20, 30),
+}
+
+TIMINGS = ("load_data", "engineer_features", "train_model", "predict_match", "h2h")
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def p50(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def run_scale(scale, repeat, seed):
+    from routers.predictions import head_to_head
+
+    leagues, teams, seasons = SCALES[scale]
+    data_dir = tempfile.mkdtemp(prefix=f"scaling-{scale}x-")
+    predictor.FILES = generate(data_dir, leagues, teams, seasons, seed)
+    predictor.DATA_DIR = data_dir
+
+    df, load_seconds = timed(predictor.load_data)
+    league = "England"
+    df_league, features_seconds = timed(lambda: predictor.engineer_features(df, league))
+    model, train_seconds = timed(lambda: predictor.train_model(df_league, predictor._le))
+
+    # Serve from this data, with the freshly trained model in the cache
+    predictor._df = df
+    predictor._models = {league: (model, df_league)}
+    predictor._fast_models = {}
+    predictor._elo = {}
+    latest = df_league.iloc[-1]
+    home, away = latest['home_team'], latest['away_team']
+    predictor.predict_match(home, away, tier="forest")  # warm up (Elo ratings etc.)
+
+    return {
+        "leagues": leagues,
+        "teams": teams,
+        "seasons": seasons,
+        "matches": len(df),
+        "league_matches": len(df_league),
+        "load_data": load_seconds,
+        "engineer_features": features_seconds,
+        "train_model": train_seconds,
+        "predict_match": p50(lambda: predictor.predict_match(home, away, tier="forest"), repeat),
+        "h2h": p50(lambda: head_to_head(home, away), repeat),
+    }
+
+
+def _cpu_model():
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or None
+
+
+def machine_info():
+    """What timings depend on besides the code: compared against the baseline's"""
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpu": _cpu_model(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def machine_mismatch(baseline):
+    """[(key, baseline value, this machine's value)] that differ"""
+    return [
+        (key, baseline.get(key), value)
+        for key, value in machine_info().items()
+        if baseline.get(key) != value
+    ]
+
+
+def compare(results, baseline, tolerance):
+    """[(scale, timing, baseline seconds, seconds)] for timings slower than baseline by more than tolerance"""
+    regressions = []
+    for scale, timings in results.items():
+        before = baseline.get("scales", {}).get(scale)
+        if not before:
+            continue
+        for name in TIMINGS:
+            if name in before and timings[name] > before[name] * (1 + tolerance):
+                regressions.append((scale, name, before[name], timings[name]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="predictor.py timings at increasing data sizes")
+    parser.add_argument("--scales", type=int, nargs="*", default=list(SCALES), choices=list(SCALES))
+    parser.add_argument("--repeat", type=int, default=20, help="calls per predict_match/h2h timing")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "predictor_scaling.json"))
+    parser.add_argument("--baseline", default=os.path.join(RESULTS_DIR, "predictor_scaling_baseline.json"))
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs baseline (0.25 = 25%%)")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--any-machine", action="store_true", help="compare against a baseline from another machine")
+    args = parser.parse_args()
+
+    baseline = None
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        mismatch = machine_mismatch(baseline)
+        if mismatch:
+            for key, theirs, ours in mismatch:
+                print(f"⚠️ Baseline {key}: {theirs!r}, this machine: {ours!r}")
+            if not args.any_machine:
+                print(f"✗ {args.baseline} is from another machine - save a baseline here "
+                      f"(--save-baseline) or pass --any-machine to compare anyway")
+                sys.exit(2)
+
+    results = {}
+    for scale in args.scales:
+        print(f"⏱️ {scale}x...")
+        results[str(scale)] = r = run_scale(scale, args.repeat, args.seed)
+        print(
+            f"  {r['matches']} matches ({r['league_matches']} in the timed league): "
+            f"load_data {r['load_data']:.2f}s  engineer_features {r['engineer_features']:.2f}s  "
+            f"train_model {r['train_model']:.2f}s  predict_match {r['predict_match'] * 1000:.1f}ms  "
+            f"h2h {r['h2h'] * 1000:.1f}ms"
+        )
+
+    report = {
+        "run_at": datetime.now().isoformat(),
+        **machine_info(),
+        "seed": args.seed,
+        "scales": results,
+    }
+
+    regressions = []
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        report["regressions"] = [
+            {"scale": scale, "timing": name, "baseline": before, "current": now}
+            for scale, name, before, now in regressions
+        ]
+        for scale, name, before, now in regressions:
+            print(f"  ✗ Regression at {scale}x: {name} {before:.4f}s -> {now:.4f}s ({now / before - 1:+.0%})")
+        if not regressions:
+            print(f"  ✓ No regressions against {args.baseline}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"✓ Results written to {args.output}")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"✓ Baseline saved to {args.baseline}")
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
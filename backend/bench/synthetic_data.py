@@ -0,0 +1,163 @@
+"""
+Seeded synthetic match data in football-data.co.uk's CSV format.
+
+    python -m bench.synthetic_data --out /tmp/synthetic --leagues 5 --teams 20 --seasons 3
+
+Writes one CSV per league per season (named like the bundled files:
+E0.csv, E0 (1).csv, ...) with the columns load_data reads (Div, Date,
+HomeTeam, AwayTeam, FTHG, FTAG, FTR) plus Time, half-time scores and
+Bet365-style 1X2 odds, and a files.json mapping file -> league that can
+stand in for predictor.FILES.
+
+Each season is a double round-robin, one matchday a week from August.
+Goals are Poisson draws from team attack/defence strengths (plus home
+advantage) that drift between seasons, so form, H2H and ratings carry
+real signal. The same seed always produces the same files.
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# The first leagues reuse the real division codes and league names
+KNOWN_LEAGUES = [("E0", "England"), ("SP1", "Spain"), ("D1", "Germany"), ("I1", "Italy"), ("F1", "France")]
+
+_SYLLABLES = ["ash", "bor", "cal", "den", "el", "fen", "gar", "hol", "ing", "kel",
+              "lan", "mor", "nor", "ox", "pen", "ros", "sal", "tor", "ul", "wes"]
+_SUFFIXES = ["United", "City", "Town", "Rovers", "Athletic", "Wanderers", "Albion", "County"]
+
+# Goals per team per match before strengths are applied
+_BASE_RATE = 1.35
+_HOME_ADVANTAGE = 1.25
+
+
+def _leagues(n):
+    """(division code, league name) for n leagues"""
+    extra = [(f"X{i:02d}", f"League {i:02d}") for i in range(len(KNOWN_LEAGUES) + 1, n + 1)]
+    return (KNOWN_LEAGUES + extra)[:n]
+
+
+def _team_names(rng, n):
+    """n distinct made-up club names"""
+    names = set()
+    while len(names) < n:
+        town = "".join(rng.choice(_SYLLABLES, size=rng.integers(2, 4))).capitalize()
+        names.add(f"{town} {rng.choice(_SUFFIXES)}")
+    return sorted(names)
+
+
+def _round_robin(n_teams):
+    """Matchdays of (home, away) index pairs, each pair meeting home and away"""
+    teams = list(range(n_teams))
+    rounds = []
+    for r in range(n_teams - 1):
+        pairs = [(teams[i], teams[n_teams - 1 - i]) for i in range(n_teams // 2)]
+        # Alternate who is at home so nobody plays every first-half game at home
+        rounds.append([(a, b) if r % 2 else (b, a) for a, b in pairs])
+        teams = [teams[0]] + [teams[-1]] + teams[1:-1]
+    return rounds + [[(away, home) for home, away in matchday] for matchday in rounds]
+
+
+def generate_league(rng, code, teams, seasons, last_season=2025):
+    """{season start year: DataFrame} for one league"""
+    n = len(teams)
+    attack = rng.normal(0, 0.25, n)
+    defence = rng.normal(0, 0.2, n)
+    schedule = _round_robin(n)
+
+    frames = {}
+    for year in range(last_season - seasons + 1, last_season + 1):
+        # Strengths drift a little between seasons
+        attack = attack * 0.8 + rng.normal(0, 0.12, n)
+        defence = defence * 0.8 + rng.normal(0, 0.1, n)
+
+        # One matchday a week from the second Saturday of August
+        first = pd.Timestamp(year=year, month=8, day=8)
+        first += pd.Timedelta(days=(5 - first.weekday()) % 7)
+
+        home = np.array([h for matchday in schedule for h, _ in matchday])
+        away = np.array([a for matchday in schedule for _, a in matchday])
+        day = np.repeat(np.arange(len(schedule)), n // 2)
+        dates = first + pd.to_timedelta(day * 7 + rng.integers(0, 3, len(day)), unit="D")
+
+        home_rate = _BASE_RATE * _HOME_ADVANTAGE * np.exp(attack[home] - defence[away])
+        away_rate = _BASE_RATE * np.exp(attack[away] - defence[home])
+        fthg = rng.poisson(home_rate)
+        ftag = rng.poisson(away_rate)
+        hthg = rng.binomial(fthg, 0.45)
+        htag = rng.binomial(ftag, 0.45)
+
+        # Bookmaker odds from a rough strength comparison, with a 5% margin
+        edge = np.log(home_rate / away_rate)
+        p_home = 1 / (1 + np.exp(-1.6 * edge + 0.1))
+        p_draw = 0.27 * np.exp(-0.5 * edge ** 2)
+        p_away = np.clip(1 - p_home - p_draw, 0.03, None)
+        total = (p_home + p_draw + p_away) * 1.05
+
+        frames[year] = pd.DataFrame({
+            "Div": code,
+            "Date": dates.strftime("%d/%m/%Y"),
+            "Time": rng.choice(["12:30", "15:00", "17:30", "20:00"], len(day)),
+            "HomeTeam": np.asarray(teams)[home],
+            "AwayTeam": np.asarray(teams)[away],
+            "FTHG": fthg,
+            "FTAG": ftag,
+            "FTR": np.where(fthg > ftag, "H", np.where(fthg < ftag, "A", "D")),
+            "HTHG": hthg,
+            "HTAG": htag,
+            "HTR": np.where(hthg > htag, "H", np.where(hthg < htag, "A", "D")),
+            "B365H": np.round(total / p_home / 1.05 ** 2, 2),
+            "B365D": np.round(total / p_draw / 1.05 ** 2, 2),
+            "B365A": np.round(total / p_away / 1.05 ** 2, 2),
+        })
+    return frames
+
+
+def generate(out_dir, leagues=5, teams=20, seasons=3, seed=42):
+    """
+    Write the CSVs to out_dir and return {filename: league}, the same
+    shape as predictor.FILES (also saved as files.json).
+    """
+    rng = np.random.default_rng(seed)
+    os.makedirs(out_dir, exist_ok=True)
+    files = {}
+
+    for code, league in _leagues(leagues):
+        names = _team_names(rng, teams)
+        # Team names must be unique across leagues (predict_match looks teams up globally)
+        names = [f"{name} {code}" if code.startswith("X") else name for name in names]
+        frames = generate_league(rng, code, names, seasons)
+
+        # Newest season is E0.csv, then E0 (1).csv, E0 (2).csv, ... like the bundled data
+        for age, year in enumerate(sorted(frames, reverse=True)):
+            filename = f"{code}.csv" if age == 0 else f"{code} ({age}).csv"
+            frames[year].to_csv(os.path.join(out_dir, filename), index=False)
+            files[filename] = league
+
+    with open(os.path.join(out_dir, "files.json"), "w") as f:
+        json.dump(files, f, indent=2)
+    return files
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate football-data.co.uk style CSVs")
+    parser.add_argument("--out", required=True, help="output directory")
+    parser.add_argument("--leagues", type=int, default=5)
+    parser.add_argument("--teams", type=int, default=20, help="teams per league (even)")
+    parser.add_argument("--seasons", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if args.teams % 2:
+        parser.error("--teams must be even")
+
+    files = generate(args.out, args.leagues, args.teams, args.seasons, args.seed)
+    matches = args.leagues * args.seasons * args.teams * (args.teams - 1)
+    print(f"✓ Wrote {len(files)} files ({matches} matches) to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Measure per-worker memory with and without shared model artifacts.
+
+    python -m bench.worker_memory --workers 4
+
+Starts N worker processes that each load the dataset and every league's
+model (as a uvicorn worker would after serving one prediction per league),
+first with MODEL_ARTIFACTS=0 (every worker trains its own copy) and then
+with artifacts on (workers map the files published by the first one).
+With all workers alive, reports each one's RSS, PSS (shared pages split
+between the processes using them) and USS (pages only it uses), read from
+/proc/<pid>/smaps_rollup, so Linux only.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def memory():
+    """RSS/PSS/USS of this process in MB"""
+    fields = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                fields[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return {
+        "rss": fields.get("Rss", 0),
+        "pss": fields.get("Pss", 0),
+        "uss": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+    }
+
+
+def child():
+    """Load everything a worker would, then report memory when asked"""
+    start = time.perf_counter()
+    import predictor
+
+    for league in predictor._df['league'].unique():
+        league_df = predictor._df[predictor._df['league'] == league]
+        predictor.predict_match(league_df['home_team'].iloc[-1], league_df['away_team'].iloc[-1])
+
+    print(json.dumps({"ready": time.perf_counter() - start}), flush=True)
+    sys.stdin.readline()
+    print(json.dumps(memory()), flush=True)
+    sys.stdin.readline()
+
+
+def run_workers(n, env):
+    procs = [
+        subprocess.Popen(
+            [sys.executable, "-m", "bench.worker_memory", "--child"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            text=True, env=env, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        )
+        for _ in range(n)
+    ]
+
+    def read(proc):
+        # Skip the predictor's own log lines
+        while True:
+            line = proc.stdout.readline()
+            if not line:
+                raise RuntimeError("worker exited early")
+            if line.startswith("{"):
+                return json.loads(line)
+
+    startup = [read(proc)["ready"] for proc in procs]
+    # Everyone is loaded: measure while all workers are alive
+    for proc in procs:
+        proc.stdin.write("measure\n")
+        proc.stdin.flush()
+    results = [read(proc) for proc in procs]
+
+    for proc in procs:
+        proc.stdin.close()
+        proc.wait()
+    return startup, results
+
+
+def report(name, startup, results):
+    total = {key: sum(r[key] for r in results) for key in ("rss", "pss", "uss")}
+    print(f"  {name}:")
+    for i, (ready, r) in enumerate(zip(startup, results)):
+        print(f"    worker {i}: load {ready:5.1f}s  RSS {r['rss']:6.1f}MB  PSS {r['pss']:6.1f}MB  USS {r['uss']:6.1f}MB")
+    print(f"    total:              RSS {total['rss']:6.1f}MB  PSS {total['pss']:6.1f}MB  USS {total['uss']:6.1f}MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-worker memory with/without shared artifacts")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child()
+        return
+
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", "sqlite://")
+    env["MODEL_ARTIFACT_DIR"] = tempfile.mkdtemp()
+
+    print(f"workers={args.workers}")
+
+    env["MODEL_ARTIFACTS"] = "0"
+    report("private models (MODEL_ARTIFACTS=0)", *run_workers(args.workers, env))
+
+    env["MODEL_ARTIFACTS"] = "1"
+    run_workers(1, env)  # first worker trains and publishes
+    report("shared artifacts", *run_workers(args.workers, env))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,26 @@
 """
 Database configuration and session management.
 Handles database connection, ORM base, and request-scoped sessions.
+
+Two engines share one configuration: a sync engine (startup, pipeline,
+sync routes) and an async engine (psycopg async / aiosqlite) for routes
+that shouldn't hold a threadpool worker while they wait on the database.
+
+Both pools are instrumented: pool_stats() reports checkout wait times,
+checked-out connections and overflow/timeout events per engine so the
+pool can be sized against the server's connection cap.
 """
 
 import os
+import threading
+import time
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+import metrics
 
 # Load environment variables from .env file
 load_dotenv()
@@ -18,8 +31,190 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if DATABASE_URL and DATABASE_URL.startswith("postgresql://"):
     DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+psycopg://", 1)
 
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
-# Create SQLAlchemy engine
+# Connection pool settings (per engine, per worker process)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))  # seconds, -1 to never recycle
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))  # seconds to wait for a free connection
+
+# Liveness check on checkout:
+#   "always" - ping every checkout (an extra round-trip per request)
+#   "idle"   - only ping connections unused for DB_POOL_PING_IDLE seconds
+#   "off"    - never ping; rely on DB_POOL_RECYCLE
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "idle").lower()
+DB_POOL_PING_IDLE = float(os.getenv("DB_POOL_PING_IDLE", 30))
+
+# Server-side cap on any single statement (Postgres only, 0 = no limit)
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 0))
+
+
+# Upper bounds (seconds) of the checkout wait histogram buckets
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class PoolMetrics:
+    """Counters for one engine's connection pool (thread-safe)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checked_out = 0
+        self.connects = 0
+        self.overflow_events = 0
+        self.timeouts = 0
+        self.pings = 0
+        self.ping_failures = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.wait_buckets = [0] * len(WAIT_BUCKETS)
+
+    def add(self, name, amount=1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def observe_wait(self, seconds):
+        with self._lock:
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+            for i, bound in enumerate(WAIT_BUCKETS):
+                if seconds <= bound:
+                    self.wait_buckets[i] += 1
+                    break
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "checked_out": self.checked_out,
+                "connects": self.connects,
+                "overflow_events": self.overflow_events,
+                "timeouts": self.timeouts,
+                "pings": self.pings,
+                "ping_failures": self.ping_failures,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+                # Cumulative, like a Prometheus histogram
+                "wait_buckets": {
+                    str(bound): sum(self.wait_buckets[:i + 1])
+                    for i, bound in enumerate(WAIT_BUCKETS)
+                },
+            }
+
+
+pool_metrics = {"sync": PoolMetrics(), "async": PoolMetrics()}
+
+
+class _TimedCheckout:
+    """Pool mixin that records how long each checkout waited for a connection"""
+
+    metrics = None
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.metrics.add("timeouts")
+            raise
+        finally:
+            self.metrics.observe_wait(time.perf_counter() - start)
+
+    def recreate(self):
+        # dispose() swaps in a new pool built from the same class
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class InstrumentedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+def _engine_options(url, is_async=False):
+    """create_engine keyword arguments shared by the sync and async engines"""
+    if url.startswith("sqlite"):
+        # SQLite is only used locally; its pools don't take these settings
+        return {}
+
+    options = {
+        "poolclass": InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        "pool_pre_ping": DB_POOL_PRE_PING == "always",
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+    }
+    if DB_STATEMENT_TIMEOUT_MS:
+        options["connect_args"] = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+    return options
+
+
+def _async_url(url):
+    """Async driver URL for the same database (psycopg handles both modes)"""
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    return url
+
+
+def _ping(dbapi_connection):
+    """Cheap round-trip; a failure makes the pool retry with a new connection"""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("SELECT 1")
+    except Exception as e:
+        raise exc.DisconnectionError() from e
+    finally:
+        try:
+            cursor.close()
+        except Exception:
+            pass
+
+
+def _instrument(pool_engine, metrics):
+    """Attach pool event listeners feeding metrics (and the "idle" pre-ping)"""
+    if isinstance(pool_engine.pool, _TimedCheckout):
+        pool_engine.pool.metrics = metrics
+
+    @event.listens_for(pool_engine, "connect")
+    def on_connect(dbapi_connection, record):
+        metrics.add("connects")
+        record.info["last_used"] = time.monotonic()
+        # The pool only grows past pool_size when everything else is checked out
+        overflow = getattr(pool_engine.pool, "overflow", None)
+        if overflow is not None and overflow() > 0:
+            metrics.add("overflow_events")
+
+    @event.listens_for(pool_engine, "checkout")
+    def on_checkout(dbapi_connection, record, proxy):
+        idle = time.monotonic() - record.info.get("last_used", 0)
+        if DB_POOL_PRE_PING == "idle" and idle > DB_POOL_PING_IDLE:
+            metrics.add("pings")
+            try:
+                _ping(dbapi_connection)
+            except exc.DisconnectionError:
+                metrics.add("ping_failures")
+                raise
+        metrics.add("checkouts")
+        metrics.add("checked_out")
+
+    @event.listens_for(pool_engine, "checkin")
+    def on_checkin(dbapi_connection, record):
+        record.info["last_used"] = time.monotonic()
+        metrics.add("checked_out", -1)
+
+
+# Create SQLAlchemy engines
+engine = create_engine(DATABASE_URL, **_engine_options(DATABASE_URL))
+async_engine = create_async_engine(_async_url(DATABASE_URL), **_engine_options(DATABASE_URL, is_async=True))
+
+_instrument(engine, pool_metrics["sync"])
+_instrument(async_engine.sync_engine, pool_metrics["async"])
+metrics.instrument_engine(engine, "sync")
+metrics.instrument_engine(async_engine.sync_engine, "async")
 
 
 # Create a session factory for database interactions
@@ -29,10 +224,46 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+# Async session factory (objects stay usable after commit)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # Base class for all SQLAlchemy models
 Base = declarative_base()
 
 
+def dialect_insert(db):
+    """
+    Return the dialect-specific insert() for the session's database, which
+    supports on_conflict_do_nothing()/on_conflict_do_update() upserts.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
+def pool_stats():
+    """Pool configuration and metrics for both engines"""
+    stats = {}
+    for name, pool_engine in (("sync", engine), ("async", async_engine.sync_engine)):
+        pool = pool_engine.pool
+        stats[name] = {
+            "pool": type(pool).__name__,
+            "size": pool.size() if hasattr(pool, "size") else None,
+            "max_overflow": getattr(pool, "_max_overflow", None),
+            "timeout": pool.timeout() if hasattr(pool, "timeout") else None,
+            "pre_ping": DB_POOL_PRE_PING,
+            **pool_metrics[name].snapshot(),
+        }
+    return stats
+
+
 def get_db():
     """
     FastAPI dependency that provides a database session.
@@ -43,3 +274,13 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """
+    FastAPI dependency that provides an async database session.
+    Use from async def routes so waiting on the database doesn't tie up
+    a threadpool worker.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,182 @@
+"""
+Elo ratings - a team-strength feature updated one match at a time.
+
+Every team has a rating; before a match the home side's expected score is
+
+    expected = 1 / (1 + 10 ** ((away - (home + HOME_ADVANTAGE)) / 400))
+
+and afterwards both ratings move by K_FACTOR * margin * (result - expected),
+where result is 1/0.5/0 and margin grows with the goal difference (a 4-0
+says more than a 1-0). Points gained by one side are lost by the other.
+
+Ratings live in a NumPy array indexed by team ID, so a match is O(1).
+Every processed match is logged with both teams' ratings after it, which
+is what as-of-date lookups read, and update() only processes results
+newer than the last one it has seen, so a weekly refresh costs a few
+hundred matches rather than the whole history.
+"""
+
+import numpy as np
+import pandas as pd
+
+INITIAL_RATING = 1500.0
+
+# Rating points a win against an equal side is worth (before the margin factor)
+K_FACTOR = 20.0
+
+# Home sides play as if this many points stronger
+HOME_ADVANTAGE = 60.0
+
+
+def _margin(goal_difference):
+    """Goal-difference multiplier (as in the World Football Elo ratings)"""
+    goal_difference = abs(goal_difference)
+    if goal_difference <= 1:
+        return 1.0
+    if goal_difference == 2:
+        return 1.5
+    return (11 + goal_difference) / 8
+
+
+class EloRatings:
+    """Ratings for the teams of one league"""
+
+    def __init__(self):
+        self.teams = []
+        self.index = {}
+        self.ratings = np.empty(32)
+        self.matches = 0
+
+        # Per-match log, in processing order
+        self._dates = []
+        self._home = []
+        self._away = []
+        self._home_after = []
+        self._away_after = []
+        self._log = None  # the log as arrays, rebuilt after an update
+
+        # Last processed date and the fixtures seen on it (so a re-run of
+        # the same day's results isn't counted twice)
+        self.last_date = None
+        self._last_fixtures = set()
+
+    def team_id(self, team):
+        """ID for a team, registering it at INITIAL_RATING if new"""
+        if team not in self.index:
+            if len(self.teams) == len(self.ratings):
+                self.ratings = np.concatenate([self.ratings, np.empty(len(self.ratings))])
+            self.index[team] = len(self.teams)
+            self.ratings[len(self.teams)] = INITIAL_RATING
+            self.teams.append(team)
+        return self.index[team]
+
+    def process(self, date, home_team, away_team, home_goals, away_goals):
+        """Apply one result; returns the (home, away) ratings before it"""
+        home = self.team_id(home_team)
+        away = self.team_id(away_team)
+        home_rating = self.ratings[home]
+        away_rating = self.ratings[away]
+
+        expected = 1 / (1 + 10 ** ((away_rating - home_rating - HOME_ADVANTAGE) / 400))
+        result = 1.0 if home_goals > away_goals else 0.5 if home_goals == away_goals else 0.0
+        change = K_FACTOR * _margin(home_goals - away_goals) * (result - expected)
+
+        self.ratings[home] = home_rating + change
+        self.ratings[away] = away_rating - change
+        self.matches += 1
+
+        self._dates.append(date)
+        self._home.append(home)
+        self._away.append(away)
+        self._home_after.append(home_rating + change)
+        self._away_after.append(away_rating - change)
+
+        if date != self.last_date:
+            self.last_date = date
+            self._last_fixtures = set()
+        self._last_fixtures.add((home_team, away_team))
+
+        return home_rating, away_rating
+
+    def update(self, df):
+        """
+        Process the results in df (home_team, away_team, home_goals,
+        away_goals, Date) that are newer than anything seen so far, in date
+        order. Returns the pre-match (home, away) rating arrays for the
+        processed rows and their index in df.
+        """
+        df = df.dropna(subset=['home_goals', 'away_goals'])
+        if self.last_date is not None:
+            later = df['Date'] > self.last_date
+            same_day = (df['Date'] == self.last_date) & np.array([
+                (home, away) not in self._last_fixtures
+                for home, away in zip(df['home_team'], df['away_team'])
+            ], dtype=bool)
+            df = df[later | same_day]
+        df = df.sort_values('Date', kind='stable')
+
+        home_before = np.empty(len(df))
+        away_before = np.empty(len(df))
+        rows = zip(df['Date'], df['home_team'], df['away_team'], df['home_goals'], df['away_goals'])
+        for i, row in enumerate(rows):
+            home_before[i], away_before[i] = self.process(*row)
+
+        if len(df):
+            self._log = None
+        return home_before, away_before, df.index
+
+    def _arrays(self):
+        if self._log is None:
+            self._log = {
+                "dates": pd.DatetimeIndex(self._dates).to_numpy(),
+                "home": np.asarray(self._home, dtype=np.int32),
+                "away": np.asarray(self._away, dtype=np.int32),
+                "home_after": np.asarray(self._home_after),
+                "away_after": np.asarray(self._away_after),
+            }
+        return self._log
+
+    def as_of(self, date=None):
+        """
+        Ratings array (indexed by team ID) from results before `date`; the
+        current ratings if date is None. Teams without a match by then are
+        at INITIAL_RATING.
+        """
+        if date is None:
+            return self.ratings[:len(self.teams)].copy()
+
+        log = self._arrays()
+        n = int(np.searchsorted(log["dates"], np.datetime64(pd.Timestamp(date)), side="left"))
+        positions = np.arange(n)
+
+        # Each team's last match before the date, as home and as away side
+        last_home = np.full(len(self.teams), -1)
+        last_away = np.full(len(self.teams), -1)
+        np.maximum.at(last_home, log["home"][:n], positions)
+        np.maximum.at(last_away, log["away"][:n], positions)
+
+        ratings = np.full(len(self.teams), INITIAL_RATING)
+        home_side = last_home > last_away
+        away_side = last_away > last_home
+        ratings[home_side] = log["home_after"][last_home[home_side]]
+        ratings[away_side] = log["away_after"][last_away[away_side]]
+        return ratings
+
+    def rating(self, team, date=None):
+        """One team's rating (as of `date`, or current); INITIAL_RATING if unknown"""
+        if team not in self.index:
+            return INITIAL_RATING
+        return float(self.as_of(date)[self.index[team]])
+
+    def table(self, date=None, teams=None):
+        """[{team, rating, rank}] sorted by rating, optionally for a subset of teams"""
+        ratings = self.as_of(date)
+        names = self.teams if teams is None else [team for team in teams if team in self.index]
+        rows = sorted(
+            ((team, float(ratings[self.index[team]])) for team in names),
+            key=lambda row: -row[1],
+        )
+        return [
+            {"rank": rank, "team": team, "rating": round(value, 1)}
+            for rank, (team, value) in enumerate(rows, start=1)
+        ]
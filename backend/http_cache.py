@@ -0,0 +1,69 @@
+"""
+HTTP caching helpers for read-heavy endpoints.
+
+Routes pass a "version" that changes whenever their data changes (an upstream
+ETag, a cache timestamp, the dataset version...). The strong ETag is derived
+from that version, so a client polling with If-None-Match gets a bodyless
+304 without us serializing the payload at all. Routes without a cheap
+version fall back to hashing the serialized body.
+"""
+
+import hashlib
+import json
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+
+def _dumps(content) -> bytes:
+    # jsonable_encoder only runs for values json can't handle (datetimes etc.)
+    return json.dumps(content, separators=(",", ":"), default=jsonable_encoder).encode()
+
+
+def make_etag(value) -> str:
+    """Strong ETag for any value with a stable repr (or raw bytes)"""
+    data = value if isinstance(value, bytes) else repr(value).encode()
+    return '"' + hashlib.sha1(data).hexdigest() + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match covers this ETag"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so ignore any W/ prefix
+    candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return etag in candidates
+
+
+def conditional_json(
+    request: Request,
+    content,
+    version=None,
+    cache_control: str = "no-cache",
+) -> Response:
+    """
+    Return content as JSON with ETag and Cache-Control headers,
+    or a 304 Not Modified if the client already has this version.
+    content may be a zero-argument callable so that building the payload
+    is skipped entirely for 304s.
+    """
+    if callable(content) and version is None:
+        content = content()
+
+    body = None
+    if version is None:
+        body = _dumps(content)
+        etag = make_etag(body)
+    else:
+        etag = make_etag(version)
+
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    if body is None:
+        body = _dumps(content() if callable(content) else content)
+    return Response(content=body, media_type="application/json", headers=headers)
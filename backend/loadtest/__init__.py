@@ -0,0 +1,4 @@
+"""
+Load-testing tools: a local football-data.org stand-in (mock_api),
+fixture recording (record) and a fixed-RPS load generator (run).
+"""
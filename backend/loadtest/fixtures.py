@@ -0,0 +1,202 @@
+"""
+Fixtures replayed by the mock football-data.org server.
+
+Recorded responses live in loadtest/fixtures/ as JSON files named after
+the API path (see fixture_name). Anything that hasn't been recorded is
+synthesized from the bundled CSVs, so the mock works out of the box.
+"""
+
+import csv
+import json
+import os
+import zlib
+from datetime import datetime, timedelta
+
+FIXTURES_DIR = os.getenv(
+    "MOCK_FIXTURES_DIR",
+    os.path.join(os.path.dirname(__file__), "fixtures"),
+)
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+
+# football-data.org competition code -> current-season CSV
+COMPETITIONS = {
+    "PL": ("Premier League", "England", "E0.csv"),
+    "PD": ("Primera Division", "Spain", "SP1.csv"),
+    "BL1": ("Bundesliga", "Germany", "D1.csv"),
+    "SA": ("Serie A", "Italy", "I1.csv"),
+    "FL1": ("Ligue 1", "France", "F1.csv"),
+    "CL": ("UEFA Champions League", "Europe", None),
+}
+
+
+def fixture_name(path: str, status: str | None = None) -> str:
+    """Map an API path like competitions/PL/matches to a fixture filename"""
+    name = path.strip("/").replace("/", "_")
+    if status:
+        name += f"_{status}"
+    return f"{name}.json"
+
+
+def team_id(name: str) -> int:
+    """Stable fake team ID derived from the team name"""
+    return zlib.crc32(name.encode()) % 90000 + 10000
+
+
+def _read_csv(filename):
+    path = os.path.join(DATA_DIR, filename)
+    with open(path, encoding="utf-8-sig") as f:
+        rows = [r for r in csv.DictReader(f) if r.get("FTR") in ("H", "D", "A")]
+    for r in rows:
+        r["_date"] = datetime.strptime(r["Date"], "%d/%m/%Y")
+    return sorted(rows, key=lambda r: r["_date"])
+
+
+def _team(name, country):
+    return {
+        "id": team_id(name),
+        "name": name,
+        "shortName": name,
+        "tla": name[:3].upper(),
+        "crest": f"https://crests.example/{team_id(name)}.png",
+        "area": {"name": country},
+        "founded": 1900,
+        "venue": f"{name} Stadium",
+        "website": f"https://{name.lower().replace(' ', '')}.example",
+        "coach": {"name": f"{name} Coach"},
+    }
+
+
+def _league_rows(code):
+    _, _, filename = COMPETITIONS[code]
+    if filename is None:
+        # Champions League: borrow the top of each domestic league
+        rows = []
+        for other, (_, _, f) in COMPETITIONS.items():
+            if f:
+                rows.extend(_read_csv(f)[:20])
+        return sorted(rows, key=lambda r: r["_date"])
+    return _read_csv(filename)
+
+
+def _match(code, row, status, idx):
+    name, country, _ = COMPETITIONS[code]
+    finished = status == "FINISHED"
+    return {
+        "id": idx,
+        "utcDate": row["_date"].strftime("%Y-%m-%dT15:00:00Z"),
+        "status": status,
+        "competition": {"code": code, "name": name},
+        "homeTeam": {"id": team_id(row["HomeTeam"]), "name": row["HomeTeam"]},
+        "awayTeam": {"id": team_id(row["AwayTeam"]), "name": row["AwayTeam"]},
+        "score": {
+            "fullTime": {
+                "home": int(row["FTHG"]) if finished else None,
+                "away": int(row["FTAG"]) if finished else None,
+            }
+        },
+    }
+
+
+def _synthesize(path, status=None):
+    parts = path.strip("/").split("/")
+
+    if parts[0] == "teams" and len(parts) == 2:
+        wanted = int(parts[1])
+        for code, (_, country, _) in COMPETITIONS.items():
+            for r in _league_rows(code):
+                for name in (r["HomeTeam"], r["AwayTeam"]):
+                    if team_id(name) == wanted:
+                        return _team(name, country)
+        return None
+
+    if parts[0] != "competitions" or len(parts) != 3 or parts[1] not in COMPETITIONS:
+        return None
+
+    code, resource = parts[1], parts[2]
+    name, country, _ = COMPETITIONS[code]
+    rows = _league_rows(code)
+    competition = {"code": code, "name": name}
+
+    if resource == "teams":
+        names = sorted({r["HomeTeam"] for r in rows} | {r["AwayTeam"] for r in rows})
+        return {"competition": competition, "teams": [_team(n, country) for n in names]}
+
+    if resource == "matches":
+        if status == "SCHEDULED":
+            # Replay the start of the season as next week's fixtures
+            start = datetime.now() + timedelta(days=7)
+            upcoming = []
+            for i, r in enumerate(rows[:20]):
+                r = {**r, "_date": start + timedelta(days=i // 5)}
+                upcoming.append(_match(code, r, "SCHEDULED", 900000 + i))
+            return {"competition": competition, "matches": upcoming}
+        return {
+            "competition": competition,
+            "matches": [_match(code, r, "FINISHED", 100000 + i) for i, r in enumerate(rows)],
+        }
+
+    if resource == "standings":
+        table = {}
+        for r in rows:
+            hg, ag = int(r["FTHG"]), int(r["FTAG"])
+            for team, gf, ga in ((r["HomeTeam"], hg, ag), (r["AwayTeam"], ag, hg)):
+                t = table.setdefault(team, {"played": 0, "won": 0, "draw": 0, "lost": 0, "gf": 0, "ga": 0})
+                t["played"] += 1
+                t["gf"] += gf
+                t["ga"] += ga
+                t["won" if gf > ga else "lost" if gf < ga else "draw"] += 1
+        ordered = sorted(
+            table.items(),
+            key=lambda kv: (-(3 * kv[1]["won"] + kv[1]["draw"]), -(kv[1]["gf"] - kv[1]["ga"]), kv[0]),
+        )
+        rows_out = [
+            {
+                "position": pos,
+                "team": {"id": team_id(team), "name": team, "crest": _team(team, country)["crest"]},
+                "playedGames": t["played"],
+                "won": t["won"],
+                "draw": t["draw"],
+                "lost": t["lost"],
+                "points": 3 * t["won"] + t["draw"],
+                "goalsFor": t["gf"],
+                "goalsAgainst": t["ga"],
+                "goalDifference": t["gf"] - t["ga"],
+            }
+            for pos, (team, t) in enumerate(ordered, start=1)
+        ]
+        standing = {"stage": "REGULAR_SEASON", "type": "TOTAL", "table": rows_out}
+        if code == "CL":
+            standing["group"] = "League phase"
+        return {"competition": competition, "standings": [standing]}
+
+    return None
+
+
+_loaded = {}
+
+
+def load_fixture(path: str, status: str | None = None):
+    """
+    Return the JSON payload for an API path, preferring a recorded fixture.
+    Returns None for paths we have nothing for (the mock answers 404).
+    """
+    name = fixture_name(path, status)
+    if name in _loaded:
+        return _loaded[name]
+
+    file_path = os.path.join(FIXTURES_DIR, name)
+    if os.path.exists(file_path):
+        with open(file_path) as f:
+            payload = json.load(f)
+    else:
+        payload = _synthesize(path, status)
+
+    _loaded[name] = payload
+    return payload
+
+
+def save_fixture(path: str, payload, status: str | None = None):
+    """Write a recorded API response into the fixtures directory"""
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    with open(os.path.join(FIXTURES_DIR, fixture_name(path, status)), "w") as f:
+        json.dump(payload, f)
@@ -0,0 +1,138 @@
+"""
+Local stand-in for the football-data.org v4 API.
+
+Replays fixtures (see loadtest/fixtures.py) for the endpoints our routers use,
+with configurable latency, random failures and a per-minute rate limit that
+answers 429 like the real free tier. Run it with:
+
+    uvicorn loadtest.mock_api:app --port 8090
+
+and start the backend with FOOTBALL_API_BASE_URL=http://localhost:8090/v4.
+
+Settings come from environment variables and can be changed at runtime
+with POST /_mock/config:
+    MOCK_LATENCY_MS         base latency added to every response (default 150)
+    MOCK_JITTER_MS          extra random latency, uniform 0..jitter (default 50)
+    MOCK_ERROR_RATE         fraction of requests answered with 500 (default 0)
+    MOCK_RATE_LIMIT         requests per minute before 429s, 0 = off (default 10)
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import time
+from collections import Counter, deque
+
+from fastapi import FastAPI, Request, Response
+
+from loadtest.fixtures import load_fixture
+
+app = FastAPI(title="football-data.org mock")
+
+config = {
+    "latency_ms": float(os.getenv("MOCK_LATENCY_MS", 150)),
+    "jitter_ms": float(os.getenv("MOCK_JITTER_MS", 50)),
+    "error_rate": float(os.getenv("MOCK_ERROR_RATE", 0)),
+    "rate_limit": int(os.getenv("MOCK_RATE_LIMIT", 10)),
+}
+
+# Upstream call counters, keyed by endpoint template
+calls = Counter()
+responses = Counter()
+_recent = deque()  # request timestamps inside the rate-limit window
+
+
+def _rate_limited() -> bool:
+    limit = config["rate_limit"]
+    if limit <= 0:
+        return False
+    now = time.monotonic()
+    while _recent and now - _recent[0] > 60:
+        _recent.popleft()
+    if len(_recent) >= limit:
+        return True
+    _recent.append(now)
+    return False
+
+
+async def _replay(request: Request, endpoint: str, path: str, status: str | None = None):
+    calls[endpoint] += 1
+
+    delay = config["latency_ms"] + random.uniform(0, config["jitter_ms"])
+    await asyncio.sleep(delay / 1000)
+
+    if _rate_limited():
+        responses[f"{endpoint} 429"] += 1
+        return Response(
+            content=json.dumps({"message": "You reached your request limit.", "errorCode": 429}),
+            status_code=429,
+            media_type="application/json",
+        )
+
+    if random.random() < config["error_rate"]:
+        responses[f"{endpoint} 500"] += 1
+        return Response(status_code=500)
+
+    payload = load_fixture(path, status)
+    if payload is None:
+        responses[f"{endpoint} 404"] += 1
+        return Response(
+            content=json.dumps({"message": "Resource not found", "errorCode": 404}),
+            status_code=404,
+            media_type="application/json",
+        )
+
+    body = json.dumps(payload)
+    etag = '"' + hashlib.md5(body.encode()).hexdigest() + '"'
+    if request.headers.get("if-none-match") == etag:
+        responses[f"{endpoint} 304"] += 1
+        return Response(status_code=304, headers={"ETag": etag})
+
+    responses[f"{endpoint} 200"] += 1
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+
+@app.get("/v4/competitions/{code}/matches")
+async def competition_matches(code: str, request: Request, status: str | None = None):
+    return await _replay(request, "/competitions/{code}/matches", f"competitions/{code}/matches", status)
+
+
+@app.get("/v4/competitions/{code}/standings")
+async def competition_standings(code: str, request: Request):
+    return await _replay(request, "/competitions/{code}/standings", f"competitions/{code}/standings")
+
+
+@app.get("/v4/competitions/{code}/teams")
+async def competition_teams(code: str, request: Request):
+    return await _replay(request, "/competitions/{code}/teams", f"competitions/{code}/teams")
+
+
+@app.get("/v4/teams/{team_id}")
+async def team(team_id: int, request: Request):
+    return await _replay(request, "/teams/{id}", f"teams/{team_id}")
+
+
+@app.get("/_mock/stats")
+def stats():
+    """Upstream call counts per endpoint (and per endpoint + status code)"""
+    return {"calls": dict(calls), "responses": dict(responses), "config": config}
+
+
+@app.post("/_mock/reset")
+def reset():
+    """Zero the counters and the rate-limit window"""
+    calls.clear()
+    responses.clear()
+    _recent.clear()
+    return {"message": "Counters reset"}
+
+
+@app.post("/_mock/config")
+def update_config(changes: dict):
+    """Change latency/error/rate-limit settings without restarting"""
+    for key, value in changes.items():
+        if key in config:
+            config[key] = type(config[key])(value)
+    return config
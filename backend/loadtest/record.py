@@ -0,0 +1,60 @@
+"""
+Record real football-data.org responses as fixtures for the mock server.
+
+    python -m loadtest.record               # all competitions
+    python -m loadtest.record --teams 57 65 # plus some team detail pages
+
+Needs FOOTBALL_API_KEY. Requests are spaced out to stay inside the
+free tier's 10 requests/minute.
+"""
+
+import argparse
+import os
+import time
+
+import requests
+from dotenv import load_dotenv
+
+from loadtest.fixtures import COMPETITIONS, save_fixture
+
+load_dotenv()
+
+BASE_URL = "https://api.football-data.org/v4"
+HEADERS = {"X-Auth-Token": os.getenv("FOOTBALL_API_KEY")}
+REQUEST_GAP = 6.5  # seconds between requests (10/min limit)
+
+
+def record(path, status=None):
+    params = {"status": status} if status else None
+    res = requests.get(f"{BASE_URL}/{path}", headers=HEADERS, params=params, timeout=15)
+    if res.status_code != 200:
+        print(f"  ✗ {path} {status or ''}: {res.status_code}")
+        return
+    save_fixture(path, res.json(), status)
+    print(f"  ✓ {path} {status or ''}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--teams", type=int, nargs="*", default=[], help="team IDs to record")
+    args = parser.parse_args()
+
+    targets = []
+    for code in COMPETITIONS:
+        targets += [
+            (f"competitions/{code}/matches", "SCHEDULED"),
+            (f"competitions/{code}/matches", "FINISHED"),
+            (f"competitions/{code}/standings", None),
+            (f"competitions/{code}/teams", None),
+        ]
+    targets += [(f"teams/{team_id}", None) for team_id in args.teams]
+
+    print(f"Recording {len(targets)} fixtures...")
+    for i, (path, status) in enumerate(targets):
+        if i:
+            time.sleep(REQUEST_GAP)
+        record(path, status)
+
+
+if __name__ == "__main__":
+    main()
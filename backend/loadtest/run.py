@@ -0,0 +1,212 @@
+"""
+Fixed-RPS load generator for the backend.
+
+Drives the API at a target request rate (open loop - requests are started
+on schedule whether or not earlier ones have finished) and reports
+p50/p95/p99 latency, throughput and error counts per endpoint, plus how
+many upstream calls the mock football-data.org server received.
+
+    # everything in one go: starts the mock and the app as subprocesses
+    python -m loadtest.run --spawn --rps 50 --duration 30
+
+    # against servers you started yourself
+    python -m loadtest.run --url http://localhost:8000 --mock-url http://localhost:8090
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from urllib.parse import urlparse
+
+import httpx
+
+from loadtest.fixtures import team_id
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_ENDPOINTS = [
+    "/api/teams/",
+    "/api/teams/search/united",
+    f"/api/teams/{team_id('Arsenal')}",
+    "/api/matches/",
+    "/api/matches/standings/PL",
+    "/api/matches/standings/PD",
+]
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    k = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+def summarize(samples, elapsed):
+    """Collapse (latency_ms, status) samples into the numbers we report"""
+    latencies = sorted(ms for ms, _ in samples)
+    errors = sum(1 for _, status in samples if status is None or status >= 400)
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "throughput_rps": round(len(samples) / elapsed, 1) if elapsed else 0,
+        "p50_ms": round(percentile(latencies, 50), 1) if latencies else None,
+        "p95_ms": round(percentile(latencies, 95), 1) if latencies else None,
+        "p99_ms": round(percentile(latencies, 99), 1) if latencies else None,
+    }
+
+
+async def _one(client, url, endpoint, results):
+    start = time.perf_counter()
+    try:
+        res = await client.get(url + endpoint)
+        status = res.status_code
+    except httpx.HTTPError:
+        status = None
+    results[endpoint].append(((time.perf_counter() - start) * 1000, status))
+
+
+async def drive(url, endpoints, rps, duration, timeout):
+    """Fire requests at a fixed rate, round-robin over endpoints"""
+    results = defaultdict(list)
+    total = int(rps * duration)
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=200)
+
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+        tasks = []
+        start = time.perf_counter()
+        for i in range(total):
+            delay = start + i / rps - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            endpoint = endpoints[i % len(endpoints)]
+            tasks.append(asyncio.create_task(_one(client, url, endpoint, results)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+    return results, elapsed
+
+
+def _mock_request(mock_url, method, path):
+    if not mock_url:
+        return None
+    try:
+        return httpx.request(method, f"{mock_url}{path}", timeout=5).json()
+    except httpx.HTTPError as e:
+        print(f"Could not reach mock at {mock_url}: {e}")
+        return None
+
+
+def _wait_ready(url, proc, timeout=120):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"{url} exited with code {proc.returncode}")
+        try:
+            httpx.get(url, timeout=1)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.5)
+    raise RuntimeError(f"{url} did not start within {timeout}s")
+
+
+def spawn(app_port, mock_port, workers):
+    """Start the mock API and the backend as uvicorn subprocesses"""
+    tmp = tempfile.mkdtemp(prefix="loadtest-")
+    env = {
+        **os.environ,
+        "FOOTBALL_API_BASE_URL": f"http://127.0.0.1:{mock_port}/v4",
+        "FOOTBALL_API_KEY": os.getenv("FOOTBALL_API_KEY", "loadtest"),
+        "UPSTREAM_CACHE_PATH": os.path.join(tmp, "upstream.sqlite3"),
+        "DATABASE_URL": os.getenv("DATABASE_URL", f"sqlite:///{os.path.join(tmp, 'app.db')}"),
+        "SECRET_KEY": os.getenv("SECRET_KEY", "loadtest"),
+    }
+    uvicorn = [sys.executable, "-m", "uvicorn", "--log-level", "warning"]
+    mock = subprocess.Popen(uvicorn + ["loadtest.mock_api:app", "--port", str(mock_port)], cwd=BACKEND_DIR, env=env)
+    backend = subprocess.Popen(
+        uvicorn + ["main:app", "--port", str(app_port), "--workers", str(workers)],
+        cwd=BACKEND_DIR, env=env,
+    )
+    try:
+        _wait_ready(f"http://127.0.0.1:{mock_port}/_mock/stats", mock)
+        _wait_ready(f"http://127.0.0.1:{app_port}/", backend)
+    except Exception:
+        for proc in (backend, mock):
+            proc.terminate()
+        raise
+    return [backend, mock]
+
+
+def print_report(report):
+    print(f"\n{'endpoint':<40}{'reqs':>7}{'err':>6}{'rps':>8}{'p50':>9}{'p95':>9}{'p99':>9}")
+    rows = list(report["endpoints"].items()) + [("TOTAL", report["total"])]
+    for endpoint, s in rows:
+        print(
+            f"{endpoint:<40}{s['requests']:>7}{s['errors']:>6}{s['throughput_rps']:>8}"
+            f"{s['p50_ms']!s:>9}{s['p95_ms']!s:>9}{s['p99_ms']!s:>9}"
+        )
+    upstream = report.get("upstream_calls")
+    if upstream is not None:
+        print("\nUpstream calls:")
+        for endpoint, count in sorted(upstream.items()):
+            print(f"  {endpoint:<38}{count:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the backend at a fixed request rate")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="backend base URL")
+    parser.add_argument("--mock-url", default="http://127.0.0.1:8090", help="mock API base URL ('' to skip)")
+    parser.add_argument("--rps", type=float, default=20)
+    parser.add_argument("--duration", type=float, default=30, help="seconds")
+    parser.add_argument("--timeout", type=float, default=30, help="per-request timeout (seconds)")
+    parser.add_argument("--endpoint", action="append", dest="endpoints", help="repeatable; defaults to a mix of read endpoints")
+    parser.add_argument("--warmup", action="store_true", help="hit every endpoint once before measuring")
+    parser.add_argument("--spawn", action="store_true", help="start the mock and the backend automatically")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers when spawning")
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args()
+
+    endpoints = args.endpoints or DEFAULT_ENDPOINTS
+    procs = []
+    if args.spawn:
+        procs = spawn(urlparse(args.url).port, urlparse(args.mock_url).port, args.workers)
+
+    try:
+        if args.warmup:
+            for endpoint in endpoints:
+                httpx.get(args.url + endpoint, timeout=args.timeout)
+
+        _mock_request(args.mock_url, "POST", "/_mock/reset")
+        print(f"Driving {args.url} at {args.rps} rps for {args.duration}s over {len(endpoints)} endpoints...")
+        results, elapsed = asyncio.run(
+            drive(args.url, endpoints, args.rps, args.duration, args.timeout)
+        )
+        mock_stats = _mock_request(args.mock_url, "GET", "/_mock/stats")
+    finally:
+        for proc in procs:
+            proc.terminate()
+            proc.wait()
+
+    report = {
+        "target_rps": args.rps,
+        "duration_s": round(elapsed, 2),
+        "endpoints": {e: summarize(results[e], elapsed) for e in endpoints},
+        "total": summarize([s for e in endpoints for s in results[e]], elapsed),
+        "upstream_calls": mock_stats["calls"] if mock_stats else None,
+        "upstream_responses": mock_stats["responses"] if mock_stats else None,
+    }
+    print_report(report)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
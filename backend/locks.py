@@ -0,0 +1,164 @@
+"""
+Cross-process locks, so only one worker in a deployment does a given job.
+
+On Postgres these are session-level advisory locks, which every worker on
+every host sharing the database sees. Elsewhere (local SQLite) they are
+file locks, which cover the workers on one machine. Either way the lock
+goes away by itself if the process holding it dies.
+"""
+
+import os
+import threading
+import zlib
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+
+from database import DATABASE_URL
+
+LOCK_DIR = os.getenv("LOCK_DIR", os.path.join(os.path.dirname(__file__), "cache"))
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Lock connections live outside the request pool (one is held for as long
+# as the lock is), and are never recycled out from under the lock
+_lock_engine = None
+
+
+def _get_lock_engine():
+    global _lock_engine
+    if _lock_engine is None:
+        _lock_engine = create_engine(DATABASE_URL, poolclass=NullPool)
+    return _lock_engine
+
+
+class _Lock:
+    """Non-blocking lock; also exclusive between threads of one process"""
+
+    def __init__(self, name):
+        self.name = name
+        self._guard = threading.Lock()
+        self._held = False
+
+    def acquire(self) -> bool:
+        """Take the lock if nobody else has it. Returns True on success."""
+        with self._guard:
+            if self._held:
+                return False
+            self._held = self._acquire()
+            return self._held
+
+    def release(self):
+        with self._guard:
+            if self._held:
+                self._held = False
+                self._release()
+
+    @property
+    def held(self) -> bool:
+        """True if this process holds the lock"""
+        return self._held
+
+    def is_locked(self) -> bool:
+        """True if anyone (this process or another) holds the lock"""
+        if self._held:
+            return True
+        if self.acquire():
+            self.release()
+            return False
+        return True
+
+
+class AdvisoryLock(_Lock):
+    """Postgres session-level advisory lock"""
+
+    def __init__(self, name):
+        super().__init__(name)
+        # Advisory locks are keyed by a bigint
+        self.key = zlib.crc32(f"soccer-dashboard:{name}".encode())
+        self._conn = None
+
+    def _acquire(self):
+        conn = _get_lock_engine().connect()
+        try:
+            if conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": self.key}).scalar():
+                conn.commit()
+                self._conn = conn
+                return True
+        except Exception as e:
+            print(f"✗ Could not take lock {self.name}: {e}")
+        conn.close()
+        return False
+
+    def _release(self):
+        conn, self._conn = self._conn, None
+        try:
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.key})
+            conn.commit()
+        except Exception:
+            pass  # closing the session releases it anyway
+        finally:
+            conn.close()
+
+    def check(self) -> bool:
+        """
+        Confirm the session holding the lock is still alive (if the
+        connection dropped, so did the lock). Releases it if not.
+        """
+        if not self._held:
+            return False
+        try:
+            self._conn.execute(text("SELECT 1"))
+            self._conn.commit()
+            return True
+        except Exception:
+            self.release()
+            return False
+
+
+class FileLock(_Lock):
+    """Exclusive lock on a file under LOCK_DIR"""
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.path = os.path.join(LOCK_DIR, f"{name}.lock")
+        self._file = None
+
+    def _acquire(self):
+        os.makedirs(LOCK_DIR, exist_ok=True)
+        f = open(self.path, "a+")
+        try:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            f.close()
+            return False
+        self._file = f
+        return True
+
+    def _release(self):
+        f, self._file = self._file, None
+        try:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            f.close()
+
+    def check(self) -> bool:
+        # A file lock lasts as long as the file stays open
+        return self._held
+
+
+def make_lock(name):
+    """Deployment-wide lock for the configured database"""
+    if DATABASE_URL.startswith("postgresql"):
+        return AdvisoryLock(name)
+    return FileLock(name)
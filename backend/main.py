@@ -1,14 +1,25 @@
 """Main FastAPI application entry point"""
 
-from fastapi import FastAPI
+# First, so PROFILE_TRACEMALLOC_FRAMES can trace the data and model loading below
+import profiling
+from fastapi import Depends, FastAPI, Header, HTTPException
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from routers import teams, matches, predictions, auth, favourites, prediction_history
-from database import engine
+from fastapi.middleware.gzip import GZipMiddleware
+from routers import teams, matches, predictions, auth, favourites, prediction_history, admin
+from database import engine, pool_stats
 import models
-from pipeline import start_scheduler, run_pipeline, pipeline_status
+from migrations import migrate
+from pipeline import start_scheduler, start_pipeline_run, get_pipeline_status as load_pipeline_status
+from upstream_cache import cache as upstream_cache
+from auth import shutdown_password_hasher, auth_cache_stats, get_current_admin
+import metrics
+import tiers
+from simulator import shutdown_simulator
 
-# Create all database tables
-models.Base.metadata.create_all(bind=engine)
+# Create the database tables and bring older databases up to date (one
+# worker at a time, see migrations.py)
+migrate(engine)
 
 app = FastAPI(title="Soccer Dashboard API", version="1.0.0")
 
@@ -24,6 +35,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger JSON responses (team lists, standings, history)
+app.add_middleware(GZipMiddleware, minimum_size=1000)
+
+# Per-route latency, status and in-flight counts for /api/metrics (outermost,
+# so it times everything else too)
+if metrics.ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+
 # Register all routers
 app.include_router(teams.router, prefix="/api/teams", tags=["teams"])
 app.include_router(matches.router, prefix="/api/matches", tags=["matches"])
@@ -31,15 +50,25 @@ app.include_router(predictions.router, prefix="/api/predictions", tags=["predict
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
 app.include_router(favourites.router, prefix="/api/favourites", tags=["favourites"])
 app.include_router(prediction_history.router, prefix="/api/prediction-history", tags=["prediction-history"])
+app.include_router(admin.router, prefix="/api/admin", tags=["admin"])
 
 
 
 @app.on_event("startup")
 async def startup_event():
-    """Start the pipeline scheduler when server starts"""
+    """Warm the upstream cache and start the pipeline scheduler when server starts"""
+    # Serve football-data.org responses fetched by earlier runs/other workers
+    upstream_cache.load()
     start_scheduler()
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the password hashing and simulation processes"""
+    shutdown_password_hasher()
+    shutdown_simulator()
+
+
 @app.get("/")
 def root():
     return {"status": "ok", "message": "Soccer Dashboard API is running"}
@@ -47,14 +76,39 @@ def root():
 
 @app.get("/api/pipeline/status")
 def get_pipeline_status():
-    """Check when pipeline last ran and its status"""
-    return pipeline_status
+    """Check when pipeline last ran and its status (same answer from every worker)"""
+    return load_pipeline_status()
+
+
+@app.get("/api/db/pool", dependencies=[Depends(get_current_admin)])
+def get_pool_stats():
+    """Connection pool settings, checkout wait times and overflow events (admins only)"""
+    return pool_stats()
+
+
+@app.get("/api/metrics")
+def get_metrics(authorization: str | None = Header(None)):
+    """
+    Prometheus text format: request latency/status per route, stage,
+    upstream and database timings and model tier stats (this worker's).
+    With METRICS_TOKEN set the scraper must send it as a bearer token, and
+    gets the pool and auth cache stats too; without it those are left out.
+    """
+    if not metrics.ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled (METRICS_ENABLED=0)")
+    if metrics.SCRAPE_TOKEN is None:
+        body = metrics.render(tiers=tiers.stats())
+    elif metrics.scrape_authorized(authorization):
+        body = metrics.render(pool_stats(), auth_cache_stats(), tiers.stats())
+    else:
+        raise HTTPException(status_code=401, detail="Metrics token required", headers={"WWW-Authenticate": "Bearer"})
+    return PlainTextResponse(body, media_type=metrics.CONTENT_TYPE)
 
 
 @app.post("/api/pipeline/run")
 def trigger_pipeline():
     """Manually trigger the pipeline - useful for testing"""
-    import threading
-    thread = threading.Thread(target=run_pipeline)
-    thread.start()
+    # Repeated triggers while a run is in progress (in any worker) don't start another
+    if not start_pipeline_run():
+        return {"message": "Pipeline already running"}
     return {"message": "Pipeline started in background"}
\ No newline at end of file
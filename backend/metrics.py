@@ -0,0 +1,353 @@
+"""
+Request, stage, upstream and database timings in the Prometheus text format.
+
+    http_requests_total{method,route,status}         requests finished
+    http_request_duration_seconds{method,route}      latency histogram
+    http_requests_in_flight                          requests being served
+    http_request_exceptions_total{method,route}      unhandled exceptions
+    stage_duration_seconds{stage}                    hot-path stages (see stages())
+    upstream_request_duration_seconds{endpoint,status}   football-data.org calls
+    db_query_duration_seconds{engine,statement}      SQL statements
+
+route is the matched route template (/api/teams/{team_id}), so label sets
+stay small. Everything is per worker process; GET /api/metrics renders it
+together with the connection pool, auth cache and model tier stats.
+
+Pool and auth cache numbers are only rendered for scrapers that send
+METRICS_TOKEN as a bearer token; without a token configured the route is
+public and leaves them out.
+
+With METRICS_ENABLED=0 the middleware isn't installed, engines aren't
+instrumented, upstream clients are plain httpx clients and stages() hands
+out a shared object whose mark() does nothing.
+"""
+
+import hmac
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+
+import httpx
+
+ENABLED = os.getenv("METRICS_ENABLED", "1") != "0"
+
+# Bearer token scrapers must send to /api/metrics (Prometheus: authorization
+# credentials). Unset keeps the route public, without pool/auth cache stats.
+SCRAPE_TOKEN = os.getenv("METRICS_TOKEN") or None
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values):
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+class Counter:
+    """Monotonic counter per label set"""
+
+    kind = "counter"
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, labels, value) for labels, value in self._values.items()]
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{_labels(self.labels, labels)} {value}")
+        return lines
+
+
+class Gauge(Counter):
+    """Value that goes up and down"""
+
+    kind = "gauge"
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label set"""
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}  # labels -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            series[i] += 1
+            series[-1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {labels: list(values) for labels, values in self._series.items()}
+        for labels, values in series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), values):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_labels(self.labels + ('le',), labels + (bound,))} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, labels)} {values[-1]:.6f}")
+            lines.append(f"{self.name}_count{_labels(self.labels, labels)} {cumulative}")
+        return lines
+
+
+requests_total = Counter("http_requests_total", "HTTP requests finished", ("method", "route", "status"))
+request_duration = Histogram("http_request_duration_seconds", "HTTP request latency", ("method", "route"))
+requests_in_flight = Gauge("http_requests_in_flight", "HTTP requests being served")
+request_exceptions = Counter("http_request_exceptions_total", "Unhandled exceptions", ("method", "route"))
+stage_duration = Histogram("stage_duration_seconds", "Time spent in hot-path stages", ("stage",))
+upstream_duration = Histogram(
+    "upstream_request_duration_seconds", "football-data.org calls (until response headers)",
+    ("endpoint", "status"),
+)
+db_query_duration = Histogram("db_query_duration_seconds", "SQL statement execution", ("engine", "statement"))
+
+_METRICS = (
+    requests_total, request_duration, requests_in_flight, request_exceptions,
+    stage_duration, upstream_duration, db_query_duration,
+)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, status and in-flight count per route"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        requests_in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        except Exception:
+            request_exceptions.inc(scope["method"], _route(scope))
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            requests_in_flight.dec()
+            route = _route(scope)
+            requests_total.inc(scope["method"], route, str(status))
+            request_duration.observe(elapsed, scope["method"], route)
+
+
+def _route(scope):
+    """The matched route's path template (FastAPI puts the route in the scope)"""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class Stages:
+    """
+    Times consecutive stages of one call: each mark(name) records the time
+    since the previous mark (or since creation) as "<prefix>.<name>".
+    """
+
+    __slots__ = ("prefix", "last")
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self.last = time.perf_counter()
+
+    def mark(self, stage):
+        now = time.perf_counter()
+        stage_duration.observe(now - self.last, f"{self.prefix}.{stage}")
+        self.last = now
+
+
+class _NoStages:
+    __slots__ = ()
+
+    def mark(self, stage):
+        pass
+
+
+_NO_STAGES = _NoStages()
+
+
+def stages(prefix):
+    """A Stages timer, or a shared no-op when metrics are disabled"""
+    return Stages(prefix) if ENABLED else _NO_STAGES
+
+
+# Numeric path segments (team IDs...) are folded into one label value
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+class _TimedTransport(httpx.AsyncBaseTransport):
+    """httpx transport that times every request, failures included"""
+
+    def __init__(self, transport):
+        self._transport = transport
+
+    async def handle_async_request(self, request):
+        endpoint = _ID_SEGMENT.sub("/{id}", request.url.path)
+        start = time.perf_counter()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except Exception:
+            upstream_duration.observe(time.perf_counter() - start, endpoint, "error")
+            raise
+        upstream_duration.observe(time.perf_counter() - start, endpoint, str(response.status_code))
+        return response
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+def upstream_client(**kwargs):
+    """httpx.AsyncClient for football-data.org calls, timed when metrics are on"""
+    if ENABLED:
+        kwargs["transport"] = _TimedTransport(httpx.AsyncHTTPTransport())
+    return httpx.AsyncClient(**kwargs)
+
+
+def instrument_engine(engine, name):
+    """Time every statement run on a (sync) SQLAlchemy engine"""
+    if not ENABLED:
+        return
+
+    from sqlalchemy import event
+
+    def before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+    def after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["metrics_query_start"].pop()
+        db_query_duration.observe(time.perf_counter() - started, name, _statement_kind(statement))
+
+    def error(context):
+        # Failed statements never reach after_cursor_execute
+        starts = context.connection.info.get("metrics_query_start") if context.connection else None
+        if starts:
+            starts.pop()
+
+    event.listen(engine, "before_cursor_execute", before)
+    event.listen(engine, "after_cursor_execute", after)
+    event.listen(engine, "handle_error", error)
+
+
+def _statement_kind(statement):
+    """SELECT / INSERT / UPDATE / DELETE / OTHER"""
+    words = statement.lstrip().split(None, 1)
+    kind = words[0].upper() if words else ""
+    return kind if kind in ("SELECT", "INSERT", "UPDATE", "DELETE") else "OTHER"
+
+
+def _gauge_lines(name, help, kind, samples):
+    """Lines for a metric given [(labels dict, value)]"""
+    if kind == "counter" and not name.endswith("_total"):
+        name += "_total"
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        if value is not None:
+            lines.append(f"{name}{_labels(tuple(labels), tuple(labels.values()))} {value}")
+    return lines
+
+
+def scrape_authorized(authorization):
+    """True if an Authorization header carries SCRAPE_TOKEN"""
+    scheme, _, token = (authorization or "").partition(" ")
+    return (
+        SCRAPE_TOKEN is not None and scheme.lower() == "bearer"
+        and hmac.compare_digest(token.encode(), SCRAPE_TOKEN.encode())
+    )
+
+
+def render(pool=None, auth_cache=None, tiers=None):
+    """
+    All metrics in the Prometheus text format, plus the database pool
+    (database.pool_stats()), auth cache (auth.auth_cache_stats()) and model
+    tier (tiers.stats()) numbers when given.
+    """
+    lines = []
+    for metric in _METRICS:
+        lines += metric.render()
+
+    if pool:
+        for key, kind, help in (
+            ("checked_out", "gauge", "Connections checked out of the pool"),
+            ("checkouts", "counter", "Pool checkouts"),
+            ("connects", "counter", "New database connections"),
+            ("overflow_events", "counter", "Checkouts beyond the pool size"),
+            ("timeouts", "counter", "Checkouts that timed out waiting"),
+            ("ping_failures", "counter", "Dead connections found on checkout"),
+            ("wait_seconds_total", "counter", "Time spent waiting for a connection"),
+            ("wait_seconds_max", "gauge", "Longest wait for a connection"),
+        ):
+            lines += _gauge_lines(
+                f"db_pool_{key}", help, kind,
+                [({"engine": name}, stats.get(key)) for name, stats in pool.items()],
+            )
+
+    if auth_cache:
+        for key, kind, help in (
+            ("hits", "counter", "Auth cache hits"),
+            ("misses", "counter", "Auth cache misses"),
+            ("size", "gauge", "Entries in the auth cache"),
+        ):
+            lines += _gauge_lines(
+                f"auth_cache_{key}", help, kind,
+                [({"cache": name}, stats.get(key)) for name, stats in auth_cache.items()],
+            )
+
+    if tiers:
+        lines += _gauge_lines(
+            "predict_tier_requests_total", "Predictions answered per model tier", "counter",
+            [({"tier": name}, t["requests"]) for name, t in tiers["tiers"].items()],
+        )
+        lines += _gauge_lines(
+            "predict_tier_latency_seconds", "Recent average prediction latency per tier", "gauge",
+            [
+                ({"tier": name}, t["avg_latency_ms"] / 1000 if t["avg_latency_ms"] is not None else None)
+                for name, t in tiers["tiers"].items()
+            ],
+        )
+        lines += _gauge_lines(
+            "predict_in_flight", "Predictions running in this worker", "gauge", [({}, tiers["in_flight"])],
+        )
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,117 @@
+"""
+Schema setup run when a worker starts.
+
+create_all only creates missing tables, so databases created by older
+versions are brought up to date here too. With several workers starting at
+once only one of them does this at a time (the "migrations" lock); the
+others wait for it and then find nothing left to do.
+
+Steps that change existing data run once per database, each in one
+transaction with the count of steps done (kept in pipeline_state as
+"schema_version"), so a step that fails part way is retried next start.
+"""
+
+import json
+import os
+import time
+
+from sqlalchemy import exc, inspect, select, text
+
+import models
+from locks import make_lock
+
+# How long a worker waits for another one's migration before giving up
+WAIT_SECONDS = float(os.getenv("MIGRATION_WAIT_SECONDS", 120))
+
+_lock = make_lock("migrations")
+
+
+def _already_exists(error):
+    """True if a DDL error only says the object is already there"""
+    return "already exists" in str(getattr(error, "orig", error)).lower()
+
+
+def _unique_favourites(conn):
+    """
+    Databases created before favourites were unique per (user, team) may
+    hold duplicates, which would stop the unique index from being created
+    """
+    if "uq_favourites_user_team" in {i["name"] for i in inspect(conn).get_indexes("favourites")}:
+        return
+    if conn.dialect.name == "postgresql":
+        # Keep new rows out between the cleanup and the index (SQLite's
+        # DELETE already holds the write lock until commit)
+        conn.execute(text("LOCK TABLE favourites IN SHARE ROW EXCLUSIVE MODE"))
+    conn.execute(text(
+        "DELETE FROM favourites WHERE id NOT IN "
+        "(SELECT MIN(id) FROM favourites GROUP BY user_id, team_id)"
+    ))
+    index = next(i for i in models.Favourite.__table__.indexes if i.name == "uq_favourites_user_team")
+    index.create(bind=conn)
+
+
+def _idempotency_request_hash(conn):
+    """Idempotency keys stored before request bodies were hashed lack the column"""
+    if "request_hash" in {c["name"] for c in inspect(conn).get_columns("idempotency_keys")}:
+        return
+    conn.execute(text("ALTER TABLE idempotency_keys ADD COLUMN request_hash VARCHAR(64)"))
+
+
+# Data migrations in the order they were added - only ever append
+STEPS = [
+    _unique_favourites,
+    _idempotency_request_hash,
+]
+
+
+def _steps_done(conn):
+    value = conn.scalar(select(models.PipelineState.value).where(models.PipelineState.name == "schema_version"))
+    return json.loads(value) if value is not None else 0
+
+
+def _record_steps_done(conn, done):
+    state = models.PipelineState.__table__
+    updated = conn.execute(
+        state.update().where(state.c.name == "schema_version").values(value=json.dumps(done))
+    ).rowcount
+    if not updated:
+        conn.execute(state.insert().values(name="schema_version", value=json.dumps(done)))
+
+
+def create_indexes(engine):
+    """Create indexes added to models after their table was first created"""
+    for table in models.Base.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                index.create(bind=engine, checkfirst=True)
+            except (exc.ProgrammingError, exc.OperationalError) as e:
+                # Another host (outside this lock's reach) got there first
+                if not _already_exists(e):
+                    raise
+
+
+def migrate(engine):
+    """
+    Create missing tables and indexes and run any steps this database
+    hasn't had, holding the migrations lock while doing so
+    """
+    deadline = time.monotonic() + WAIT_SECONDS
+    while not _lock.acquire():
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"Timed out after {WAIT_SECONDS:.0f}s waiting for another worker's migration")
+        time.sleep(0.2)
+
+    try:
+        models.Base.metadata.create_all(bind=engine)
+
+        with engine.connect() as conn:
+            done = _steps_done(conn)
+        for number, step in enumerate(STEPS[done:], start=done + 1):
+            with engine.begin() as conn:
+                step(conn)
+                _record_steps_done(conn, number)
+            print(f"✓ Migration {number} ({step.__name__.strip('_')}) applied")
+
+        create_indexes(engine)
+    finally:
+        _lock.release()
@@ -3,7 +3,7 @@ Database models for users and favourite teams.
 Defines table schemas and relationships using SQLAlchemy ORM.
 """
 
-from sqlalchemy import Column, Integer, String, Boolean, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, Float, DateTime, ForeignKey, Index, Text, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from datetime import datetime
@@ -34,6 +34,10 @@ class Favourite(Base):
     """
 
     __tablename__ = "favourites"
+    __table_args__ = (
+        # One row per (user, team); also serves "all favourites for a user" lookups
+        Index("uq_favourites_user_team", "user_id", "team_id", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -50,7 +54,11 @@ class Favourite(Base):
 
 class PredictionHistory(Base):
     __tablename__ = "prediction_history"
-    
+    __table_args__ = (
+        # Serves the history page: one user's rows, newest first, paged by (created_at, id)
+        Index("ix_prediction_history_user_created", "user_id", "created_at", "id"),
+    )
+
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     home_team = Column(String, nullable=False)
@@ -65,4 +73,38 @@ class PredictionHistory(Base):
     
     user = relationship("User", back_populates="predictions")
 
+
+class IdempotencyKey(Base):
+    """
+    Remembers the response to a client request sent with an Idempotency-Key,
+    so retries of the same request return it instead of inserting again.
+    request_hash identifies the body, so reusing a key for a different
+    request is rejected. Rows are pruned after IDEMPOTENCY_KEY_TTL_HOURS.
+    """
+
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        UniqueConstraint("user_id", "key", name="uq_idempotency_keys_user_key"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    key = Column(String, nullable=False)
+    request_hash = Column(String(64))  # sha256 of the original request body
+    response = Column(Text)  # JSON body returned for the original request
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+
+class PipelineState(Base):
+    """
+    Pipeline state shared by all workers (e.g. name="status"), so every
+    worker reports the same thing whichever one ran the pipeline.
+    """
+
+    __tablename__ = "pipeline_state"
+
+    name = Column(String, primary_key=True)
+    value = Column(Text, nullable=False)  # JSON
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
 # Also add to User model - find the User class and add this line after favourites relationship:
@@ -1,17 +1,29 @@
 """
 Data pipeline - automatically downloads fresh match data
 and retrains the ML model weekly.
+
+Every worker starts a scheduler, but only the one holding the
+"pipeline-scheduler" lock (the leader) schedules the weekly run; the others
+retry every LEADER_CHECK_SECONDS and take over if the leader goes away.
+Each run, scheduled or manual, holds the "pipeline-run" lock, so there is
+never more than one at a time. Status is stored in the database so every
+worker reports the same thing.
 """
 
 import os
+import json
+import threading
+import time
 import requests
 import pandas as pd
-from datetime import datetime
+from datetime import datetime, timedelta
 from apscheduler.schedulers.background import BackgroundScheduler
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import LabelEncoder
 from sklearn.metrics import accuracy_score
+from locks import make_lock
+import profiling
 
 DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
 
@@ -24,13 +36,39 @@ SEASON_URLS = {
     "D1.csv": "https://www.football-data.co.uk/mmz4281/2526/D1.csv"
 }
 
-# Track pipeline status
+# How often non-leaders try to take over scheduling (and the leader checks it still leads)
+LEADER_CHECK_SECONDS = int(os.getenv("PIPELINE_LEADER_CHECK_SECONDS", 60))
+
+# How often every worker checks for models published by the leader
+ARTIFACT_CHECK_SECONDS = int(os.getenv("MODEL_ARTIFACT_CHECK_SECONDS", 30))
+
+# Set PIPELINE_BACKTEST=1 to re-run the walk-forward backtest after each retrain.
+# It runs inside a web worker, so only on PIPELINE_BACKTEST_JOBS processes.
+BACKTEST_AFTER_RETRAIN = os.getenv("PIPELINE_BACKTEST", "0") == "1"
+BACKTEST_JOBS = int(os.getenv("PIPELINE_BACKTEST_JOBS", 1))
+
+# Idempotency keys older than this are deleted (hourly, by the leader); a
+# client retrying a save after that would insert it again
+IDEMPOTENCY_KEY_TTL_HOURS = int(os.getenv("IDEMPOTENCY_KEY_TTL_HOURS", 24))
+
+# How long a "is a run in progress?" lock probe is reused for status polls
+# (each probe costs a database connection on Postgres)
+RUN_LOCK_CHECK_SECONDS = float(os.getenv("PIPELINE_RUN_LOCK_CHECK_SECONDS", 5))
+
+_leader_lock = make_lock("pipeline-scheduler")
+_run_lock = make_lock("pipeline-run")
+_run_lock_probe = (float("-inf"), False)  # (monotonic time, is_locked())
+
+# Track pipeline status (this worker's copy; the shared one is in the database)
 pipeline_status = {
     "last_run": None,
     "last_success": None,
     "last_error": None,
     "files_updated": [],
     "model_accuracy": None,
+    "predictions_resolved": None,
+    "backtest_run": None,
+    "backtest": {},  # latest backtest per league (backtest.summary())
     "status": "never_run"
 }
 
@@ -65,7 +103,8 @@ def retrain_model():
     # Import here to avoid circular imports
     from predictor import (
         load_data, engineer_features, train_model,
-        _le, _models, FEATURES
+        publish_dataset, publish_league, publish_fast_model,
+        model_params, train_fast_model, _le, _models, FEATURES
     )
     
     print("🤖 Pipeline: Retraining model with fresh data...")
@@ -76,6 +115,8 @@ def retrain_model():
         
         # Retrain for each cached league
         new_models = {}
+        new_fast_models = {}
+        new_params = {}
         accuracies = []
         
         leagues = df['league'].unique()
@@ -94,9 +135,10 @@ def retrain_model():
                 X, y, test_size=0.2, shuffle=False
             )
             
+            # Tuned hyperparameters from the model registry, if any
+            params = model_params(league)
             model = RandomForestClassifier(
-                n_estimators=100, max_depth=10,
-                min_samples_split=5, class_weight='balanced',
+                **params, class_weight='balanced',
                 random_state=42
             )
             model.fit(X_train, y_train)
@@ -106,13 +148,24 @@ def retrain_model():
             acc = accuracy_score(y_test, y_pred)
             accuracies.append(acc)
             
-            new_models[league] = (model, df_league)
-            print(f"  ✓ {league}: {acc:.1%} accuracy")
+            # Fast tier, trained on the same split
+            fast_model = train_fast_model(df_league, _le)
+            fast_acc = accuracy_score(y_test, fast_model.predict(X_test))
+
+            # Shared with the other workers through the artifact store
+            publish_fast_model(df.attrs['version'], league, fast_model)
+            new_models[league] = publish_league(df.attrs['version'], league, model, df_league, params)
+            new_fast_models[league] = fast_model
+            new_params[league] = params
+            print(f"  ✓ {league}: {acc:.1%} accuracy (fast tier {fast_acc:.1%})")
         
         # Swap models live without restarting server
+        # (publishing the dataset last tells other workers to remap)
         import predictor
-        predictor._df = df
+        predictor._df = publish_dataset(df)
         predictor._models = new_models
+        predictor._fast_models = new_fast_models
+        predictor._model_params = new_params
         
         avg_accuracy = sum(accuracies) / len(accuracies) if accuracies else 0
         print(f"✅ Pipeline: Retraining complete. Avg accuracy: {avg_accuracy:.1%}")
@@ -124,8 +177,166 @@ def retrain_model():
         raise
 
 
+def resolve_predictions():
+    """Settle pending prediction history rows using the freshly loaded matches"""
+
+    # Import here to avoid circular imports
+    import predictor
+    from resolver import resolve_pending_predictions
+
+    print("🧾 Pipeline: Resolving pending predictions...")
+    settled = resolve_pending_predictions(predictor._df)
+    print(f"  ✓ Settled {settled} predictions")
+
+    return settled
+
+
+def run_backtest():
+    """
+    Walk-forward backtest of the freshly trained models (results go to the
+    registry). Its outcome is recorded in pipeline_status["backtest_run"];
+    errors are logged there rather than raised.
+    """
+
+    # Import here to avoid circular imports
+    import backtest
+
+    print(f"📈 Pipeline: Backtesting ({BACKTEST_JOBS} jobs)...")
+    try:
+        results = backtest.run_backtest(n_jobs=BACKTEST_JOBS)
+    except Exception as e:
+        print(f"❌ Pipeline: Backtest failed: {e}")
+        pipeline_status["backtest_run"] = {
+            "status": "failed", "finished_at": datetime.now().isoformat(), "error": str(e),
+        }
+        return
+
+    for league, result in results.items():
+        print(f"  ✓ {league}: {result['tiers']['forest']['accuracy']:.1%} accuracy over {result['matches']} matches")
+    pipeline_status["backtest_run"] = {
+        "status": "success", "finished_at": datetime.now().isoformat(), "leagues": sorted(results),
+    }
+
+
+def _refresh_backtest_summary(status):
+    """
+    Copy the registry's latest backtests into status, so status polls don't
+    read the registry themselves
+    """
+
+    # Import here to avoid circular imports
+    from backtest import summary
+
+    try:
+        status["backtest"] = summary()
+    except Exception as e:
+        print(f"✗ Could not load backtest results: {e}")
+
+
+def publish_backtest_summary():
+    """Refresh the backtest results in the shared status (after a CLI backtest)"""
+    from database import SessionLocal
+    from models import PipelineState
+
+    db = SessionLocal()
+    try:
+        row = db.get(PipelineState, "status")
+        status = json.loads(row.value) if row else dict(pipeline_status)
+        _refresh_backtest_summary(status)
+        db.merge(PipelineState(name="status", value=json.dumps(status)))
+        db.commit()
+    except Exception as e:
+        print(f"✗ Could not save pipeline status: {e}")
+    finally:
+        db.close()
+
+
+def _save_status():
+    """Publish this worker's pipeline_status to the shared state table"""
+    from database import SessionLocal
+    from models import PipelineState
+
+    db = SessionLocal()
+    try:
+        db.merge(PipelineState(name="status", value=json.dumps(pipeline_status)))
+        db.commit()
+    except Exception as e:
+        print(f"✗ Could not save pipeline status: {e}")
+    finally:
+        db.close()
+
+
+def _run_in_progress():
+    """_run_lock.is_locked(), probed at most every RUN_LOCK_CHECK_SECONDS"""
+    global _run_lock_probe
+    checked_at, locked = _run_lock_probe
+    if time.monotonic() - checked_at >= RUN_LOCK_CHECK_SECONDS:
+        locked = _run_lock.is_locked()
+        _run_lock_probe = (time.monotonic(), locked)
+    return locked
+
+
+def get_pipeline_status():
+    """Pipeline status as last published by whichever worker ran it"""
+    from database import SessionLocal
+    from models import PipelineState
+
+    db = SessionLocal()
+    try:
+        row = db.get(PipelineState, "status")
+        status = json.loads(row.value) if row else dict(pipeline_status)
+    except Exception as e:
+        print(f"✗ Could not load pipeline status: {e}")
+        status = dict(pipeline_status)
+    finally:
+        db.close()
+
+    # A worker that died mid-run leaves "running" behind but not the lock
+    if status["status"] == "running" and not _run_in_progress():
+        status["status"] = "failed"
+        status["last_error"] = "Pipeline run was interrupted"
+
+    # Rows saved before the backtest summary was stored have none
+    status.setdefault("backtest", {})
+    return status
+
+
 def run_pipeline():
-    """Full pipeline: download data + retrain model"""
+    """
+    Run the pipeline now unless a run is already in progress anywhere.
+    Returns False if it was skipped for that reason.
+    """
+    if not _run_lock.acquire():
+        print("⏭️ Pipeline already running - skipping")
+        return False
+
+    try:
+        profiling.call(profiling.PIPELINE, _run_pipeline)
+    finally:
+        _run_lock.release()
+    return True
+
+
+def start_pipeline_run():
+    """
+    Start a run in a background thread (for manual triggers).
+    Returns False, without starting anything, if a run is already in progress.
+    """
+    if not _run_lock.acquire():
+        return False
+
+    def run():
+        try:
+            profiling.call(profiling.PIPELINE, _run_pipeline)
+        finally:
+            _run_lock.release()
+
+    threading.Thread(target=run, daemon=True).start()
+    return True
+
+
+def _run_pipeline():
+    """Full pipeline: download data + retrain model + settle predictions"""
     
     print(f"\n{'='*50}")
     print(f"🚀 Pipeline starting at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -133,6 +344,7 @@ def run_pipeline():
     
     pipeline_status["last_run"] = datetime.now().isoformat()
     pipeline_status["status"] = "running"
+    _save_status()
     
     try:
         # Step 1: Download fresh data
@@ -146,12 +358,19 @@ def run_pipeline():
         
         # Step 2: Retrain model
         accuracy = retrain_model()
-        
+
+        # Step 3: Settle pending user predictions against the new results
+        pipeline_status["predictions_resolved"] = resolve_predictions()
+
         # Update status
         pipeline_status["last_success"] = datetime.now().isoformat()
         pipeline_status["model_accuracy"] = f"{accuracy:.1%}"
         pipeline_status["status"] = "success"
         pipeline_status["last_error"] = None
+
+        # Step 4 (optional): Backtest the new models (its failures don't fail the run)
+        if BACKTEST_AFTER_RETRAIN:
+            run_backtest()
         
         print(f"✅ Pipeline complete at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
@@ -160,12 +379,26 @@ def run_pipeline():
         pipeline_status["last_error"] = str(e)
         print(f"❌ Pipeline failed: {e}")
 
+    finally:
+        _refresh_backtest_summary(pipeline_status)
+        _save_status()
+
+
+def _elect_leader(scheduler):
+    """Take over (or give up) scheduling the weekly run"""
+
+    if _leader_lock.held:
+        if _leader_lock.check():
+            return
+        # Lost the lock (e.g. the database connection dropped)
+        print("⚠️ Pipeline scheduler: lost leadership")
+        for job_id in ('weekly_pipeline', 'prune_idempotency_keys'):
+            if scheduler.get_job(job_id):
+                scheduler.remove_job(job_id)
+
+    if not _leader_lock.acquire():
+        return
 
-def start_scheduler():
-    """Start background scheduler - runs pipeline weekly"""
-    
-    scheduler = BackgroundScheduler()
-    
     # Run every Monday at 3am
     scheduler.add_job(
         run_pipeline,
@@ -173,10 +406,79 @@ def start_scheduler():
         day_of_week='mon',
         hour=3,
         minute=0,
-        id='weekly_pipeline'
+        id='weekly_pipeline',
+        replace_existing=True
+    )
+    scheduler.add_job(
+        prune_idempotency_keys,
+        trigger='interval',
+        hours=1,
+        next_run_time=datetime.now(),
+        id='prune_idempotency_keys',
+        replace_existing=True
+    )
+    print("✓ Pipeline scheduler: this worker runs the pipeline every Monday at 3am")
+
+
+def prune_idempotency_keys():
+    """Delete idempotency keys older than IDEMPOTENCY_KEY_TTL_HOURS"""
+
+    # Import here to avoid circular imports
+    from database import engine
+    from models import IdempotencyKey
+
+    cutoff = datetime.utcnow() - timedelta(hours=IDEMPOTENCY_KEY_TTL_HOURS)
+    try:
+        with engine.begin() as conn:
+            deleted = conn.execute(
+                IdempotencyKey.__table__.delete().where(IdempotencyKey.created_at < cutoff)
+            ).rowcount
+    except Exception as e:
+        print(f"✗ Could not prune idempotency keys: {e}")
+        return
+    if deleted:
+        print(f"✓ Pruned {deleted} expired idempotency keys")
+
+
+def sync_models():
+    """
+    Pick up models another worker published (remaps files, no retraining),
+    and drop forests whose league has been tuned since they were trained
+    """
+
+    # Import here to avoid circular imports
+    from predictor import refresh_from_artifacts, retire_stale_models
+
+    try:
+        if not refresh_from_artifacts():
+            for league in retire_stale_models():
+                print(f"🔧 New tuned parameters for {league} - model will be retrained")
+    except Exception as e:
+        print(f"✗ Could not load published models: {e}")
+
+
+def start_scheduler():
+    """Start background scheduler - the leader worker runs the pipeline weekly"""
+    
+    scheduler = BackgroundScheduler()
+
+    scheduler.add_job(
+        sync_models,
+        trigger='interval',
+        seconds=ARTIFACT_CHECK_SECONDS,
+        id='sync_models'
+    )
+
+    scheduler.add_job(
+        _elect_leader,
+        trigger='interval',
+        seconds=LEADER_CHECK_SECONDS,
+        args=[scheduler],
+        next_run_time=datetime.now(),
+        id='pipeline_leader'
     )
     
     scheduler.start()
-    print("✓ Pipeline scheduler started - runs every Monday at 3am")
+    print("✓ Pipeline scheduler started")
     
     return scheduler
\ No newline at end of file
@@ -1,11 +1,22 @@
 """Soccer match predictor - refactored from interactive script to API-ready function"""
 
 import pandas as pd
+import numpy as np
 import os
+import threading
+import zlib
 from sklearn.model_selection import train_test_split, GridSearchCV, TimeSeriesSplit
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import LabelEncoder
 import joblib
+import artifacts
+import metrics
+import registry
+import simulator
+import tiers
+from elo import EloRatings
+from poisson import PoissonModel
+from team_search import TeamIndex
 
 # Directory paths for local dataset and saved model (if used)
 DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
@@ -27,7 +38,8 @@ FEATURES = [
     'home_form', 'away_form',
     'h2h_home_goals', 'h2h_away_goals',
     'h2h_home_conceded', 'h2h_away_conceded',
-    'home_advantage'
+    'home_advantage',
+    'home_elo', 'away_elo', 'elo_diff'
 ]
 
 
@@ -60,6 +72,13 @@ def load_data():
     df['winner'] = df['result'].map({'H': 'home', 'A': 'away', 'D': 'draw'})
     df = df.dropna(subset=['winner'])
 
+    # Content fingerprint of the match data: changes whenever new results
+    # arrive and is identical across workers (used for HTTP ETags)
+    fingerprint = pd.util.hash_pandas_object(
+        df[['Date', 'home_team', 'away_team', 'home_goals', 'away_goals']], index=False
+    )
+    df.attrs['version'] = f"{len(df)}-{int(fingerprint.sum()) & 0xFFFFFFFFFFFF:x}"
+
     return df
 
 
@@ -129,10 +148,30 @@ def engineer_features(df, league):
     df_league['h2h_home_conceded'] = h2h_home_conceded
     df_league['h2h_away_conceded'] = h2h_away_conceded
 
+    # Elo ratings going into each match (only earlier results count)
+    home_elo, away_elo, rows = EloRatings().update(df_league)
+    df_league.loc[rows, 'home_elo'] = home_elo
+    df_league.loc[rows, 'away_elo'] = away_elo
+    df_league['elo_diff'] = df_league['home_elo'] - df_league['away_elo']
+
     return df_league
 
 
-def train_model(df_league, le):
+# Forest hyperparameters, unless the registry has tuned ones for the league
+DEFAULT_PARAMS = {
+    "n_estimators": 100,
+    "max_depth": 10,
+    "min_samples_split": 5,
+}
+
+
+def model_params(league):
+    """Forest hyperparameters for a league (tuned by `python -m tuning`, else the defaults)"""
+    tuned = registry.get("params", league) or {}
+    return {**DEFAULT_PARAMS, **tuned.get("params", {})}
+
+
+def train_model(df_league, le, params=None):
     """Train Random Forest model on league data"""
 
     # Keep only rows where all required features and labels exist
@@ -149,11 +188,9 @@ def train_model(df_league, le):
         X, y, test_size=0.2, shuffle=False
     )
 
-    # Train with fixed parameters for speed (avoids grid search during API usage)
+    # Train with fixed parameters for speed (grid search runs offline, see tuning.py)
     model = RandomForestClassifier(
-        n_estimators=100,
-        max_depth=10,
-        min_samples_split=5,
+        **(params or DEFAULT_PARAMS),
         class_weight='balanced',
         random_state=42
     )
@@ -162,6 +199,19 @@ def train_model(df_league, le):
     return model
 
 
+def train_fast_model(df_league, le):
+    """Train the fast tier (logistic regression) on the same split as train_model"""
+
+    df_league = df_league.dropna(subset=FEATURES + ['winner'])
+    X = df_league[FEATURES]
+    y = le.transform(df_league['winner'])
+
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, shuffle=False
+    )
+    return tiers.LinearModel.fit(X_train, y_train)
+
+
 def get_recent_form(df, team, num_matches=5):
     """Get recent form stats for a team"""
 
@@ -191,9 +241,64 @@ def get_recent_form(df, team, num_matches=5):
     return avg_scored, avg_conceded, form
 
 
+def _source_mtime():
+    """Latest modification time of the dataset CSVs"""
+    paths = [os.path.join(DATA_DIR, file) for file in FILES]
+    return max((os.path.getmtime(path) for path in paths if os.path.exists(path)), default=None)
+
+
+def publish_dataset(df):
+    """
+    Publish df to the shared artifact store and return the memory-mapped
+    copy to use instead (or df itself if artifacts are off or unwritable).
+    """
+    if not artifacts.ENABLED:
+        return df
+    try:
+        return artifacts.publish_dataset(df, _source_mtime())
+    except OSError as e:
+        print(f"✗ Could not publish dataset: {e}")
+        return df
+
+
+def publish_league(version, league, model, df_league, params):
+    """Like publish_dataset, for one league's (model, df_league), trained with params"""
+    if not artifacts.ENABLED:
+        return model, df_league
+    try:
+        return artifacts.publish_league(version, league, model, df_league, FEATURES, params)
+    except OSError as e:
+        print(f"✗ Could not publish model for {league}: {e}")
+        return model, df_league
+
+
+def publish_fast_model(version, league, model):
+    """Like publish_league, for a league's fast-tier model"""
+    if not artifacts.ENABLED:
+        return
+    try:
+        artifacts.publish_fast_model(version, league, model, FEATURES)
+    except OSError as e:
+        print(f"✗ Could not publish fast model for {league}: {e}")
+
+
+def _load_shared_data():
+    """
+    Map the dataset another worker already published for these CSVs,
+    or load the CSVs and publish them for the next worker.
+    """
+    if artifacts.ENABLED:
+        current = artifacts.read_current()
+        if current and current.get("source_mtime") == _source_mtime():
+            df = artifacts.load_dataset(current["version"])
+            if df is not None:
+                return df
+    return publish_dataset(load_data())
+
+
 # Global variables - loaded once when server starts (improves API performance)
 print("Loading soccer prediction model...")
-_df = load_data()
+_df = _load_shared_data()
 
 # LabelEncoder maps ['away', 'draw', 'home'] -> integers for the model
 _le = LabelEncoder()
@@ -201,6 +306,10 @@ _le.fit(['away', 'draw', 'home'])  # Ensure all classes are always present
 
 # Cache trained models per league to avoid retraining for every request
 _models = {}
+_fast_models = {}
+
+# Forest hyperparameters each cached model was trained with
+_model_params = {}
 
 print("✓ Data loaded successfully")
 
@@ -211,14 +320,305 @@ def get_available_teams():
     return sorted(teams)
 
 
-def predict_match(home_team: str, away_team: str) -> dict:
+def data_version():
+    """Version string of the currently loaded match data"""
+    return _df.attrs.get('version')
+
+
+# Autocomplete index over dataset team names (rebuilt when the pipeline swaps _df)
+_team_index = None
+_team_index_df = None
+
+
+def get_team_index():
+    """Return a TeamIndex over get_available_teams() for the current dataset"""
+    global _team_index, _team_index_df
+
+    if _team_index is None or _team_index_df is not _df:
+        _team_index = TeamIndex(get_available_teams())
+        _team_index_df = _df
+    return _team_index
+
+
+# Feature frames per (dataset version, league) for leagues whose forest
+# isn't loaded, so the fast tier doesn't rebuild or reload them per request
+_league_features = {}
+_league_features_lock = threading.Lock()
+
+
+def get_league_features(league):
+    """
+    engineer_features(_df, league), computed once per dataset version: from
+    the loaded model or this worker's cache, else the artifact store, else
+    computed and published.
+    """
+    if league in _models:
+        return _models[league][1]
+
+    version = data_version()
+    df_league = _league_features.get((version, league))
+    if df_league is not None:
+        return df_league
+
+    df_league = artifacts.load_features(version, league, FEATURES) if artifacts.ENABLED else None
+    if df_league is None:
+        df_league = engineer_features(_df, league)
+        if artifacts.ENABLED:
+            try:
+                df_league = artifacts.publish_features(version, league, df_league, FEATURES)
+            except OSError as e:
+                print(f"✗ Could not publish features for {league}: {e}")
+
+    with _league_features_lock:
+        # Frames for an older dataset are no longer needed
+        for old in [k for k in _league_features if k[0] != version]:
+            del _league_features[old]
+        _league_features[(version, league)] = df_league
+    return df_league
+
+
+def get_league_model(league):
+    """
+    Return (model, df_league) for a league: from this worker's cache, else
+    mapped from the artifact store, else trained here and published.
+    """
+    if league not in _models:
+        version = data_version()
+        params = model_params(league)
+        loaded = artifacts.load_league(version, league, FEATURES, params) if artifacts.ENABLED else None
+
+        if loaded is None:
+            print(f"Training model for {league}...")
+            df_league = get_league_features(league)
+            model = train_model(df_league, _le, params)
+            loaded = publish_league(version, league, model, df_league, params)
+            get_fast_model(league)  # train the fast tier alongside
+            print(f"✓ Model ready for {league}")
+
+        _models[league] = loaded
+        _model_params[league] = params
+
+    return _models[league]
+
+
+def get_fast_model(league):
+    """
+    Return the league's fast-tier model: cached, published by another
+    worker, or trained here (well under a second) and published.
+    """
+    if league not in _fast_models:
+        version = data_version()
+        model = artifacts.load_fast_model(version, league, FEATURES) if artifacts.ENABLED else None
+
+        if model is None:
+            model = train_fast_model(get_league_features(league), _le)
+            publish_fast_model(version, league, model)
+
+        _fast_models[league] = model
+
+    return _fast_models[league]
+
+
+def refresh_from_artifacts():
+    """
+    Switch to the dataset/models another worker published, if newer than
+    ours (remapping the files instead of retraining). Returns True if switched.
+    """
+    global _df, _models, _fast_models, _model_params
+
+    if not artifacts.ENABLED:
+        return False
+
+    current = artifacts.read_current()
+    if not current or current["version"] == data_version():
+        return False
+
+    df = artifacts.load_dataset(current["version"])
+    if df is None:
+        return False
+
+    # League models are mapped on first use
+    _df = df
+    _models = {}
+    _fast_models = {}
+    _model_params = {}
+    print(f"✓ Switched to published model version {current['version']}")
+    return True
+
+
+def retire_stale_models():
+    """
+    Drop cached forests whose league has been tuned (`python -m tuning`)
+    since they were trained, so the next request maps or trains one with
+    the new parameters. Returns the leagues dropped.
+    """
+    # Only leagues that have registry entries are compared, so a failed
+    # read (no entries) never retires anything
+    tuned = registry.get_all("params")
+    stale = [
+        league for league, params in list(_model_params.items())
+        if league in tuned and {**DEFAULT_PARAMS, **tuned[league].get("params", {})} != params
+    ]
+    for league in stale:
+        _models.pop(league, None)
+        _model_params.pop(league, None)
+    return stale
+
+
+# Poisson fits per (dataset version, league) - ~10ms each, so not shared
+_poisson_models = {}
+_poisson_lock = threading.Lock()
+
+
+def get_poisson_model(league):
+    """Return the Poisson/Dixon-Coles model for a league, fitting it if needed"""
+    key = (data_version(), league)
+    with _poisson_lock:
+        if key not in _poisson_models:
+            # Fits for an older dataset are no longer needed
+            for old in [k for k in _poisson_models if k[0] != key[0]]:
+                del _poisson_models[old]
+            _poisson_models[key] = PoissonModel.fit(_df[_df['league'] == league])
+        return _poisson_models[key]
+
+
+# Elo ratings per league, with the dataset version they are up to date with
+_elo = {}
+_elo_lock = threading.Lock()
+
+
+def get_elo(league):
+    """
+    Elo ratings for a league. When the dataset changes, only results newer
+    than the last one processed are applied.
+    """
+    with _elo_lock:
+        ratings, version = _elo.get(league, (None, None))
+        if ratings is None:
+            ratings = EloRatings()
+        if version != data_version():
+            ratings.update(_df[_df['league'] == league])
+            _elo[league] = (ratings, data_version())
+        return ratings
+
+
+def fixture_probabilities(league, fixtures, engine="poisson"):
+    """
+    Home/draw/away probabilities (n x 3 array) for (home, away) team pairs
+    in a league. The Poisson engine scores all fixtures in one vectorized
+    call; the forest goes through predict_match per fixture.
+    """
+    if engine == "poisson":
+        model = get_poisson_model(league)
+        home = [model.index[h] for h, _ in fixtures]
+        away = [model.index[a] for _, a in fixtures]
+        return np.column_stack(model.outcome_probabilities(home, away))
+
+    rows = []
+    for home, away in fixtures:
+        probs = predict_match(home, away, tier="forest")["probabilities"]
+        rows.append([probs["home_win"], probs["draw"], probs["away_win"]])
+    return np.array(rows).reshape(-1, 3)
+
+
+# Simulation results per (dataset version, league, engine, sims); sims is
+# always one of simulator.SIMULATION_COUNTS, so this stays bounded
+_simulations = {}
+_simulations_lock = threading.Lock()
+
+
+def simulate_league(league, n_sims=10_000, engine="poisson"):
+    """
+    Projected final table for a league's current season from n_sims Monte
+    Carlo simulations of its remaining fixtures, rounded up to one of
+    simulator.SIMULATION_COUNTS. Cached per dataset version.
+    """
+    n_sims = simulator.simulation_count(n_sims)
+    key = (data_version(), league, engine, n_sims)
+    if key in _simulations:
+        return _simulations[key]
+
+    df_league = _df[_df['league'] == league]
+    teams, table, remaining = simulator.current_season(df_league)
+    probs = fixture_probabilities(league, remaining, engine)
+
+    # Seeded from the key, so every worker produces the same projection
+    seed = zlib.crc32(repr(key).encode())
+    result = {
+        "league": league,
+        "engine": engine,
+        "season_start": simulator.season_start(df_league['Date']).date().isoformat(),
+        "simulations": n_sims,
+        "remaining_fixtures": len(remaining),
+        "teams": simulator.simulate_season(
+            teams, table, remaining, probs, n_sims, seed,
+            simulator.RELEGATION_PLACES.get(league, 3),
+        ),
+    }
+
+    with _simulations_lock:
+        # Results for an older dataset are no longer needed
+        for old in [k for k in _simulations if k[0] != key[0]]:
+            del _simulations[old]
+        _simulations[key] = result
+    return result
+
+
+def _outcome_text(winner, home_match, away_match):
+    """Convert a winner class into a human-friendly label"""
+    if winner == 'home':
+        return f"{home_match} Win"
+    if winner == 'away':
+        return f"{away_match} Win"
+    return "Draw"
+
+
+def _predict_poisson(home_match, away_match, league):
+    """predict_match for the Poisson engine: outcome plus scoreline grid"""
+    model = get_poisson_model(league)
+    if away_match not in model.index:
+        return {"error": f"{away_match} has no {league} matches in the dataset"}
+
+    result = model.predict(home_match, away_match)
+    probs = result["probabilities"]
+    winner = max(probs, key=probs.get)
+
+    return {
+        "home_team": home_match,
+        "away_team": away_match,
+        "league": league,
+        "engine": "poisson",
+        "prediction": _outcome_text(winner, home_match, away_match),
+        "winner": winner,
+        "probabilities": {
+            "home_win": round(probs["home"], 3),
+            "draw": round(probs["draw"], 3),
+            "away_win": round(probs["away"], 3)
+        },
+        "confidence": round(probs[winner] * 100, 1),
+        "expected_goals": result["expected_goals"],
+        "scorelines": result["scorelines"],
+        "over_under": result["over_under"],
+        "grid": result["grid"]
+    }
+
+
+def predict_match(home_team: str, away_team: str, engine: str = "forest",
+                  tier: str = "auto", latency_budget_ms: float = None) -> dict:
     """
     Predict match outcome given home and away team names.
 
     Returns a JSON-serializable dictionary containing the predicted winner,
-    class probabilities, and a confidence score.
+    class probabilities, and a confidence score. engine="poisson" uses the
+    scoreline model instead of the forest and adds expected goals, likely
+    scorelines, over/under probabilities and the full scoreline grid.
+    For the forest engine, tier picks the forest or the fast model ("auto"
+    decides from the latency budget and load, see tiers.py); the response
+    says which one answered.
     """
 
+    stages = metrics.stages("predict_match")
+
     # Validate teams exist in dataset
     all_teams = pd.concat([_df['home_team'], _df['away_team']]).unique()
 
@@ -237,15 +637,30 @@ def predict_match(home_team: str, away_team: str) -> dict:
         return {"error": f"Could not determine league for {home_match}"}
 
     league = league_rows.iloc[0]
+    stages.mark("resolve_teams")
 
-    # Train or load cached model for this league
-    if league not in _models:
-        print(f"Training model for {league}...")
-        df_league = engineer_features(_df, league)
-        _models[league] = (train_model(df_league, _le), df_league)
-        print(f"✓ Model ready for {league}")
+    if engine == "poisson":
+        result = _predict_poisson(home_match, away_match, league)
+        stages.mark("poisson")
+        return result
 
-    model, df_league = _models[league]
+    tier, reason = tiers.choose(tier, latency_budget_ms)
+    with tiers.track(tier):
+        result = _predict_tier(home_match, away_match, league, tier, stages)
+    result["tier"] = tier
+    result["tier_reason"] = reason
+    return result
+
+
+def _predict_tier(home_match, away_match, league, tier, stages):
+    """predict_match for the forest engine, answered by the given model tier"""
+
+    # Train or load cached model for this league (the fast tier doesn't need the forest)
+    if tier == "fast":
+        model, df_league = get_fast_model(league), get_league_features(league)
+    else:
+        model, df_league = get_league_model(league)
+    stages.mark("load_model")
 
     # Filter down to a "current season" window for recent form calculations
     season_start = pd.to_datetime("2025-08-01")
@@ -276,6 +691,11 @@ def predict_match(home_team: str, away_team: str) -> dict:
     home_advantage = (home_team_form if pd.notna(home_team_form) else 0) - \
                      (away_team_form if pd.notna(away_team_form) else 0)
 
+    # Current Elo ratings (incrementally maintained, not recomputed)
+    elo = get_elo(league)
+    home_elo = elo.rating(home_match)
+    away_elo = elo.rating(away_match)
+
     # Build single-row feature vector for prediction
     features = pd.DataFrame([{
         'home_recent_goals': home_scored,
@@ -288,12 +708,18 @@ def predict_match(home_team: str, away_team: str) -> dict:
         'h2h_away_goals': h2h_ag,
         'h2h_home_conceded': h2h_hc,
         'h2h_away_conceded': h2h_ac,
-        'home_advantage': home_advantage
+        'home_advantage': home_advantage,
+        'home_elo': home_elo,
+        'away_elo': away_elo,
+        'elo_diff': home_elo - away_elo
     }])
 
-    # Predict winner class and probability distribution
-    pred_encoded = model.predict(features)[0]
+    stages.mark("feature_build")
+
+    # Predict probability distribution; the winner is its most likely class
     pred_probs = model.predict_proba(features)[0]
+    stages.mark("predict_proba")
+    pred_encoded = model.classes_[pred_probs.argmax()]
     pred_winner = _le.inverse_transform([pred_encoded])[0]
 
     # Convert probabilities into a readable dict
@@ -302,17 +728,13 @@ def predict_match(home_team: str, away_team: str) -> dict:
         prob_dict[label] = round(float(prob), 3)
 
     # Convert model output into a human-friendly label
-    if pred_winner == 'home':
-        prediction_text = f"{home_match} Win"
-    elif pred_winner == 'away':
-        prediction_text = f"{away_match} Win"
-    else:
-        prediction_text = "Draw"
+    prediction_text = _outcome_text(pred_winner, home_match, away_match)
 
     return {
         "home_team": home_match,
         "away_team": away_match,
         "league": league,
+        "engine": "forest",
         "prediction": prediction_text,
         "winner": pred_winner,
         "probabilities": {
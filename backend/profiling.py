@@ -0,0 +1,505 @@
+"""
+On-demand profiling of one route or pipeline run, and memory snapshots of
+the loaded data and models (served to admins by routers/admin.py).
+
+A session profiles calls to one target - a route's path template
+("/api/predictions/predict") or "pipeline" for pipeline runs - until it is
+stopped or its time is up (at most MAX_SECONDS). Two modes:
+
+    deterministic   cProfile around each call, merged into one pstats file
+                    (python -m pstats, snakeviz, gprof2dot...)
+    sample          a thread reads the stacks of threads inside a profiled
+                    call every interval_ms and counts them as collapsed
+                    stacks ("frame;frame;frame count"), for flamegraph.pl
+                    or speedscope
+
+Nothing is profiled outside a session: a route's endpoint is only wrapped
+while one is running, and the pipeline hook is an attribute check.
+Only one cProfile runs per process at a time (from Python 3.12 they share
+the interpreter-wide sys.monitoring hooks and a second one can't start),
+so in deterministic mode calls that overlap a profiled one run unprofiled
+and are counted as skipped. In sample mode every sync endpoint call and
+pipeline run on its own thread is sampled. Async endpoints share the event
+loop thread, so while one is being profiled the profiler also sees
+whatever else the loop runs. Work the target hands to other processes
+(joblib, the simulator pool) isn't seen.
+
+memory_report() sizes _df, _models and _fast_models, and if tracemalloc is
+tracing, lists the predictor.py lines their allocations came from. Start
+tracing at import with PROFILE_TRACEMALLOC_FRAMES (so the initial data load
+is traced) or later with start_tracing() (so only later loads and retrains
+are). Sessions and snapshots are per worker process.
+"""
+
+import cProfile
+import functools
+import inspect
+import io
+import linecache
+import marshal
+import mmap
+import os
+import pickle
+import pstats
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+
+# Longest a profiling session may run (seconds)
+MAX_SECONDS = int(os.getenv("PROFILE_MAX_SECONDS", 300))
+
+# Default time between stack samples in sample mode (ms)
+INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", 5))
+
+# Frames kept per allocation when tracemalloc is started at import (0 = don't).
+# Tracing slows every allocation down and uses memory, so it's off by default.
+TRACEMALLOC_FRAMES = int(os.getenv("PROFILE_TRACEMALLOC_FRAMES", 0))
+if TRACEMALLOC_FRAMES and not tracemalloc.is_tracing():
+    tracemalloc.start(TRACEMALLOC_FRAMES)
+
+MODES = ("sample", "deterministic")
+PIPELINE = "pipeline"
+FORMATS = {"deterministic": ("pstats", "text"), "sample": ("collapsed",)}
+
+# Lines of the text report
+TEXT_LINES = 50
+
+_session = None
+_lock = threading.Lock()
+
+# Held while a cProfile.Profile is enabled anywhere in the process
+_cprofile_lock = threading.Lock()
+
+
+class Session:
+    """One profiling session: target, mode, deadline and what it has collected"""
+
+    def __init__(self, target, mode, seconds, interval_ms):
+        self.target = target
+        self.mode = mode
+        self.seconds = seconds
+        self.interval_ms = interval_ms
+        self.started = time.time()
+        self.ends = self.started + seconds
+        self.finished = None
+        self.calls = 0
+        self.skipped = 0
+        self.samples = 0
+        self.stacks = Counter()
+        self.stats = None  # pstats.Stats, once a call has been profiled
+        self._threads = set()  # idents of threads inside a profiled call
+        self._routes = []  # (route, original endpoint, wrapper) while wrapped
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+
+    def running(self):
+        return not self._stopped.is_set() and time.time() < self.ends
+
+    def status(self):
+        status = {
+            "target": self.target,
+            "mode": self.mode,
+            "seconds": self.seconds,
+            "running": self.running(),
+            "started_at": datetime.fromtimestamp(self.started).isoformat(),
+            "ends_at": datetime.fromtimestamp(self.finished or self.ends).isoformat(),
+            "calls": self.calls,
+            "formats": list(FORMATS[self.mode]),
+        }
+        if self.mode == "sample":
+            status["interval_ms"] = self.interval_ms
+            status["samples"] = self.samples
+        else:
+            status["skipped"] = self.skipped
+        return status
+
+    def attach(self, route):
+        """Profile calls to a FastAPI route's endpoint until the session stops"""
+        original = route.dependant.call
+        session = self
+
+        # FastAPI decided when the route was built whether to await the
+        # endpoint or run it in the threadpool, so the wrapper must match
+        if inspect.iscoroutinefunction(original):
+            @functools.wraps(original)
+            async def endpoint(*args, **kwargs):
+                if not session.running():
+                    return await original(*args, **kwargs)
+                return await session.run_async(original, args, kwargs)
+        else:
+            @functools.wraps(original)
+            def endpoint(*args, **kwargs):
+                if not session.running():
+                    return original(*args, **kwargs)
+                return session.run(original, args, kwargs)
+
+        route.dependant.call = endpoint
+        self._routes.append((route, original, endpoint))
+
+    def stop(self):
+        """End the session and put the original endpoints back"""
+        self._stopped.set()
+        with self._lock:
+            if self.finished is None:
+                self.finished = min(time.time(), self.ends)
+            routes, self._routes = self._routes, []
+        for route, original, endpoint in routes:
+            if route.dependant.call is endpoint:
+                route.dependant.call = original
+
+    def run(self, fn, args, kwargs):
+        """fn(*args, **kwargs) on this thread, profiled"""
+        ident = threading.get_ident()
+        if not self._enter(ident):
+            return fn(*args, **kwargs)
+        profile = self._start_profile()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self._leave(ident, profile)
+
+    async def run_async(self, fn, args, kwargs):
+        """await fn(*args, **kwargs), profiled (one at a time per event loop)"""
+        ident = threading.get_ident()
+        if not self._enter(ident):
+            return await fn(*args, **kwargs)
+        profile = self._start_profile()
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            self._leave(ident, profile)
+
+    def _enter(self, ident):
+        """
+        False if the call shouldn't be profiled: it is nested in (or, on
+        the event loop, overlaps) a profiled call on the same thread, or in
+        deterministic mode another call holds the process's cProfile
+        """
+        with self._lock:
+            if ident in self._threads:
+                return False
+            if self.mode == "deterministic" and not _cprofile_lock.acquire(blocking=False):
+                self.skipped += 1
+                return False
+            self._threads.add(ident)
+            return True
+
+    def _start_profile(self):
+        """An enabled cProfile.Profile in deterministic mode, else None"""
+        if self.mode != "deterministic":
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # A debugger or another profiler owns the hooks
+            return None
+        return profile
+
+    def _leave(self, ident, profile):
+        if profile is not None:
+            profile.disable()
+        with self._lock:
+            self._threads.discard(ident)
+            if self.mode == "deterministic":
+                _cprofile_lock.release()
+                if profile is None:
+                    self.skipped += 1
+                    return
+            self.calls += 1
+            if profile is not None:
+                if self.stats is None:
+                    self.stats = pstats.Stats(profile)
+                else:
+                    self.stats.add(profile)
+
+    def sample(self):
+        """Sampler thread: count the stacks of profiled threads every interval"""
+        while not self._stopped.wait(self.interval_ms / 1000) and time.time() < self.ends:
+            frames = sys._current_frames()
+            with self._lock:
+                for ident in self._threads:
+                    frame = frames.get(ident)
+                    if frame is not None:
+                        self.stacks[_collapse(frame)] += 1
+                        self.samples += 1
+            del frames
+
+    def result(self, fmt):
+        """(content, media type, file extension) of the results so far"""
+        if fmt not in FORMATS[self.mode]:
+            raise ValueError(
+                f"A {self.mode} session has {' or '.join(FORMATS[self.mode])} results, not {fmt}"
+            )
+
+        with self._lock:
+            if fmt == "collapsed":
+                lines = [f"{stack} {count}" for stack, count in self.stacks.most_common()]
+                return "\n".join(lines) + "\n", "text/plain; charset=utf-8", "collapsed.txt"
+            if self.stats is None:
+                raise LookupError("No calls have been profiled yet")
+            if fmt == "pstats":
+                # The format Stats.dump_stats writes and pstats.Stats(path) reads
+                return marshal.dumps(self.stats.stats), "application/octet-stream", "prof"
+            out = io.StringIO()
+            stats = pstats.Stats(stream=out)
+            stats.add(self.stats)
+        stats.sort_stats("cumulative").print_stats(TEXT_LINES)
+        return out.getvalue(), "text/plain; charset=utf-8", "txt"
+
+
+# Stacks are cut at the session's own frames, so they start at the target
+_ROOT_CODES = {Session.run.__code__, Session.run_async.__code__}
+
+
+def _collapse(frame):
+    """"outer (file:line);...;inner (file:line)" for a thread's current stack"""
+    names = []
+    while frame is not None and frame.f_code not in _ROOT_CODES:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def start(target, mode="sample", seconds=30, interval_ms=INTERVAL_MS, routes=()):
+    """
+    Profile target ("pipeline" or the path template of one of routes, e.g.
+    app.routes) for up to seconds. Raises ValueError for a bad target or
+    settings and RuntimeError if a session is already running.
+    """
+    global _session
+
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {', '.join(MODES)}")
+    if not 0 < seconds <= MAX_SECONDS:
+        raise ValueError(f"seconds must be between 0 and {MAX_SECONDS}")
+    if interval_ms <= 0:
+        raise ValueError("interval_ms must be positive")
+
+    matched = [
+        route for route in routes
+        if getattr(route, "path", None) == target and getattr(route, "dependant", None) is not None
+    ]
+    if target != PIPELINE and not matched:
+        raise ValueError(f"No route '{target}' (give a path template like /api/teams/{{team_id}}, or 'pipeline')")
+
+    with _lock:
+        if _session is not None and _session.running():
+            raise RuntimeError(f"Already profiling {_session.target} until {_session.status()['ends_at']}")
+        if _session is not None:
+            _session.stop()
+        session = _session = Session(target, mode, seconds, interval_ms)
+        for route in matched:
+            session.attach(route)
+
+    if mode == "sample":
+        threading.Thread(target=session.sample, name="profiler-sampler", daemon=True).start()
+    timer = threading.Timer(seconds, session.stop)
+    timer.daemon = True
+    timer.start()
+
+    print(f"🔬 Profiling {target} ({mode}) for {seconds:g}s")
+    return session.status()
+
+
+def stop():
+    """Stop the current session early; returns its status (LookupError if there is none)"""
+    if _session is None:
+        raise LookupError("No profiling session")
+    _session.stop()
+    return _session.status()
+
+
+def status():
+    """Status of the current or last session, or None"""
+    return _session.status() if _session is not None else None
+
+
+def result(fmt):
+    """
+    (content, media type, filename) of the current or last session's results
+    in fmt: pstats or text for deterministic sessions, collapsed for sampled.
+    """
+    session = _session
+    if session is None:
+        raise LookupError("No profiling session")
+    content, media_type, extension = session.result(fmt)
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", session.target).strip("-") or "root"
+    stamp = datetime.fromtimestamp(session.started).strftime("%Y%m%d-%H%M%S")
+    return content, media_type, f"profile-{slug}-{stamp}.{extension}"
+
+
+def call(target, fn, *args, **kwargs):
+    """fn(*args, **kwargs), profiled if a session for target is running (hook for non-route targets)"""
+    session = _session
+    if session is None or session.target != target or not session.running():
+        return fn(*args, **kwargs)
+    return session.run(fn, args, kwargs)
+
+
+def _is_mapped(array):
+    """True if a NumPy array's memory is a file mapping (artifacts load models with mmap)"""
+    import numpy as np
+
+    while array is not None:
+        if isinstance(array, (np.memmap, mmap.mmap)):
+            return True
+        array = getattr(array, "base", None)
+    return False
+
+
+def _footprint(obj, seen):
+    """
+    (bytes, mapped bytes) of the arrays and frames reachable from obj.
+    Plain Python objects count their own size only; sklearn's Cython trees
+    are sized through their pickled state.
+    """
+    import numpy as np
+    import pandas as pd
+
+    if id(obj) in seen or isinstance(obj, (type, type(sys), type(_footprint))):
+        return 0, 0
+    seen.add(id(obj))
+
+    if isinstance(obj, np.ndarray):
+        return (0, obj.nbytes) if _is_mapped(obj) else (obj.nbytes, 0)
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        return int(obj.memory_usage(deep=True, index=True).sum()), 0
+    if isinstance(obj, (str, bytes, int, float, bool, type(None))):
+        return sys.getsizeof(obj), 0
+
+    if isinstance(obj, dict):
+        children = list(obj.values())
+    elif isinstance(obj, (list, tuple, set)):
+        children = list(obj)
+    elif hasattr(obj, "__dict__"):
+        children = list(vars(obj).values())
+    else:
+        state = obj.__getstate__() if hasattr(obj, "__getstate__") else None
+        children = list(state.values()) if isinstance(state, dict) else []
+
+    total, mapped = sys.getsizeof(obj), 0
+    for child in children:
+        child_total, child_mapped = _footprint(child, seen)
+        total += child_total
+        mapped += child_mapped
+    return total, mapped
+
+
+def _mb(n):
+    return round(n / 1024 / 1024, 2)
+
+
+def footprint():
+    """Memory held by _df, _models (model + feature frame) and _fast_models, per league"""
+    import predictor
+
+    df = predictor._df
+    report = {
+        "_df": {"rows": len(df), "mb": _mb(df.memory_usage(deep=True, index=True).sum())},
+        "_models": {},
+        "_fast_models": {},
+    }
+
+    # Copies, as the pipeline may swap the dicts while we walk them
+    for league, (model, df_league) in dict(predictor._models).items():
+        model_bytes, mapped = _footprint(model, set())
+        report["_models"][league] = {
+            "model": type(model).__name__,
+            "model_mb": _mb(model_bytes),
+            "mapped_mb": _mb(mapped),
+            "features_rows": len(df_league),
+            "features_mb": _mb(df_league.memory_usage(deep=True, index=True).sum()),
+        }
+    for league, model in dict(predictor._fast_models).items():
+        model_bytes, mapped = _footprint(model, set())
+        report["_fast_models"][league] = {"model_mb": _mb(model_bytes), "mapped_mb": _mb(mapped)}
+
+    return report
+
+
+def memory_report(top=20):
+    """
+    footprint(), plus while tracemalloc is tracing: traced totals, the
+    predictor.py lines behind the most live memory (each allocation counted
+    against the innermost predictor.py frame in its traceback) and the top
+    allocation sites overall.
+    """
+    report = {"footprint": footprint(), "tracemalloc": None}
+    if not tracemalloc.is_tracing():
+        return report
+
+    import predictor
+
+    snapshot = tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+    ])
+
+    by_line = Counter()
+    counts = Counter()
+    for trace in snapshot.traces:
+        # Frames run oldest to newest. Lines that import a module (pandas,
+        # sklearn...) aren't data or models, so those allocations are skipped.
+        callee = None
+        for frame in reversed(trace.traceback):
+            if frame.filename == predictor.__file__:
+                if not (callee and callee.filename.startswith("<frozen importlib")):
+                    by_line[(frame.filename, frame.lineno)] += trace.size
+                    counts[(frame.filename, frame.lineno)] += 1
+                break
+            callee = frame
+
+    current, peak = tracemalloc.get_traced_memory()
+    report["tracemalloc"] = {
+        "frames": tracemalloc.get_traceback_limit(),
+        "traced_mb": _mb(current),
+        "peak_mb": _mb(peak),
+        "predictor_lines": [
+            {
+                "line": f"predictor.py:{lineno}",
+                "code": linecache.getline(filename, lineno).strip(),
+                "mb": _mb(size),
+                "blocks": counts[(filename, lineno)],
+            }
+            for (filename, lineno), size in by_line.most_common(top)
+        ],
+        "top": [
+            {"line": str(stat.traceback[0]), "mb": _mb(stat.size), "blocks": stat.count}
+            for stat in snapshot.statistics("lineno")[:top]
+        ],
+    }
+    return report
+
+
+def memory_snapshot():
+    """
+    The current tracemalloc snapshot, pickled as Snapshot.dump writes it
+    (open with tracemalloc.Snapshot.load). LookupError if not tracing.
+    """
+    if not tracemalloc.is_tracing():
+        raise LookupError("tracemalloc isn't tracing (set PROFILE_TRACEMALLOC_FRAMES or start tracing first)")
+    return pickle.dumps(tracemalloc.take_snapshot(), pickle.HIGHEST_PROTOCOL)
+
+
+def start_tracing(frames=25):
+    """Start tracemalloc (allocations from now on are traced); returns False if already tracing"""
+    if tracemalloc.is_tracing():
+        return False
+    tracemalloc.start(frames)
+    print(f"🔬 tracemalloc started ({frames} frames)")
+    return True
+
+
+def stop_tracing():
+    """Stop tracemalloc and free its traces; returns False if it wasn't tracing"""
+    if not tracemalloc.is_tracing():
+        return False
+    tracemalloc.stop()
+    print("🔬 tracemalloc stopped")
+    return True
@@ -0,0 +1,55 @@
+"""
+Model registry - per-league training settings and evaluation results that
+the pipeline and every worker read (tuned hyperparameters, backtests...).
+
+Entries are JSON rows in the shared pipeline_state table, named
+"<kind>:<league>" (e.g. "params:England"), so they survive restarts and
+are seen by every worker on every host.
+"""
+
+import json
+
+from database import SessionLocal
+from models import Base, PipelineState
+
+
+def _name(kind, league):
+    return f"{kind}:{league}"
+
+
+def get(kind, league, default=None):
+    """The registry entry for a league, or default if there is none"""
+    db = SessionLocal()
+    try:
+        row = db.get(PipelineState, _name(kind, league))
+        return json.loads(row.value) if row else default
+    except Exception as e:
+        print(f"✗ Could not read {_name(kind, league)} from the model registry: {e}")
+        return default
+    finally:
+        db.close()
+
+
+def get_all(kind):
+    """{league: entry} for every league with an entry of this kind"""
+    db = SessionLocal()
+    try:
+        rows = db.query(PipelineState).filter(PipelineState.name.startswith(f"{kind}:")).all()
+        return {row.name.split(":", 1)[1]: json.loads(row.value) for row in rows}
+    except Exception as e:
+        print(f"✗ Could not read {kind} entries from the model registry: {e}")
+        return {}
+    finally:
+        db.close()
+
+
+def put(kind, league, value):
+    """Store (replace) the registry entry for a league"""
+    db = SessionLocal()
+    try:
+        # Offline commands may run before the server ever created the table
+        Base.metadata.create_all(bind=db.get_bind(), tables=[PipelineState.__table__])
+        db.merge(PipelineState(name=_name(kind, league), value=json.dumps(value)))
+        db.commit()
+    finally:
+        db.close()
@@ -0,0 +1,148 @@
+"""
+Outcome resolver - settles pending predictions against finished matches.
+
+Runs as a pipeline stage after fresh data is loaded. Finished matches are
+copied into a temporary table keyed by normalized (home, away) team names,
+then pending predictions are settled with a few set-based UPDATE statements
+(one per id range) instead of loading and saving rows one at a time.
+
+A prediction is settled by the first match between the same home and away
+teams played on or after the day the prediction was made.
+"""
+
+from datetime import timedelta
+
+import pandas as pd
+from sqlalchemy import (
+    Column, DateTime, Index, MetaData, String, Table,
+    and_, case, exists, false, func, literal, select,
+)
+
+from models import PredictionHistory
+
+# Predictions settled per UPDATE statement / transaction
+BATCH_SIZE = 50_000
+
+_metadata = MetaData()
+
+# Per-connection scratch table holding the finished matches we can settle against
+_results = Table(
+    "resolver_results", _metadata,
+    Column("home_key", String, nullable=False),
+    Column("away_key", String, nullable=False),
+    Column("match_day_end", DateTime, nullable=False),
+    Column("home_team", String, nullable=False),
+    Column("away_team", String, nullable=False),
+    Column("result", String, nullable=False),  # "home", "away" or "draw"
+    Index("ix_resolver_results_pair", "home_key", "away_key", "match_day_end"),
+    prefixes=["TEMPORARY"],
+)
+
+
+def normalize_team(name: str) -> str:
+    """Key used to match typed team names against dataset names"""
+    return name.strip().lower()
+
+
+def _match_rows(df, since):
+    """Finished matches on or after `since`, as rows for the scratch table"""
+    if since is not None:
+        df = df[df['Date'] >= pd.Timestamp(since).normalize() - timedelta(days=1)]
+    df = df.dropna(subset=['home_team', 'away_team', 'winner'])
+
+    return [
+        {
+            "home_key": normalize_team(home),
+            "away_key": normalize_team(away),
+            # The prediction counts if it was made before the match day ended
+            "match_day_end": date.to_pydatetime() + timedelta(days=1),
+            "home_team": home,
+            "away_team": away,
+            "result": winner,
+        }
+        for home, away, date, winner in zip(df['home_team'], df['away_team'], df['Date'], df['winner'])
+    ]
+
+
+def _settle_statement(lo, hi):
+    """UPDATE settling every pending prediction with lo <= id < hi that has a match"""
+    p = PredictionHistory.__table__
+    r = _results.c
+
+    match = and_(
+        r.home_key == func.lower(func.trim(p.c.home_team)),
+        r.away_key == func.lower(func.trim(p.c.away_team)),
+        r.match_day_end > p.c.created_at,
+    )
+
+    def first_match(column):
+        # Value from the earliest qualifying match for this prediction's pair
+        return select(column).where(match).order_by(r.match_day_end).limit(1).scalar_subquery()
+
+    actual_text = case(
+        (r.result == "draw", literal("Draw")),
+        (r.result == "home", r.home_team + " Win"),
+        else_=r.away_team + " Win",
+    )
+
+    # predicted_outcome is "<team> Win"/"Draw" from the Predict page
+    # (or the older "Home Win"/"Away Win" labels)
+    predicted = func.lower(p.c.predicted_outcome)
+    predicted_class = case(
+        (predicted == "draw", literal("draw")),
+        (predicted.in_(["home win", func.lower(func.trim(p.c.home_team)) + " win"]), literal("home")),
+        (predicted.in_(["away win", func.lower(func.trim(p.c.away_team)) + " win"]), literal("away")),
+    )
+
+    return (
+        p.update()
+        .where(
+            p.c.id >= lo,
+            p.c.id < hi,
+            p.c.was_correct.is_(None),
+            p.c.actual_outcome.is_(None),
+            exists().where(match),
+        )
+        .values(
+            actual_outcome=first_match(actual_text),
+            was_correct=func.coalesce(predicted_class == first_match(r.result), false()),
+        )
+    )
+
+
+def resolve_pending_predictions(df, engine=None, batch_size=BATCH_SIZE) -> int:
+    """
+    Settle pending predictions using the finished matches in df
+    (a load_data() DataFrame). Returns the number of predictions settled.
+    """
+    if engine is None:
+        from database import engine
+
+    p = PredictionHistory.__table__
+    pending = (p.c.was_correct.is_(None)) & (p.c.actual_outcome.is_(None))
+
+    with engine.connect() as conn:
+        lo, hi, oldest = conn.execute(
+            select(func.min(p.c.id), func.max(p.c.id), func.min(p.c.created_at)).where(pending)
+        ).one()
+        if lo is None:
+            return 0
+
+        rows = _match_rows(df, oldest)
+        if not rows:
+            return 0
+
+        _metadata.create_all(conn)
+        try:
+            conn.execute(_results.insert(), rows)
+            conn.commit()
+
+            settled = 0
+            for start in range(lo, hi + 1, batch_size):
+                settled += conn.execute(_settle_statement(start, start + batch_size)).rowcount
+                conn.commit()
+        finally:
+            _metadata.drop_all(conn)
+            conn.commit()
+
+    return settled
@@ -0,0 +1,118 @@
+"""
+Admin router - on-demand profiling of a route or pipeline run, and memory
+snapshots of the loaded data and models. Every endpoint requires a user
+listed in ADMIN_USER_IDS; results are this worker's.
+"""
+
+from typing import Literal
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import Response
+from pydantic import BaseModel, Field
+from auth import get_current_admin
+import profiling
+
+router = APIRouter(dependencies=[Depends(get_current_admin)])
+
+
+class ProfileRequest(BaseModel):
+    """
+    Request body for starting a profiling session.
+    target is a route's path template (as listed in /docs, e.g.
+    /api/teams/{team_id}) or "pipeline" for pipeline runs.
+    """
+    target: str
+    mode: Literal["sample", "deterministic"] = "sample"
+    seconds: float = Field(30, gt=0, le=profiling.MAX_SECONDS)
+    interval_ms: float = Field(profiling.INTERVAL_MS, gt=0)  # sample mode only
+
+
+def _download(content, media_type, filename):
+    return Response(
+        content, media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.post("/profile")
+def start_profile(body: ProfileRequest, request: Request):
+    """Profile calls to the target until stopped or body.seconds have passed"""
+    try:
+        return profiling.start(body.target, body.mode, body.seconds, body.interval_ms, request.app.routes)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/profile")
+def get_profile():
+    """Status of the current (or last) profiling session"""
+    status = profiling.status()
+    if status is None:
+        raise HTTPException(status_code=404, detail="No profiling session")
+    return status
+
+
+@router.delete("/profile")
+def stop_profile():
+    """Stop the current profiling session early"""
+    try:
+        return profiling.stop()
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.get("/profile/result")
+def download_profile(format: Literal["pstats", "collapsed", "text"] = Query(None)):
+    """
+    The session's results so far, as a download:
+    - pstats: cProfile stats (deterministic sessions; python -m pstats <file>)
+    - text: the top of those stats by cumulative time
+    - collapsed: sampled stacks, one "frame;frame count" per line (sample
+      sessions; flamegraph.pl or speedscope)
+    Defaults to pstats or collapsed depending on the session's mode.
+    """
+    status = profiling.status()
+    if status is None:
+        raise HTTPException(status_code=404, detail="No profiling session")
+    try:
+        return _download(*profiling.result(format or status["formats"][0]))
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/memory")
+def get_memory(top: int = Query(20, ge=1, le=200)):
+    """
+    Memory held by _df, _models and _fast_models, plus tracemalloc's view
+    (predictor.py lines and top allocation sites) while it is tracing
+    """
+    return profiling.memory_report(top)
+
+
+@router.get("/memory/snapshot")
+def download_memory_snapshot():
+    """Pickled tracemalloc snapshot (tracemalloc.Snapshot.load) to compare offline"""
+    try:
+        content = profiling.memory_snapshot()
+    except LookupError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return _download(content, "application/octet-stream", "memory.tracemalloc")
+
+
+@router.post("/memory/tracemalloc")
+def start_tracemalloc(frames: int = Query(25, ge=1, le=100)):
+    """Start tracing allocations (loads and retrains from now on show up in /memory)"""
+    if not profiling.start_tracing(frames):
+        return {"message": "tracemalloc is already tracing"}
+    return {"message": f"tracemalloc started ({frames} frames)"}
+
+
+@router.delete("/memory/tracemalloc")
+def stop_tracemalloc():
+    """Stop tracing allocations and free the traces"""
+    if not profiling.stop_tracing():
+        return {"message": "tracemalloc wasn't tracing"}
+    return {"message": "tracemalloc stopped"}
@@ -1,11 +1,16 @@
 """Auth router - register, login, user profile"""
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import insert, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, EmailStr
-from database import get_db
+from database import get_async_db
 from models import User
-from auth import hash_password, verify_password, create_access_token, get_current_user
+from auth import (
+    hash_password_async, verify_password_async, create_access_token, get_current_user,
+    get_current_admin, get_cached_profile, cache_profile, auth_cache_stats,
+)
 
 router = APIRouter()
 
@@ -28,8 +33,28 @@ class LoginRequest(BaseModel):
     password: str  # Plain text password
 
 
+def _clashing_field(error: IntegrityError):
+    """
+    "email" or "username" if error is a unique violation on that users
+    column, else None. PostgreSQL names the constraint (ix_users_email);
+    SQLite only says "UNIQUE constraint failed: users.email".
+    """
+    diag = getattr(error.orig, "diag", None)
+    text = (getattr(diag, "constraint_name", None) or str(error.orig)).lower()
+    for field in ("email", "username"):
+        if f"users.{field}" in text or f"users_{field}" in text:
+            return field
+    return None
+
+
+def _raise_taken(field: str):
+    if field == "email":
+        raise HTTPException(status_code=400, detail="Email already registered")
+    raise HTTPException(status_code=400, detail="Username already taken")
+
+
 @router.post("/register")
-def register(request: RegisterRequest, db: Session = Depends(get_db)):
+async def register(request: RegisterRequest, db: AsyncSession = Depends(get_async_db)):
     """
     Register a new user account.
     - Ensures email/username uniqueness
@@ -37,28 +62,41 @@ def register(request: RegisterRequest, db: Session = Depends(get_db)):
     - Returns a JWT so the user is logged in immediately
     """
 
-    # Prevent duplicate accounts by email
-    if db.query(User).filter(User.email == request.email).first():
-        raise HTTPException(status_code=400, detail="Email already registered")
-
-    # Prevent duplicate accounts by username
-    if db.query(User).filter(User.username == request.username).first():
-        raise HTTPException(status_code=400, detail="Username already taken")
+    # Turn away taken emails/usernames before paying for a bcrypt hash, so
+    # repeated duplicate signups can't tie up the hashing pool
+    taken = (await db.execute(
+        select(User.email, User.username)
+        .where(or_(User.email == request.email, User.username == request.username))
+    )).all()
+    if taken:
+        # Email first, as the frontend has always reported it
+        _raise_taken("email" if any(row.email == request.email for row in taken) else "username")
 
     # Create new user record with hashed password (never store plaintext passwords)
-    user = User(
-        email=request.email,
-        username=request.username,
-        hashed_password=hash_password(request.password)
-    )
-
-    # Save user to database
-    db.add(user)
-    db.commit()
-    db.refresh(user)  # Refresh to load generated fields like user.id
+    # bcrypt is CPU-heavy, so it runs on the dedicated hashing pool
+    hashed_password = await hash_password_async(request.password)
+
+    # One INSERT ... RETURNING; the unique email/username indexes reject
+    # duplicates, which also covers two signups racing for the same name
+    try:
+        row = (await db.execute(
+            insert(User)
+            .values(email=request.email, username=request.username, hashed_password=hashed_password)
+            .returning(User.id, User.created_at)
+        )).one()
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        field = _clashing_field(e)
+        if field is None:
+            raise  # not a duplicate signup
+        _raise_taken(field)
+
+    user = User(id=row.id, email=request.email, username=request.username, created_at=row.created_at)
 
     # Generate JWT token (sub = user id)
     token = create_access_token({"sub": str(user.id)})
+    cache_profile(user)  # the frontend calls /me next
 
     # Return token + basic user profile info for the frontend
     return {
@@ -73,24 +111,34 @@ def register(request: RegisterRequest, db: Session = Depends(get_db)):
 
 
 @router.post("/login")
-def login(request: LoginRequest, db: Session = Depends(get_db)):
+async def login(request: LoginRequest, db: AsyncSession = Depends(get_async_db)):
     """
     Authenticate a user by email and password.
     Returns a JWT token if credentials are valid.
     """
 
     # Find user by email
-    user = db.query(User).filter(User.email == request.email).first()
+    user = await db.scalar(select(User).where(User.email == request.email))
 
     # Validate credentials (email exists and password matches stored hash)
-    if not user or not verify_password(request.password, user.hashed_password):
+    valid, new_hash = (False, None)
+    if user:
+        valid, new_hash = await verify_password_async(request.password, user.hashed_password)
+
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
         )
 
+    # The stored hash used an old work factor - upgrade it now we know the password
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
+
     # Create JWT token (sub = user id)
     token = create_access_token({"sub": str(user.id)})
+    cache_profile(user)  # the frontend calls /me next
 
     # Return token + basic user info
     return {
@@ -105,22 +153,29 @@ def login(request: LoginRequest, db: Session = Depends(get_db)):
 
 
 @router.get("/me")
-def get_me(user_id: int = Depends(get_current_user), db: Session = Depends(get_db)):
+async def get_me(user_id: int = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
     """
     Return the profile of the currently authenticated user.
     Requires a valid JWT (Authorization: Bearer <token>).
     """
 
+    # Profiles are cached per user (and warmed at login), so this is
+    # usually answered without touching the database
+    profile = get_cached_profile(user_id)
+    if profile is not None:
+        return profile
+
     # Look up user in database using the user_id extracted from the token
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
 
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
     # Return full profile data used by the frontend
-    return {
-        "id": user.id,
-        "email": user.email,
-        "username": user.username,
-        "created_at": user.created_at
-    }
+    return cache_profile(user)
+
+
+@router.get("/cache-stats", dependencies=[Depends(get_current_admin)])
+def get_cache_stats():
+    """Hit rates for the verified-token and user profile caches (admins only)"""
+    return auth_cache_stats()
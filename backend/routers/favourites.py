@@ -1,14 +1,18 @@
 """Favourites router - save and retrieve favourite teams"""
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from pydantic import BaseModel
-from database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import BaseModel, Field
+from database import get_async_db, dialect_insert
 from models import Favourite
 from auth import get_current_user
 
 router = APIRouter()
 
+# Most teams accepted by one batch add/remove
+MAX_BATCH = 100
+
 
 class FavouriteRequest(BaseModel):
     """
@@ -22,19 +26,56 @@ class FavouriteRequest(BaseModel):
     team_league: str    # League name
 
 
+class FavouriteBatchRequest(BaseModel):
+    """Request body for adding several favourite teams at once"""
+    favourites: list[FavouriteRequest] = Field(min_length=1, max_length=MAX_BATCH)
+
+
+async def _insert_favourites(db, user_id, favourites):
+    """
+    Single-statement INSERT ... ON CONFLICT DO NOTHING.
+    The unique (user_id, team_id) index makes it safe under concurrent
+    requests; returns the team IDs that were actually added.
+    """
+    insert = dialect_insert(db)
+    stmt = insert(Favourite).values([
+        {
+            "user_id": user_id,
+            "team_id": f.team_id,
+            "team_name": f.team_name,
+            "team_crest": f.team_crest,
+            "team_league": f.team_league,
+        }
+        for f in favourites
+    ]).on_conflict_do_nothing(
+        index_elements=["user_id", "team_id"]
+    ).returning(Favourite.team_id)
+
+    added = (await db.scalars(stmt)).all()
+    await db.commit()
+    return added
+
+
 @router.get("/")
-def get_favourites(
+async def get_favourites(
     user_id: int = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Retrieve all favourite teams for the currently authenticated user.
     """
 
     # Query favourites belonging only to the current user
-    favourites = db.query(Favourite).filter(
-        Favourite.user_id == user_id
-    ).all()
+    # (only the columns we return - no need to build full ORM objects)
+    favourites = (await db.execute(
+        select(
+            Favourite.id,
+            Favourite.team_id,
+            Favourite.team_name,
+            Favourite.team_crest,
+            Favourite.team_league
+        ).where(Favourite.user_id == user_id)
+    )).all()
 
     # Return a simplified, frontend-friendly response
     return {
@@ -52,70 +93,93 @@ def get_favourites(
 
 
 @router.post("/")
-def add_favourite(
+async def add_favourite(
     request: FavouriteRequest,
     user_id: int = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Add a team to the current user's favourites.
     Prevents duplicate favourites for the same user.
     """
 
-    # Check if the team is already favourited by the user
-    existing = db.query(Favourite).filter(
-        Favourite.user_id == user_id,
-        Favourite.team_id == request.team_id
-    ).first()
-
-    if existing:
+    # Nothing inserted means the team was already favourited
+    if not await _insert_favourites(db, user_id, [request]):
         raise HTTPException(
             status_code=400,
             detail="Team already in favourites"
         )
 
-    # Create new favourite entry
-    favourite = Favourite(
-        user_id=user_id,
-        team_id=request.team_id,
-        team_name=request.team_name,
-        team_crest=request.team_crest,
-        team_league=request.team_league
-    )
+    return {
+        "message": f"{request.team_name} added to favourites"
+    }
+
+
+@router.post("/batch")
+async def add_favourites(
+    request: FavouriteBatchRequest,
+    user_id: int = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Add several teams to the current user's favourites in one statement.
+    Teams that are already favourited are skipped.
+    """
 
-    # Save favourite to database
-    db.add(favourite)
-    db.commit()
+    added = await _insert_favourites(db, user_id, request.favourites)
 
     return {
-        "message": f"{request.team_name} added to favourites"
+        "message": f"{len(added)} teams added to favourites",
+        "added": added
     }
 
 
+@router.delete("/")
+async def remove_favourites(
+    team_ids: list[int] = Query(..., max_length=MAX_BATCH),
+    user_id: int = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Remove several teams from the current user's favourites
+    (?team_ids=1&team_ids=2...) in one statement.
+    """
+
+    removed = (await db.execute(
+        delete(Favourite).where(
+            Favourite.user_id == user_id,
+            Favourite.team_id.in_(team_ids)
+        )
+    )).rowcount
+    await db.commit()
+
+    return {"message": f"{removed} teams removed from favourites", "removed": removed}
+
+
 @router.delete("/{team_id}")
-def remove_favourite(
+async def remove_favourite(
     team_id: int,
     user_id: int = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Remove a team from the current user's favourites.
     """
 
-    # Look up the favourite for this user and team
-    favourite = db.query(Favourite).filter(
-        Favourite.user_id == user_id,
-        Favourite.team_id == team_id
-    ).first()
+    # Delete in one statement; no matching row means it wasn't a favourite
+    removed = (await db.execute(
+        delete(Favourite).where(
+            Favourite.user_id == user_id,
+            Favourite.team_id == team_id
+        )
+    )).rowcount
 
-    if not favourite:
+    if not removed:
         raise HTTPException(
             status_code=404,
             detail="Favourite not found"
         )
 
-    # Delete favourite entry
-    db.delete(favourite)
-    db.commit()
+    await db.commit()
 
     return {"message": "Removed from favourites"}
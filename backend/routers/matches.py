@@ -3,22 +3,62 @@ Matches router - fetches real match data from football-data.org.
 Provides upcoming matches, recent results, and league standings.
 """
 
-from fastapi import APIRouter, HTTPException
-import httpx
+from fastapi import APIRouter, HTTPException, Request
 import os
 from dotenv import load_dotenv
+from upstream_cache import cache, conditional_headers
+from metrics import upstream_client
+from http_cache import conditional_json
 
 load_dotenv()
 
 router = APIRouter()
 
 # Football-data.org API configuration
+# (set FOOTBALL_API_BASE_URL to point at the local mock in loadtest/mock_api.py)
 API_KEY = os.getenv("FOOTBALL_API_KEY")
-BASE_URL = "https://api.football-data.org/v4"
+BASE_URL = os.getenv("FOOTBALL_API_BASE_URL", "https://api.football-data.org/v4")
 HEADERS = {"X-Auth-Token": API_KEY}
 
-# Cache standings so we don't hit rate limits on repeated requests
-_standings_cache = {}
+# How long cached payloads are served before asking the API again (seconds).
+# Cached data lives in the shared upstream cache so every worker reuses it.
+MATCHES_TTL = 5 * 60
+STANDINGS_TTL = 30 * 60
+
+
+async def _fetch_league_matches(client, league_code, status, build):
+    """
+    Fetch one league's matches with the given status through the upstream cache.
+    build(data) turns the raw API response into the list we return.
+    Falls back to the stale cached copy if the API call fails.
+    """
+    key = f"matches:{league_code}:{status}"
+    cached = await cache.aget(key, MATCHES_TTL)
+    if cached and cached.is_fresh(MATCHES_TTL):
+        return cached.payload
+
+    try:
+        res = await client.get(
+            f"{BASE_URL}/competitions/{league_code}/matches",
+            headers=conditional_headers(HEADERS, cached),
+            params={"status": status}
+        )
+
+        if res.status_code == 304 and cached:
+            # Nothing changed upstream - keep serving what we have
+            await cache.atouch(key)
+            return cached.payload
+
+        if res.status_code == 200:
+            matches = build(res.json())
+            await cache.aset(key, matches, res.headers.get("ETag"))
+            return matches
+
+    except Exception as e:
+        # Log error but continue processing other leagues
+        print(f"Error fetching {league_code}: {e}")
+
+    return cached.payload if cached else []
 
 
 @router.get("/upcoming")
@@ -27,35 +67,28 @@ async def get_upcoming():
     Fetch upcoming scheduled matches from selected competitions.
     Limits the number of matches returned per league for dashboard use.
     """
+    def build(data):
+        # Take only the first few matches to reduce payload size
+        return [
+            {
+                "id": match["id"],
+                "home_team": match["homeTeam"]["name"],
+                "away_team": match["awayTeam"]["name"],
+                "date": match["utcDate"][:10],   # YYYY-MM-DD
+                "time": match["utcDate"][11:16], # HH:MM (UTC)
+                "league": match["competition"]["name"],
+                "status": "upcoming"
+            }
+            for match in data.get("matches", [])[:5]
+        ]
+
     all_matches = []
 
-    async with httpx.AsyncClient() as client:
+    async with upstream_client() as client:
         for league_code in ["PL", "PD", "CL"]:
-            try:
-                # Request upcoming (scheduled) matches for the league
-                res = await client.get(
-                    f"{BASE_URL}/competitions/{league_code}/matches",
-                    headers=HEADERS,
-                    params={"status": "SCHEDULED"}
-                )
-
-                if res.status_code == 200:
-                    data = res.json()
-                    # Take only the first few matches to reduce payload size
-                    for match in data.get("matches", [])[:5]:
-                        all_matches.append({
-                            "id": match["id"],
-                            "home_team": match["homeTeam"]["name"],
-                            "away_team": match["awayTeam"]["name"],
-                            "date": match["utcDate"][:10],   # YYYY-MM-DD
-                            "time": match["utcDate"][11:16], # HH:MM (UTC)
-                            "league": match["competition"]["name"],
-                            "status": "upcoming"
-                        })
-
-            except Exception as e:
-                # Log error but continue processing other leagues
-                print(f"Error fetching {league_code}: {e}")
+            all_matches.extend(
+                await _fetch_league_matches(client, league_code, "SCHEDULED", build)
+            )
 
     return {"matches": all_matches}
 
@@ -66,36 +99,29 @@ async def get_recent():
     Fetch recently finished matches from selected competitions.
     Includes final scores for completed matches.
     """
+    def build(data):
+        # Take the most recent completed matches
+        return [
+            {
+                "id": match["id"],
+                "home_team": match["homeTeam"]["name"],
+                "away_team": match["awayTeam"]["name"],
+                "date": match["utcDate"][:10],
+                "league": match["competition"]["name"],
+                "status": "finished",
+                "home_score": match["score"]["fullTime"]["home"],
+                "away_score": match["score"]["fullTime"]["away"],
+            }
+            for match in data.get("matches", [])[-5:]
+        ]
+
     all_matches = []
 
-    async with httpx.AsyncClient() as client:
+    async with upstream_client() as client:
         for league_code in ["PL", "PD", "CL"]:
-            try:
-                # Request finished matches for the league
-                res = await client.get(
-                    f"{BASE_URL}/competitions/{league_code}/matches",
-                    headers=HEADERS,
-                    params={"status": "FINISHED"}
-                )
-
-                if res.status_code == 200:
-                    data = res.json()
-                    # Take the most recent completed matches
-                    for match in data.get("matches", [])[-5:]:
-                        all_matches.append({
-                            "id": match["id"],
-                            "home_team": match["homeTeam"]["name"],
-                            "away_team": match["awayTeam"]["name"],
-                            "date": match["utcDate"][:10],
-                            "league": match["competition"]["name"],
-                            "status": "finished",
-                            "home_score": match["score"]["fullTime"]["home"],
-                            "away_score": match["score"]["fullTime"]["away"],
-                        })
-
-            except Exception as e:
-                # Log error but allow partial results
-                print(f"Error fetching {league_code}: {e}")
+            all_matches.extend(
+                await _fetch_league_matches(client, league_code, "FINISHED", build)
+            )
 
     return {"matches": all_matches}
 
@@ -115,35 +141,56 @@ async def get_matches():
 
 
 @router.get("/standings/{league_code}")
-async def get_standings(league_code: str):
+async def get_standings(league_code: str, request: Request):
     """
     Fetch league standings for a given competition code.
-    Results are cached in-memory to reduce API usage and rate limiting.
+    Results are kept in the shared upstream cache to reduce API usage
+    and rate limiting, and revalidated with the upstream ETag once stale.
+    Responses carry an ETag, so unchanged polls get a 304.
 
     Special case:
     - Champions League ("CL") standings are grouped by group stage.
     """
-    global _standings_cache
+    result = await _load_standings(league_code)
+
+    # Version the response by the cached copy it came from
+    entry = await cache.aget(f"standings:{league_code}")
+    version = (league_code, entry.etag or entry.fetched_at) if entry else None
+    return conditional_json(request, result, version, "public, max-age=60")
 
+
+async def _load_standings(league_code: str):
+    """Return normalized standings for a league, via the upstream cache"""
     # Allowed competition codes
     valid_leagues = ["PL", "PD", "BL1", "SA", "FL1", "CL"]
     if league_code not in valid_leagues:
         raise HTTPException(status_code=400, detail="Invalid league code")
 
-    # Return cached standings if already fetched
-    if league_code in _standings_cache:
+    # Return cached standings if fetched recently
+    key = f"standings:{league_code}"
+    cached = await cache.aget(key, STANDINGS_TTL)
+    if cached and cached.is_fresh(STANDINGS_TTL):
         print(f"✓ Returning cached standings for {league_code}")
-        return _standings_cache[league_code]
+        return cached.payload
 
-    async with httpx.AsyncClient() as client:
+    async with upstream_client() as client:
         try:
             # Request standings data for the league
             res = await client.get(
                 f"{BASE_URL}/competitions/{league_code}/standings",
-                headers=HEADERS,
+                headers=conditional_headers(HEADERS, cached),
                 timeout=15.0
             )
 
+            if res.status_code == 304 and cached:
+                await cache.atouch(key)
+                return cached.payload
+
+            # Stale standings beat an error page if the API is struggling
+            if res.status_code != 200 and cached:
+                print(f"✓ Returning stale standings for {league_code} ({res.status_code})")
+                return cached.payload
+
             if res.status_code == 429:
                 raise HTTPException(
                     status_code=429,
@@ -218,7 +265,7 @@ async def get_standings(league_code: str):
                 }
 
             # Cache standings for future requests
-            _standings_cache[league_code] = result
+            await cache.aset(key, result, res.headers.get("ETag"))
             print(f"✓ Cached standings for {league_code}")
             return result
 
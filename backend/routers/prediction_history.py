@@ -1,16 +1,43 @@
 """Prediction history router - track user predictions and accuracy"""
 
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from database import get_db
-from models import PredictionHistory
+import base64
+import hashlib
+import json
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from pydantic import BaseModel, Field
+from sqlalchemy import case, func, insert, select, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db
+from models import PredictionHistory, IdempotencyKey
 from auth import get_current_user
+from http_cache import conditional_json
 
 router = APIRouter()
 
+# Most predictions accepted by one bulk save
+MAX_BULK_SAVE = 500
+
+
+class PredictionItem(BaseModel):
+    """One prediction to save (same fields as the query-param endpoint)"""
+    home_team: str
+    away_team: str
+    predicted_outcome: str
+    home_win_prob: float
+    draw_prob: float
+    away_win_prob: float
+
+
+class BulkSaveRequest(BaseModel):
+    """Request body for saving several predictions at once"""
+    predictions: list[PredictionItem] = Field(min_length=1, max_length=MAX_BULK_SAVE)
+
 
 @router.post("/")
-def save_prediction(
+async def save_prediction(
     home_team: str,
     away_team: str,
     predicted_outcome: str,
@@ -18,7 +45,7 @@ def save_prediction(
     draw_prob: float,
     away_win_prob: float,
     user_id: int = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Save a prediction to user's history"""
     
@@ -33,31 +60,131 @@ def save_prediction(
     )
     
     db.add(prediction)
-    db.commit()
-    db.refresh(prediction)
+    await db.commit()
     
     return {"message": "Prediction saved", "id": prediction.id}
 
 
+# History page size (clients can ask for up to MAX_PAGE_SIZE rows at a time)
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def _encode_cursor(prediction) -> str:
+    """Opaque cursor pointing just after this row in (created_at, id) order"""
+    raw = f"{prediction.created_at.isoformat()}|{prediction.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str):
+    try:
+        created_at, row_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def get_accuracy_stats(db: AsyncSession, user_id: int) -> dict:
+    """Total/correct/pending counts and accuracy, computed in one SQL query"""
+    total, correct, pending = (await db.execute(
+        select(
+            func.count(PredictionHistory.id),
+            func.count(case((PredictionHistory.was_correct.is_(True), 1))),
+            func.count(case((PredictionHistory.was_correct.is_(None), 1))),
+        ).where(PredictionHistory.user_id == user_id)
+    )).one()
+
+    settled = total - pending
+    accuracy = (correct / settled * 100) if settled > 0 else 0
+
+    return {
+        "total": total,
+        "correct": correct,
+        "pending": pending,
+        "accuracy": round(accuracy, 1)
+    }
+
+
+@router.post("/bulk")
+async def save_predictions(
+    request: BulkSaveRequest,
+    idempotency_key: str | None = Header(None, max_length=200),
+    user_id: int = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Save a list of predictions in one transaction (a single multi-row
+    INSERT ... RETURNING id).
+    Send an Idempotency-Key header to make retries safe: a repeated key
+    returns the original response instead of inserting the rows again.
+    Reusing a key with a different body is a 422.
+    """
+
+    if idempotency_key:
+        request_hash = hashlib.sha256(request.model_dump_json().encode()).hexdigest()
+
+        # Claim the key first - the unique constraint makes concurrent
+        # retries wait for (then lose to) whichever request got here first
+        claim = IdempotencyKey(user_id=user_id, key=idempotency_key, request_hash=request_hash)
+        db.add(claim)
+        try:
+            await db.flush()
+        except IntegrityError:
+            await db.rollback()
+            existing = await db.scalar(select(IdempotencyKey).where(
+                IdempotencyKey.user_id == user_id,
+                IdempotencyKey.key == idempotency_key
+            ))
+            if existing is not None and existing.request_hash != request_hash:
+                raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
+            if existing is None or existing.response is None:
+                raise HTTPException(status_code=409, detail="Request with this key is still in progress")
+            return json.loads(existing.response)
+
+    ids = (await db.scalars(
+        insert(PredictionHistory).returning(PredictionHistory.id, sort_by_parameter_order=True),
+        [{"user_id": user_id, **item.model_dump()} for item in request.predictions]
+    )).all()
+
+    response = {"message": "Predictions saved", "ids": ids}
+    if idempotency_key:
+        claim.response = json.dumps(response)
+
+    await db.commit()
+    return response
+
+
 @router.get("/")
-def get_prediction_history(
+async def get_prediction_history(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
     user_id: int = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get user's prediction history with accuracy stats"""
-    
-    predictions = db.query(PredictionHistory).filter(
-        PredictionHistory.user_id == user_id
-    ).order_by(PredictionHistory.created_at.desc()).all()
-    
-    # Calculate stats
-    total = len(predictions)
-    correct = sum(1 for p in predictions if p.was_correct is True)
-    pending = sum(1 for p in predictions if p.was_correct is None)
-    
-    accuracy = (correct / (total - pending) * 100) if (total - pending) > 0 else 0
-    
-    return {
+    """
+    Get one page of the user's prediction history (newest first) with
+    accuracy stats over the whole history.
+    Pass the returned next_cursor back as ?cursor= to get the next page;
+    it is null on the last page. Pages use keyset pagination on
+    (created_at, id), so deep pages cost the same as the first.
+    The ETag is a hash of the body, so an unchanged page costs a 304.
+    """
+
+    query = select(PredictionHistory).where(PredictionHistory.user_id == user_id)
+    if cursor:
+        query = query.where(
+            tuple_(PredictionHistory.created_at, PredictionHistory.id) < tuple_(*_decode_cursor(cursor))
+        )
+
+    # Fetch one extra row to find out whether there's another page
+    rows = (await db.scalars(query.order_by(
+        PredictionHistory.created_at.desc(), PredictionHistory.id.desc()
+    ).limit(limit + 1))).all()
+    predictions = rows[:limit]
+    next_cursor = _encode_cursor(predictions[-1]) if len(rows) > limit else None
+
+    history = {
         "predictions": [
             {
                 "id": p.id,
@@ -75,10 +202,8 @@ def get_prediction_history(
             }
             for p in predictions
         ],
-        "stats": {
-            "total": total,
-            "correct": correct,
-            "pending": pending,
-            "accuracy": round(accuracy, 1)
-        }
-    }
\ No newline at end of file
+        "next_cursor": next_cursor,
+        "stats": await get_accuracy_stats(db, user_id)
+    }
+
+    return conditional_json(request, history, cache_control="private, no-cache")
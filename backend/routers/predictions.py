@@ -3,12 +3,30 @@ Predictions router - handles ML-based match predictions and
 historical head-to-head (H2H) statistics using a trained model.
 """
 
-from fastapi import APIRouter
+from datetime import date
+from typing import Literal, Optional
+from fastapi import APIRouter, HTTPException, Query, Request
 from pydantic import BaseModel
-from predictor import predict_match, get_available_teams, _df
+from predictor import predict_match, get_available_teams, get_team_index, data_version, simulate_league, get_elo
+from http_cache import conditional_json
+import simulator
 
 router = APIRouter()
 
+# football-data.org competition codes -> dataset league names
+LEAGUE_ALIASES = {"PL": "England", "PD": "Spain", "BL1": "Germany", "SA": "Italy", "FL1": "France"}
+
+
+def resolve_league(league: str) -> str:
+    """Accept a dataset league name ("England") or competition code ("PL")"""
+    from predictor import _df
+
+    name = LEAGUE_ALIASES.get(league.upper(), league)
+    for known in _df['league'].unique():
+        if known.lower() == name.lower():
+            return known
+    raise HTTPException(status_code=404, detail=f"Unknown league '{league}'")
+
 
 class PredictionRequest(BaseModel):
     """
@@ -16,12 +34,16 @@ class PredictionRequest(BaseModel):
     """
     home_team: str
     away_team: str
+    engine: Literal["forest", "poisson"] = "forest"  # Random Forest or Poisson scoreline model
+    tier: Literal["auto", "forest", "fast"] = "auto"  # forest engine only: which model answers
+    latency_budget_ms: Optional[float] = None  # for tier="auto" (default PREDICT_LATENCY_BUDGET_MS)
 
 
 @router.post("/predict")
 def predict(request: PredictionRequest):
     """
-    Predict the outcome of a match using a trained Random Forest model.
+    Predict the outcome of a match using a trained Random Forest model
+    (or, with engine="poisson", the Poisson/Dixon-Coles scoreline model).
     Only supports predictions between teams from the same league.
     """
 
@@ -68,17 +90,45 @@ def predict(request: PredictionRequest):
         }
 
     # Run ML model prediction
-    result = predict_match(request.home_team, request.away_team)
+    result = predict_match(
+        request.home_team, request.away_team, request.engine,
+        request.tier, request.latency_budget_ms,
+    )
     return result
 
 
+@router.get("/tiers")
+def tier_stats():
+    """
+    Model tier usage in this worker: predictions answered by each tier,
+    their recent average latency, and predictions in flight.
+    """
+    import tiers
+
+    return tiers.stats()
+
+
 @router.get("/teams")
-def available_teams():
+def available_teams(request: Request):
     """
     Return all teams supported by the prediction model.
+    The ETag follows the dataset version, so it only changes after the
+    pipeline loads new data.
+    """
+    return conditional_json(
+        request,
+        lambda: {"teams": get_available_teams()},
+        data_version(),
+        "public, max-age=3600",
+    )
+
+
+@router.get("/teams/autocomplete")
+def autocomplete_teams(q: str, limit: int = Query(10, ge=1, le=50)):
     """
-    teams = get_available_teams()
-    return {"teams": teams}
+    Suggest prediction-model team names for a partial or misspelt query.
+    """
+    return {"teams": get_team_index().search(q, limit)}
 
 
 @router.get("/h2h")
@@ -89,6 +139,7 @@ def head_to_head(home_team: str, away_team: str):
     """
 
     import pandas as pd
+    from predictor import _df  # current dataset (the pipeline swaps it)
 
     # Perform case-insensitive team matching
     all_teams = pd.concat([_df['home_team'], _df['away_team']]).unique()
@@ -145,3 +196,64 @@ def head_to_head(home_team: str, away_team: str):
         "matches": matches,
         "team": home_match
     }
+
+
+@router.get("/simulate/{league}")
+def simulate(
+    league: str,
+    request: Request,
+    sims: int = Query(10_000, ge=1_000, le=100_000),
+    engine: Literal["forest", "poisson"] = "poisson",
+):
+    """
+    Projected final table for the current season: title, top-4 and
+    relegation probabilities and expected points from `sims` Monte Carlo
+    simulations of the remaining fixtures (rounded up to 1,000, 10,000 or
+    100,000). league is a dataset league ("England") or competition code
+    ("PL"). Cached per dataset version.
+    """
+    league = resolve_league(league)
+    sims = simulator.simulation_count(sims)
+    return conditional_json(
+        request,
+        lambda: simulate_league(league, sims, engine),
+        (data_version(), league, engine, sims),
+        "public, max-age=3600",
+    )
+
+
+@router.get("/ratings/{league}")
+def ratings(league: str, request: Request, as_of: Optional[date] = None):
+    """
+    Elo ratings for a league's teams, strongest first. With as_of, only
+    results before that date count and the teams are those of the season
+    it falls in; otherwise the current ratings for the latest season.
+    """
+    from predictor import _df
+
+    league = resolve_league(league)
+
+    def build():
+        df_league = _df[_df['league'] == league]
+        if as_of is not None:
+            df_league = df_league[df_league['Date'] < str(as_of)]
+        if df_league.empty:
+            return {"league": league, "as_of": as_of, "matches": 0, "ratings": []}
+
+        season = df_league[df_league['Date'] >= simulator.season_start(df_league['Date'])]
+        teams = set(season['home_team']) | set(season['away_team'])
+        elo = get_elo(league)
+
+        return {
+            "league": league,
+            "as_of": as_of,
+            "matches": len(df_league),
+            "ratings": elo.table(as_of, teams),
+        }
+
+    return conditional_json(
+        request,
+        build,
+        (data_version(), league, str(as_of)),
+        "public, max-age=3600",
+    )
@@ -1,22 +1,26 @@
 """
 Teams router.
 Fetches and normalizes real team data from football-data.org.
-Includes caching and basic rate-limit handling.
+Includes caching (via the shared upstream cache) and basic rate-limit handling.
 """
 
 import os
 import asyncio
-import httpx
 from dotenv import load_dotenv
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request
+from upstream_cache import cache, conditional_headers
+from metrics import upstream_client
+from team_search import TeamIndex
+from http_cache import conditional_json
 
 load_dotenv()
 
 router = APIRouter()
 
 # Football-data.org API configuration
+# (set FOOTBALL_API_BASE_URL to point at the local mock in loadtest/mock_api.py)
 API_KEY = os.getenv("FOOTBALL_API_KEY")
-BASE_URL = "https://api.football-data.org/v4"
+BASE_URL = os.getenv("FOOTBALL_API_BASE_URL", "https://api.football-data.org/v4")
 HEADERS = {"X-Auth-Token": API_KEY}
 
 # Supported league codes and display names
@@ -29,120 +33,256 @@ LEAGUE_NAMES = {
     "FL1": "Ligue 1",
 }
 
-# In-memory cache to avoid repeated API calls
-_teams_cache = None
+# Team lists change rarely, so serve cached copies for a day before revalidating
+TEAMS_TTL = 24 * 60 * 60
+
+# Team details (coach, website...) are cached per team for the same period
+TEAM_TTL = 24 * 60 * 60
+
+# Batch lookups: most IDs per request, and most upstream calls one batch may
+# make. The football-data.org free tier allows 10 requests a minute for the
+# whole key, so one batch only gets a small share and leaves the rest for
+# team lists, single-team lookups, matches and other batches.
+BATCH_MAX_IDS = 50
+BATCH_MAX_FETCHES = int(os.getenv("TEAMS_BATCH_MAX_FETCHES", 3))
+
+# Search index over the cached teams, rebuilt whenever the cache changes
+_search_index = TeamIndex([])
+_search_version = None
+
+
+def _normalize_team(team, code):
+    """Convert a raw API team into the shape the frontend uses"""
+    return {
+        "id": team["id"],
+        "name": team["name"],
+        "short_name": team["shortName"],
+        "crest": team["crest"],
+        "league": LEAGUE_NAMES[code],
+        "country": team.get("area", {}).get("name", ""),
+        "founded": team.get("founded"),
+        "venue": team.get("venue"),
+    }
 
 
 @router.get("/")
-async def get_teams():
+async def get_teams(request: Request):
     """
     Fetch teams from the top 5 European leagues.
-    Results are cached after the first request to reduce API usage.
+    Each league's list is kept in the shared upstream cache, so only
+    missing or stale leagues are requested from the API. The ETag follows
+    the cached lists, so unchanged polls get a 304.
     """
-    global _teams_cache
-
-    # Return cached data if available
-    if _teams_cache is not None:
-        return {"teams": _teams_cache}
-
-    all_teams = []
-
-    async with httpx.AsyncClient() as client:
-        for code in LEAGUE_CODES:
-            try:
-                res = await client.get(
-                    f"{BASE_URL}/competitions/{code}/teams",
-                    headers=HEADERS,
-                )
-
-                if res.status_code == 200:
-                    data = res.json()
-                    for team in data.get("teams", []):
-                        all_teams.append({
-                            "id": team["id"],
-                            "name": team["name"],
-                            "short_name": team["shortName"],
-                            "crest": team["crest"],
-                            "league": LEAGUE_NAMES[code],
-                            "country": team.get("area", {}).get("name", ""),
-                            "founded": team.get("founded"),
-                            "venue": team.get("venue"),
-                        })
-
-                elif res.status_code == 429:
-                    # Handle API rate limiting by waiting and retrying once
-                    await asyncio.sleep(10)
+    all_teams, entries = await _load_teams()
+    version = tuple(
+        (entry.etag or entry.fetched_at) if entry is not None else None
+        for entry in entries.values()
+    )
+    return conditional_json(request, {"teams": all_teams}, version, "public, max-age=300")
+
+
+async def _load_teams():
+    """Return (all teams, cache entry per league), fetching stale leagues"""
+    entries = {code: await cache.aget(f"teams:{code}", TEAMS_TTL) for code in LEAGUE_CODES}
+    stale = [
+        code for code, entry in entries.items()
+        if entry is None or not entry.is_fresh(TEAMS_TTL)
+    ]
+
+    if stale:
+        async with upstream_client() as client:
+            for code in stale:
+                key = f"teams:{code}"
+                cached = entries[code]
+                headers = conditional_headers(HEADERS, cached)
+
+                try:
                     res = await client.get(
                         f"{BASE_URL}/competitions/{code}/teams",
-                        headers=HEADERS,
+                        headers=headers,
                     )
-                    if res.status_code == 200:
-                        data = res.json()
-                        for team in data.get("teams", []):
-                            all_teams.append({
-                                "id": team["id"],
-                                "name": team["name"],
-                                "short_name": team["shortName"],
-                                "crest": team["crest"],
-                                "league": LEAGUE_NAMES[code],
-                                "country": team.get("area", {}).get("name", ""),
-                                "founded": team.get("founded"),
-                                "venue": team.get("venue"),
-                            })
-
-            except Exception as e:
-                # Log error but continue processing other leagues
-                print(f"Error fetching league {code}: {e}")
-
-            # Small delay between requests to reduce rate limiting
-            await asyncio.sleep(1)
-
-    # Cache results for future requests
-    _teams_cache = all_teams
-    print(f"Cached {len(all_teams)} teams")
-
-    return {"teams": all_teams}
+
+                    if res.status_code == 429:
+                        # Handle API rate limiting by waiting and retrying once
+                        await asyncio.sleep(10)
+                        res = await client.get(
+                            f"{BASE_URL}/competitions/{code}/teams",
+                            headers=headers,
+                        )
+
+                    if res.status_code == 304 and cached:
+                        entries[code] = await cache.atouch(key)
+                    elif res.status_code == 200:
+                        teams = [_normalize_team(team, code) for team in res.json().get("teams", [])]
+                        entries[code] = await cache.aset(key, teams, res.headers.get("ETag"))
+                        print(f"Cached {len(teams)} teams for {code}")
+
+                except Exception as e:
+                    # Log error but continue processing other leagues
+                    # (a stale cached copy is still served below)
+                    print(f"Error fetching league {code}: {e}")
+
+                # Small delay between requests to reduce rate limiting
+                await asyncio.sleep(1)
+
+    all_teams = [
+        team
+        for code in LEAGUE_CODES if entries[code] is not None
+        for team in entries[code].payload
+    ]
+
+    _refresh_search_index(entries, all_teams)
+
+    return all_teams, entries
+
+
+def _refresh_search_index(entries, all_teams):
+    """Rebuild the search index if any league's cached list has changed"""
+    global _search_index, _search_version
+
+    version = tuple(
+        entries[code].fetched_at if entries[code] is not None else None
+        for code in LEAGUE_CODES
+    )
+    if version != _search_version:
+        _search_index = TeamIndex(all_teams, lambda team: [team["name"], team["short_name"]])
+        _search_version = version
 
 
 @router.get("/search/{query}")
-async def search_teams(query: str):
+async def search_teams(query: str, limit: int = Query(20, ge=1, le=50)):
     """
     Search cached teams by name or short name.
+    Accent- and case-insensitive, tolerates typos, best matches first.
     """
-    all_teams = await get_teams()
-    results = [
-        team for team in all_teams["teams"]
-        if query.lower() in team["name"].lower()
-        or query.lower() in team["short_name"].lower()
-    ]
-    return {"teams": results}
+    await _load_teams()
+    return {"teams": _search_index.search(query, limit)}
 
 
-@router.get("/{team_id}")
-async def get_team(team_id: int):
+def _normalize_team_detail(data):
+    """Convert a raw API team detail response into the shape we return"""
+    return {
+        "id": data["id"],
+        "name": data["name"],
+        "crest": data["crest"],
+        "founded": data.get("founded"),
+        "venue": data.get("venue"),
+        "website": data.get("website"),
+        "coach": (data.get("coach") or {}).get("name"),
+    }
+
+
+async def _cached_team(team_id):
+    """Return the cached details for a team if they're still fresh"""
+    entry = await cache.aget(f"team:{team_id}", TEAM_TTL)
+    if entry and entry.is_fresh(TEAM_TTL):
+        return entry.payload
+    return None
+
+
+async def _fetch_team(client, team_id):
     """
-    Fetch detailed information for a single team by ID.
+    Fetch one team's details through the upstream cache.
+    Returns (details, status_code); details is None when the API failed
+    and there's no cached copy (stale or not) to fall back on.
     """
-    async with httpx.AsyncClient() as client:
-        try:
-            res = await client.get(
-                f"{BASE_URL}/teams/{team_id}",
-                headers=HEADERS,
+    key = f"team:{team_id}"
+    cached = await cache.aget(key, TEAM_TTL)
+
+    res = await client.get(
+        f"{BASE_URL}/teams/{team_id}",
+        headers=conditional_headers(HEADERS, cached),
+    )
+
+    if res.status_code == 304 and cached:
+        return (await cache.atouch(key)).payload, 200
+
+    if res.status_code == 200:
+        details = _normalize_team_detail(res.json())
+        await cache.aset(key, details, res.headers.get("ETag"))
+        return details, 200
+
+    # Stale details beat an error while the API is unavailable
+    if cached:
+        return cached.payload, 200
+    return None, res.status_code
+
+
+@router.get("/batch")
+async def get_teams_batch(ids: str):
+    """
+    Fetch details for several teams at once (ids is comma-separated).
+    Cached teams are answered immediately; missing ones are fetched in
+    parallel (one round-trip), capped at BATCH_MAX_FETCHES per request
+    so a big list can't blow through the API rate limit. Teams that
+    couldn't be fetched this time are listed under "missing".
+    """
+    try:
+        team_ids = list(dict.fromkeys(int(i) for i in ids.split(",") if i.strip()))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be comma-separated integers")
+
+    if len(team_ids) > BATCH_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_IDS} ids per request")
+
+    found = {}
+    to_fetch = []
+    for team_id in team_ids:
+        details = await _cached_team(team_id)
+        if details is not None:
+            found[team_id] = details
+        else:
+            to_fetch.append(team_id)
+
+    if to_fetch:
+        async with upstream_client() as client:
+            results = await asyncio.gather(
+                *(_fetch_team(client, team_id) for team_id in to_fetch[:BATCH_MAX_FETCHES]),
+                return_exceptions=True,
             )
 
-            if res.status_code != 200:
-                raise HTTPException(status_code=404, detail="Team not found")
+        for team_id, result in zip(to_fetch, results):
+            if isinstance(result, Exception):
+                print(f"Error fetching team {team_id}: {result}")
+                continue
+            details, _ = result
+            if details is not None:
+                found[team_id] = details
+
+        # Over the fetch cap: a stale copy is still better than nothing
+        for team_id in to_fetch[BATCH_MAX_FETCHES:]:
+            entry = await cache.aget(f"team:{team_id}")
+            if entry is not None:
+                found[team_id] = entry.payload
 
-            data = res.json()
-            return {
-                "id": data["id"],
-                "name": data["name"],
-                "crest": data["crest"],
-                "founded": data.get("founded"),
-                "venue": data.get("venue"),
-                "website": data.get("website"),
-                "coach": data.get("coach", {}).get("name"),
-            }
+    return {
+        "teams": [found[team_id] for team_id in team_ids if team_id in found],
+        "missing": [team_id for team_id in team_ids if team_id not in found],
+    }
 
+
+@router.get("/{team_id}")
+async def get_team(team_id: int):
+    """
+    Fetch detailed information for a single team by ID.
+    Details are kept in the shared upstream cache for TEAM_TTL.
+    """
+    details = await _cached_team(team_id)
+    if details is not None:
+        return details
+
+    async with upstream_client() as client:
+        try:
+            details, status_code = await _fetch_team(client, team_id)
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
+
+    if details is None:
+        if status_code == 429:
+            raise HTTPException(
+                status_code=429,
+                detail="Rate limited - please wait a moment and try again"
+            )
+        raise HTTPException(status_code=404, detail="Team not found")
+
+    return details
@@ -0,0 +1,216 @@
+"""
+Monte Carlo season simulator - projected final tables from the league models.
+
+The current season's table comes from the matches played so far; the
+remaining fixtures are every home/away pairing of this season's teams that
+hasn't been played yet (leagues are double round-robins). Each remaining
+fixture gets home/draw/away probabilities from a league model, and whole
+seasons are simulated as batched NumPy draws:
+
+    outcomes  (sims x fixtures)  one uniform draw per fixture per season
+    points    (sims x teams)     current points + outcome points @ fixture->team one-hot
+
+Only aggregates (finishing-position counts and points histograms) leave
+a batch, so large runs split cleanly across a process pool.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Simulations per batch (bounds the sims x fixtures arrays to a few MB)
+BATCH_SIZE = 5_000
+
+# Runs larger than this are spread over worker processes
+PARALLEL_THRESHOLD = int(os.getenv("SIMULATION_PARALLEL_THRESHOLD", 50_000))
+SIMULATION_WORKERS = int(os.getenv("SIMULATION_WORKERS", os.cpu_count() or 1))
+
+# Simulation counts that are run (and cached); requests round up to the
+# next one, so arbitrary sims values can't fill the cache with near-duplicates
+SIMULATION_COUNTS = (1_000, 10_000, 100_000)
+
+# Places relegated automatically in each league
+RELEGATION_PLACES = {"England": 3, "Spain": 3, "Italy": 3, "Germany": 2, "France": 2}
+
+# Points for (home win, draw, away win), from each side's point of view
+_HOME_POINTS = np.array([3, 1, 0], dtype=np.float32)
+_AWAY_POINTS = np.array([0, 1, 3], dtype=np.float32)
+
+_executor = None
+
+
+def simulation_count(n_sims):
+    """The SIMULATION_COUNTS entry a request for n_sims simulations runs"""
+    return next((n for n in SIMULATION_COUNTS if n >= n_sims), SIMULATION_COUNTS[-1])
+
+
+def season_start(dates):
+    """1 August of the season the latest match belongs to"""
+    latest = dates.max()
+    year = latest.year if latest.month >= 8 else latest.year - 1
+    return pd.Timestamp(year=year, month=8, day=1)
+
+
+def current_season(df_league):
+    """
+    (teams, table, remaining) for the league's latest season: team names,
+    a DataFrame of played/points/goal difference, and the unplayed fixtures
+    as (home, away) pairs.
+    """
+    season = df_league[df_league['Date'] >= season_start(df_league['Date'])]
+    teams = sorted(set(season['home_team']) | set(season['away_team']))
+
+    home_points = season['winner'].map({'home': 3, 'draw': 1, 'away': 0})
+    away_points = season['winner'].map({'home': 0, 'draw': 1, 'away': 3})
+    goal_diff = season['home_goals'] - season['away_goals']
+
+    table = pd.DataFrame({
+        "played": season['home_team'].value_counts().add(season['away_team'].value_counts(), fill_value=0),
+        "points": home_points.groupby(season['home_team']).sum().add(
+            away_points.groupby(season['away_team']).sum(), fill_value=0),
+        "goal_difference": goal_diff.groupby(season['home_team']).sum().sub(
+            goal_diff.groupby(season['away_team']).sum(), fill_value=0),
+    }).reindex(teams, fill_value=0).astype(int)
+
+    played = set(zip(season['home_team'], season['away_team']))
+    remaining = [(home, away) for home in teams for away in teams if home != away and (home, away) not in played]
+
+    return teams, table, remaining
+
+
+def _simulate_batch(probs, home_onehot, away_onehot, base_points, tiebreak, n_sims, rng):
+    """Finishing positions and final points (both n_sims x teams) for one batch"""
+    n_teams = len(base_points)
+
+    # Outcome per fixture: 0 home win, 1 draw, 2 away win
+    u = rng.random((n_sims, len(probs)), dtype=np.float32)
+    outcome = (u > probs[:, 0]).astype(np.int8) + (u > probs[:, 0] + probs[:, 1])
+
+    # Each fixture's points land on its two teams (small integers, exact in float32)
+    points = (
+        _HOME_POINTS[outcome] @ home_onehot +
+        _AWAY_POINTS[outcome] @ away_onehot
+    ).astype(np.int32) + base_points
+
+    # Rank by points, then current goal difference, then a coin toss
+    score = points * 1_000_000.0 + tiebreak + rng.random((n_sims, n_teams))
+    order = np.argsort(-score, axis=1)
+    positions = np.empty_like(order)
+    np.put_along_axis(positions, order, np.arange(n_teams), axis=1)
+    return positions, points
+
+
+def _simulate_chunk(probs, home, away, base_points, tiebreak, n_sims, seed, max_points):
+    """
+    Simulate n_sims seasons and return aggregates only:
+    position_counts[team, position] and points_hist[team, points].
+    """
+    rng = np.random.default_rng(seed)
+    n_teams = len(base_points)
+
+    # fixture -> team matrices, so adding up points is one matmul per side
+    home_onehot = np.zeros((len(home), n_teams), dtype=np.float32)
+    away_onehot = np.zeros((len(away), n_teams), dtype=np.float32)
+    home_onehot[np.arange(len(home)), home] = 1
+    away_onehot[np.arange(len(away)), away] = 1
+    position_counts = np.zeros((n_teams, n_teams), dtype=np.int64)
+    points_hist = np.zeros((n_teams, max_points + 1), dtype=np.int64)
+
+    for start in range(0, n_sims, BATCH_SIZE):
+        batch = min(BATCH_SIZE, n_sims - start)
+        positions, points = _simulate_batch(probs, home_onehot, away_onehot, base_points, tiebreak, batch, rng)
+        for t in range(n_teams):
+            position_counts[t] += np.bincount(positions[:, t], minlength=n_teams)
+            points_hist[t] += np.bincount(points[:, t], minlength=max_points + 1)
+
+    return position_counts, points_hist
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=SIMULATION_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def shutdown_simulator():
+    """Stop the simulation worker processes (called on server shutdown)"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def simulate_season(teams, table, remaining, probs, n_sims=10_000, seed=None, relegation_places=3):
+    """
+    Simulate the rest of the season n_sims times.
+    probs is a (fixtures x 3) array of home/draw/away probabilities for
+    `remaining`. Returns per-team title, top-4 and relegation probabilities,
+    the expected points distribution and the finishing position distribution.
+    """
+    index = {team: i for i, team in enumerate(teams)}
+    n_teams = len(teams)
+
+    home = np.array([index[h] for h, _ in remaining], dtype=np.int32)
+    away = np.array([index[a] for _, a in remaining], dtype=np.int32)
+    probs = np.asarray(probs, dtype=np.float32).reshape(-1, 3)
+    probs = probs / probs.sum(axis=1, keepdims=True)
+
+    base_points = table['points'].to_numpy()
+    # Goal difference only breaks ties: scaled well below one point
+    tiebreak = table['goal_difference'].to_numpy() * 100.0
+    max_points = int(base_points.max()) + 3 * 2 * (n_teams - 1)
+
+    args = (probs, home, away, base_points, tiebreak)
+    seeds = np.random.SeedSequence(seed)
+
+    if n_sims > PARALLEL_THRESHOLD and SIMULATION_WORKERS > 1:
+        # Independent streams per chunk; only small count arrays come back
+        chunks = [n_sims // SIMULATION_WORKERS + (i < n_sims % SIMULATION_WORKERS) for i in range(SIMULATION_WORKERS)]
+        futures = [
+            _get_executor().submit(_simulate_chunk, *args, n, child, max_points)
+            for n, child in zip(chunks, seeds.spawn(len(chunks)))
+        ]
+        results = [future.result() for future in futures]
+        position_counts = sum(r[0] for r in results)
+        points_hist = sum(r[1] for r in results)
+    else:
+        position_counts, points_hist = _simulate_chunk(*args, n_sims, seeds, max_points)
+
+    position_probs = position_counts / n_sims
+    cumulative = points_hist.cumsum(axis=1) / n_sims
+    values = np.arange(max_points + 1)
+
+    def percentile(t, q):
+        return int(np.searchsorted(cumulative[t], q))
+
+    projections = []
+    for t, team in enumerate(teams):
+        expected = float((points_hist[t] * values).sum() / n_sims)
+        projections.append({
+            "team": team,
+            "played": int(table['played'].iloc[t]),
+            "points": int(base_points[t]),
+            "goal_difference": int(table['goal_difference'].iloc[t]),
+            "expected_points": round(expected, 1),
+            "points_distribution": {
+                "p5": percentile(t, 0.05),
+                "p25": percentile(t, 0.25),
+                "median": percentile(t, 0.5),
+                "p75": percentile(t, 0.75),
+                "p95": percentile(t, 0.95),
+            },
+            "title": round(float(position_probs[t, 0]), 4),
+            "top4": round(float(position_probs[t, :4].sum()), 4),
+            "relegation": round(float(position_probs[t, n_teams - relegation_places:].sum()), 4),
+            "positions": [round(float(p), 4) for p in position_probs[t]],
+        })
+
+    projections.sort(key=lambda p: (-p["expected_points"], -p["goal_difference"]))
+    return projections
@@ -0,0 +1,133 @@
+"""
+In-memory fuzzy search index for team names.
+
+Names are accent-folded and lowercased once when the index is built, then
+indexed by word prefix (for autocomplete) and by trigram (for typo-tolerant
+matching). A query only touches the handful of names that share a prefix
+or trigram with it, so lookups take microseconds instead of re-lowercasing
+every team on every request.
+"""
+
+import re
+import unicodedata
+from collections import defaultdict
+
+# Longest word prefix kept in the prefix table (longer queries use trigrams)
+MAX_PREFIX = 12
+
+# Minimum trigram similarity for a fuzzy (typo) match to be returned, and the
+# shortest query we try fuzzy matching for (shorter ones only match by prefix)
+MIN_SIMILARITY = 0.25
+MIN_FUZZY_LENGTH = 4
+
+# Whole names rank slightly above single words of a name
+NAME_WEIGHT = 1.0
+WORD_WEIGHT = 0.9
+
+
+def normalize(text: str) -> str:
+    """Accent-fold, lowercase and collapse punctuation/whitespace ("Atlético" -> "atletico")"""
+    folded = unicodedata.normalize("NFKD", text or "")
+    folded = "".join(c for c in folded if not unicodedata.combining(c))
+    return " ".join(re.sub(r"[^0-9a-z]+", " ", folded.lower()).split())
+
+
+def trigrams(text: str) -> set:
+    """Word trigrams padded like Postgres pg_trgm ("ab" -> "  a", " ab", "ab ")"""
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TeamIndex:
+    """
+    Search index over arbitrary items (team dicts, plain names...).
+    names(item) returns the strings an item can be found by.
+    """
+
+    def __init__(self, items, names=lambda item: [item]):
+        self.items = list(items)
+
+        # Every searchable string: (item index, normalized text, weight, trigrams)
+        self._entries = []
+        self._by_prefix = defaultdict(set)
+        self._by_trigram = defaultdict(set)
+
+        for item_idx, item in enumerate(self.items):
+            for raw in names(item):
+                text = normalize(raw)
+                if not text:
+                    continue
+                words = text.split()
+                candidates = [(text, NAME_WEIGHT)]
+                if len(words) > 1:
+                    candidates += [(w, WORD_WEIGHT) for w in words]
+
+                for candidate, weight in candidates:
+                    entry_idx = len(self._entries)
+                    grams = trigrams(candidate)
+                    self._entries.append((item_idx, candidate, weight, grams))
+                    for gram in grams:
+                        self._by_trigram[gram].add(entry_idx)
+                    for n in range(1, min(len(candidate), MAX_PREFIX) + 1):
+                        self._by_prefix[candidate[:n]].add(entry_idx)
+
+    def __len__(self):
+        return len(self.items)
+
+    def _score(self, query, query_grams, entry_idx, shared=None):
+        _, text, weight, grams = self._entries[entry_idx]
+        if shared is None:
+            shared = len(query_grams & grams)
+        similarity = shared / (len(query_grams) + len(grams) - shared) if grams else 0
+
+        if text == query:
+            base = 3.0
+        elif text.startswith(query):
+            base = 2.0
+        elif query in text:
+            base = 1.0
+        elif similarity >= MIN_SIMILARITY and len(query) >= MIN_FUZZY_LENGTH:
+            base = 0.0
+        else:
+            return None
+        return (base + similarity) * weight
+
+    def search(self, query: str, limit: int | None = 10):
+        """
+        Return matching items, best first.
+        Ranking: exact match, then prefix, then substring, then typo matches
+        by trigram similarity.
+        """
+        q = normalize(query)
+        if not q:
+            return []
+        query_grams = trigrams(q)
+
+        # Count shared trigrams for every entry that has at least one
+        shared = defaultdict(int)
+        for gram in query_grams:
+            for entry_idx in self._by_trigram.get(gram, ()):
+                shared[entry_idx] += 1
+
+        candidates = set(shared) | self._by_prefix.get(q[:MAX_PREFIX], set())
+        if len(q) < 3:
+            # Very short queries share few trigrams - fall back to a plain
+            # substring check so "fc" still finds "... fc" mid-name
+            candidates |= {i for i, entry in enumerate(self._entries) if q in entry[1]}
+
+        best = {}
+        for entry_idx in candidates:
+            score = self._score(q, query_grams, entry_idx, shared.get(entry_idx))
+            if score is None:
+                continue
+            item_idx = self._entries[entry_idx][0]
+            if score > best.get(item_idx, -1):
+                best[item_idx] = score
+
+        ranked = sorted(best, key=lambda i: (-best[i], i))
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [self.items[i] for i in ranked]
@@ -0,0 +1,16 @@
+"""
+Test configuration: a throwaway SQLite database and cheap password hashing,
+set before any backend module reads its environment.
+"""
+
+import os
+import tempfile
+
+_tmp = tempfile.mkdtemp(prefix="backend-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp, 'test.db')}"
+os.environ["MODEL_ARTIFACT_DIR"] = os.path.join(_tmp, "artifacts")
+os.environ["LOCK_DIR"] = os.path.join(_tmp, "locks")
+os.environ.setdefault("SECRET_KEY", "test")
+os.environ["BCRYPT_ROUNDS"] = "4"
+os.environ["PASSWORD_HASH_WORKERS"] = "0"
+os.environ["PASSWORD_HASH_MAX_PENDING"] = "1000000"
@@ -0,0 +1,26 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import auth
+from routers import auth as auth_router
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(auth, "ADMIN_USER_IDS", {1})
+    app = FastAPI()
+    app.include_router(auth_router.router, prefix="/api/auth")
+    return TestClient(app)
+
+
+def _headers(user_id):
+    return {"Authorization": f"Bearer {auth.create_access_token({'sub': str(user_id)})}"}
+
+
+def test_cache_stats_requires_an_admin(client):
+    assert client.get("/api/auth/cache-stats").status_code == 401
+    assert client.get("/api/auth/cache-stats", headers=_headers(2)).status_code == 403
+
+    response = client.get("/api/auth/cache-stats", headers=_headers(1))
+    assert response.status_code == 200
@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+
+from artifacts import CompiledForest
+
+
+def _data(rows=600, seed=0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.normal(size=(rows, 6)), columns=[f"f{i}" for i in range(6)])
+    y = np.select([X["f0"] + X["f1"] > 0.5, X["f0"] - X["f2"] < -0.5], [2, 0], 1)
+    return X, y
+
+
+def test_compiled_forest_matches_sklearn():
+    X, y = _data()
+    forest = RandomForestClassifier(n_estimators=25, max_depth=8, min_samples_leaf=3, random_state=0)
+    forest.fit(X[:400], y[:400])
+    compiled = CompiledForest.from_forest(forest)
+
+    test = X[400:]
+    assert np.allclose(compiled.predict_proba(test), forest.predict_proba(test))
+    assert (compiled.predict(test) == forest.predict(test)).all()
+    assert list(compiled.classes_) == list(forest.classes_)
+
+
+def test_compiled_forest_reorders_columns_and_handles_unlimited_depth():
+    X, y = _data(seed=1)
+    forest = RandomForestClassifier(n_estimators=10, random_state=1).fit(X, y)
+    compiled = CompiledForest.from_forest(forest)
+
+    shuffled = X[list(reversed(X.columns))]
+    assert np.allclose(compiled.predict_proba(shuffled), forest.predict_proba(X))
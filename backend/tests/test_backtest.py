@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from backtest import score
+
+
+def test_perfect_predictions():
+    probs = np.eye(3)
+    result = score(probs, np.array([0, 1, 2]))
+    assert result["accuracy"] == 1
+    assert result["brier"] == 0
+    assert result["log_loss"] == pytest.approx(0, abs=1e-4)
+
+
+def test_uniform_predictions():
+    probs = np.full((4, 3), 1 / 3)
+    result = score(probs, np.array([0, 1, 2, 0]))
+    assert result["log_loss"] == round(np.log(3), 4)
+    assert result["brier"] == round(2 / 3, 4)
+
+
+def test_known_values():
+    probs = np.array([[0.5, 0.3, 0.2], [0.1, 0.2, 0.7]])
+    result = score(probs, np.array([0, 1]))
+    assert result["accuracy"] == 0.5
+    assert result["log_loss"] == round(-(np.log(0.5) + np.log(0.2)) / 2, 4)
+    assert result["brier"] == round(((0.25 + 0.09 + 0.04) + (0.01 + 0.64 + 0.49)) / 2, 4)
+
+
+def test_certain_miss_is_clipped():
+    result = score(np.array([[1.0, 0.0, 0.0]]), np.array([2]))
+    assert np.isfinite(result["log_loss"])
+    assert result["brier"] == 2
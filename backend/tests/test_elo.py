@@ -0,0 +1,63 @@
+import pandas as pd
+import pytest
+
+from elo import HOME_ADVANTAGE, INITIAL_RATING, K_FACTOR, EloRatings
+
+
+def _results(*rows):
+    return pd.DataFrame(
+        [{"Date": pd.Timestamp(date), "home_team": home, "away_team": away,
+          "home_goals": hg, "away_goals": ag} for date, home, away, hg, ag in rows]
+    )
+
+
+def test_win_moves_ratings_symmetrically():
+    elo = EloRatings()
+    elo.update(_results(("2024-08-01", "A", "B", 1, 0)))
+    assert elo.rating("A") > INITIAL_RATING > elo.rating("B")
+    assert elo.rating("A") + elo.rating("B") == pytest.approx(2 * INITIAL_RATING)
+
+    # Home win between equals: the home side was already favoured by HOME_ADVANTAGE
+    expected = 1 / (1 + 10 ** (-HOME_ADVANTAGE / 400))
+    assert elo.rating("A") - INITIAL_RATING == pytest.approx(K_FACTOR * (1 - expected))
+
+
+def test_draw_at_home_costs_the_home_side():
+    elo = EloRatings()
+    elo.update(_results(("2024-08-01", "A", "B", 1, 1)))
+    assert elo.rating("A") < INITIAL_RATING < elo.rating("B")
+
+
+def test_update_returns_pre_match_ratings_and_skips_seen_results():
+    elo = EloRatings()
+    df = _results(("2024-08-01", "A", "B", 2, 0), ("2024-08-08", "B", "A", 0, 0))
+    home_before, away_before, index = elo.update(df)
+    assert list(index) == [0, 1]
+    assert home_before[0] == away_before[0] == INITIAL_RATING
+    assert home_before[1] == pytest.approx(elo.rating("B", "2024-08-08"))
+
+    # Re-running the same results (and a new one) only processes the new one
+    more = pd.concat([df, _results(("2024-08-15", "A", "C", 1, 0))], ignore_index=True)
+    _, _, index = elo.update(more)
+    assert list(index) == [2]
+    assert elo.matches == 3
+
+
+def test_as_of_excludes_results_on_and_after_the_date():
+    elo = EloRatings()
+    elo.update(_results(("2024-08-01", "A", "B", 3, 0), ("2024-08-08", "B", "A", 3, 0)))
+    assert elo.rating("A", "2024-08-01") == INITIAL_RATING
+    after_first = elo.rating("A", "2024-08-02")
+    assert after_first > INITIAL_RATING
+    assert elo.rating("A", "2024-08-08") == after_first
+    assert elo.rating("A") < after_first
+    assert elo.rating("Unknown") == INITIAL_RATING
+
+
+def test_table_is_ranked():
+    elo = EloRatings()
+    elo.update(_results(("2024-08-01", "A", "B", 2, 0), ("2024-08-02", "C", "B", 0, 1)))
+    table = elo.table()
+    assert [row["rank"] for row in table] == [1, 2, 3]
+    assert table[0]["team"] == "A"
+    assert [row["team"] for row in elo.table(teams=["C", "B", "Nobody"])] == ["B", "C"]
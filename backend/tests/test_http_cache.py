@@ -0,0 +1,51 @@
+import json
+
+from starlette.requests import Request
+
+from http_cache import conditional_json, etag_matches, make_etag
+
+
+def _request(if_none_match=None):
+    headers = [] if if_none_match is None else [(b"if-none-match", if_none_match.encode())]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+def test_make_etag_is_stable_and_quoted():
+    assert make_etag(("v", 1)) == make_etag(("v", 1))
+    assert make_etag(("v", 1)) != make_etag(("v", 2))
+    assert make_etag(b"body").startswith('"') and make_etag(b"body").endswith('"')
+
+
+def test_etag_matches():
+    etag = make_etag("v1")
+    assert not etag_matches(_request(), etag)
+    assert etag_matches(_request(etag), etag)
+    assert etag_matches(_request(f'"other", W/{etag}'), etag)
+    assert etag_matches(_request("*"), etag)
+    assert not etag_matches(_request('"other"'), etag)
+
+
+def test_conditional_json_by_version_skips_building_for_304():
+    built = []
+
+    def content():
+        built.append(True)
+        return {"a": 1}
+
+    response = conditional_json(_request(), content, version="v1", cache_control="max-age=60")
+    assert response.status_code == 200
+    assert json.loads(response.body) == {"a": 1}
+    assert response.headers["cache-control"] == "max-age=60"
+
+    etag = response.headers["etag"]
+    not_modified = conditional_json(_request(etag), content, version="v1")
+    assert not_modified.status_code == 304
+    assert not_modified.body == b""
+    assert len(built) == 1
+
+
+def test_conditional_json_without_version_hashes_the_body():
+    first = conditional_json(_request(), {"a": 1})
+    assert conditional_json(_request(), {"a": 1}).headers["etag"] == first.headers["etag"]
+    assert conditional_json(_request(), {"a": 2}).headers["etag"] != first.headers["etag"]
+    assert conditional_json(_request(first.headers["etag"]), {"a": 1}).status_code == 304
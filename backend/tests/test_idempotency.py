@@ -0,0 +1,78 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import func, select
+
+import models
+from auth import get_current_user
+from database import engine
+from pipeline import IDEMPOTENCY_KEY_TTL_HOURS, prune_idempotency_keys
+from routers import prediction_history
+
+BODY = {"predictions": [{
+    "home_team": "Arsenal", "away_team": "Chelsea", "predicted_outcome": "home",
+    "home_win_prob": 0.5, "draw_prob": 0.3, "away_win_prob": 0.2,
+}]}
+
+
+@pytest.fixture
+def app():
+    models.Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        for table in (models.IdempotencyKey, models.PredictionHistory, models.User):
+            conn.execute(table.__table__.delete())
+        conn.execute(models.User.__table__.insert().values(
+            id=1, email="a@example.com", username="a", hashed_password="x"
+        ))
+    app = FastAPI()
+    app.include_router(prediction_history.router, prefix="/api/prediction-history")
+    app.dependency_overrides[get_current_user] = lambda: 1
+    return app
+
+
+def _post(app, *requests):
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return [
+                await client.post("/api/prediction-history/bulk", json=body, headers={"Idempotency-Key": key})
+                for key, body in requests
+            ]
+    return asyncio.run(run())
+
+
+def _count(table):
+    with engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(table)).scalar()
+
+
+def test_retry_returns_the_original_response(app):
+    first, retry = _post(app, ("k1", BODY), ("k1", BODY))
+    assert first.status_code == retry.status_code == 200
+    assert retry.json() == first.json()
+    assert _count(models.PredictionHistory) == 1
+
+
+def test_key_reused_with_a_different_body_is_rejected(app):
+    other = {"predictions": [{**BODY["predictions"][0], "predicted_outcome": "away"}]}
+    first, reused = _post(app, ("k1", BODY), ("k1", other))
+    assert first.status_code == 200
+    assert reused.status_code == 422
+    assert _count(models.PredictionHistory) == 1
+
+
+def test_expired_keys_are_pruned(app):
+    _post(app, ("old", BODY), ("new", BODY))
+    with engine.begin() as conn:
+        conn.execute(
+            models.IdempotencyKey.__table__.update()
+            .where(models.IdempotencyKey.key == "old")
+            .values(created_at=datetime.utcnow() - timedelta(hours=IDEMPOTENCY_KEY_TTL_HOURS + 1))
+        )
+    prune_idempotency_keys()
+    with engine.connect() as conn:
+        keys = conn.execute(select(models.IdempotencyKey.key)).scalars().all()
+    assert keys == ["new"]
@@ -0,0 +1,21 @@
+import metrics
+
+
+def test_scrape_token(monkeypatch):
+    monkeypatch.setattr(metrics, "SCRAPE_TOKEN", "s3cret")
+    assert metrics.scrape_authorized("Bearer s3cret")
+    assert metrics.scrape_authorized("bearer s3cret")
+    assert not metrics.scrape_authorized("Bearer wrong")
+    assert not metrics.scrape_authorized("Basic s3cret")
+    assert not metrics.scrape_authorized(None)
+
+
+def test_no_token_configured(monkeypatch):
+    monkeypatch.setattr(metrics, "SCRAPE_TOKEN", None)
+    assert not metrics.scrape_authorized("Bearer ")
+
+
+def test_render_leaves_out_what_it_isnt_given():
+    body = metrics.render(tiers=None)
+    assert "db_pool_" not in body
+    assert "auth_cache_" not in body
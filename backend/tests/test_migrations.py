@@ -0,0 +1,81 @@
+import threading
+
+import pytest
+from sqlalchemy import Index, create_engine, inspect, select, text
+
+import migrations
+import models
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrate.db'}")
+    models.Base.metadata.create_all(engine)
+    # As if the indexes were added to the models after the tables were created
+    for table in models.Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.drop(engine)
+    return engine
+
+
+def test_concurrent_workers_migrate_once(engine):
+    errors = []
+
+    def worker():
+        try:
+            migrations.migrate(engine)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    names = {index["name"] for index in inspect(engine).get_indexes("favourites")}
+    assert "uq_favourites_user_team" in names
+
+
+def test_duplicate_favourites_are_removed_once(engine, monkeypatch):
+    with engine.begin() as conn:
+        conn.execute(models.User.__table__.insert().values(id=1, email="a@example.com", username="a", hashed_password="x"))
+        conn.execute(models.Favourite.__table__.insert(), [
+            {"id": 1, "user_id": 1, "team_id": 57, "team_name": "Arsenal"},
+            {"id": 2, "user_id": 1, "team_id": 57, "team_name": "Arsenal"},
+            {"id": 3, "user_id": 1, "team_id": 61, "team_name": "Chelsea"},
+        ])
+
+    migrations.migrate(engine)
+    with engine.connect() as conn:
+        ids = conn.execute(select(models.Favourite.id).order_by(models.Favourite.id)).scalars().all()
+        assert ids == [1, 3]
+        assert migrations._steps_done(conn) == len(migrations.STEPS)
+
+    # Already applied: a later start doesn't run the step again
+    monkeypatch.setattr(migrations, "STEPS", [lambda conn: pytest.fail("step ran twice")] * len(migrations.STEPS))
+    migrations.migrate(engine)
+
+
+def test_request_hash_column_is_added(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    models.Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE idempotency_keys"))
+        conn.execute(text(
+            "CREATE TABLE idempotency_keys (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, "
+            "key VARCHAR NOT NULL, response TEXT, created_at DATETIME)"
+        ))
+
+    migrations.migrate(engine)
+    assert "request_hash" in {c["name"] for c in inspect(engine).get_columns("idempotency_keys")}
+
+
+def test_index_created_elsewhere_is_not_an_error(engine, monkeypatch):
+    migrations.create_indexes(engine)
+
+    # checkfirst can't see an index another host creates at the same moment
+    create = Index.create
+    monkeypatch.setattr(Index, "create", lambda self, bind, checkfirst: create(self, bind, checkfirst=False))
+    migrations.create_indexes(engine)
@@ -0,0 +1,44 @@
+import pytest
+
+import pipeline
+
+
+class FakeLock:
+    def __init__(self, locked):
+        self.locked = locked
+        self.probes = 0
+
+    def is_locked(self):
+        self.probes += 1
+        return self.locked
+
+
+def test_run_lock_probe_is_reused(monkeypatch):
+    lock = FakeLock(True)
+    monkeypatch.setattr(pipeline, "_run_lock", lock)
+    monkeypatch.setattr(pipeline, "_run_lock_probe", (float("-inf"), False))
+    clock = [100.0]
+    monkeypatch.setattr(pipeline.time, "monotonic", lambda: clock[0])
+
+    assert all(pipeline._run_in_progress() for _ in range(10))
+    assert lock.probes == 1
+
+    lock.locked = False
+    clock[0] += pipeline.RUN_LOCK_CHECK_SECONDS
+    assert not pipeline._run_in_progress()
+    assert lock.probes == 2
+
+
+def test_status_polls_read_the_stored_backtest_summary(monkeypatch):
+    import backtest
+    import models
+    import registry
+    from database import engine
+
+    models.Base.metadata.create_all(engine)
+    registry.put("backtest", "England", {"matches": 100, "seasons": {"2024": {}}})
+    pipeline.publish_backtest_summary()
+
+    monkeypatch.setattr(backtest, "summary", lambda: pytest.fail("status poll read the registry"))
+    status = pipeline.get_pipeline_status()
+    assert status["backtest"] == {"England": {"matches": 100}}
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from poisson import MAX_GOALS, PoissonModel
+
+
+@pytest.fixture(scope="module")
+def model():
+    rng = np.random.default_rng(0)
+    teams = ["Strong", "Middle", "Weak", "Awful"]
+    strength = {"Strong": 2.2, "Middle": 1.4, "Weak": 1.0, "Awful": 0.6}
+    rows = []
+    date = pd.Timestamp("2023-08-01")
+    for _ in range(20):
+        for home in teams:
+            for away in teams:
+                if home != away:
+                    date += pd.Timedelta(days=1)
+                    rows.append({
+                        "Date": date,
+                        "home_team": home,
+                        "away_team": away,
+                        "home_goals": rng.poisson(strength[home] * 1.2 / strength[away]),
+                        "away_goals": rng.poisson(strength[away] / strength[home]),
+                    })
+    return PoissonModel.fit(pd.DataFrame(rows))
+
+
+def test_grids_are_normalized(model):
+    n = len(model.teams)
+    home, away = np.repeat(np.arange(n), n), np.tile(np.arange(n), n)
+    grids = model.grids(home, away)
+    assert grids.shape == (n * n, MAX_GOALS + 1, MAX_GOALS + 1)
+    assert np.allclose(grids.sum(axis=(1, 2)), 1)
+    assert (grids >= 0).all()
+
+
+def test_outcome_probabilities_match_predict(model):
+    home, draw, away = model.outcome_probabilities([model.index["Strong"]], [model.index["Awful"]])
+    assert np.allclose(home + draw + away, 1)
+
+    prediction = model.predict("Strong", "Awful")
+    probs = prediction["probabilities"]
+    assert probs["home"] == pytest.approx(home[0])
+    assert probs["draw"] == pytest.approx(draw[0])
+    assert probs["away"] == pytest.approx(away[0])
+    assert sum(probs.values()) == pytest.approx(1)
+
+
+def test_stronger_team_is_favoured(model):
+    prediction = model.predict("Strong", "Awful")
+    assert prediction["probabilities"]["home"] > prediction["probabilities"]["away"]
+    assert prediction["expected_goals"]["home"] > prediction["expected_goals"]["away"]
+
+    # Home advantage: the same fixture reversed is less one-sided
+    reverse = model.predict("Awful", "Strong")
+    assert reverse["probabilities"]["away"] < prediction["probabilities"]["home"]
+
+
+def test_predict_scorelines_and_totals(model):
+    prediction = model.predict("Middle", "Weak", top_scorelines=3)
+    scorelines = [s["probability"] for s in prediction["scorelines"]]
+    assert len(scorelines) == 3
+    assert scorelines == sorted(scorelines, reverse=True)
+    for line in prediction["over_under"].values():
+        assert line["over"] + line["under"] == pytest.approx(1, abs=0.002)
@@ -0,0 +1,27 @@
+import base64
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from routers.prediction_history import _decode_cursor, _encode_cursor
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2024, 8, 1, 12, 30, 15, 123456)
+    cursor = _encode_cursor(SimpleNamespace(created_at=created_at, id=42))
+    assert _decode_cursor(cursor) == (created_at, 42)
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    base64.urlsafe_b64encode(b"2024-08-01T12:00:00").decode(),
+    base64.urlsafe_b64encode(b"yesterday|1").decode(),
+    base64.urlsafe_b64encode(b"2024-08-01T12:00:00|abc").decode(),
+    base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+])
+def test_invalid_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as e:
+        _decode_cursor(cursor)
+    assert e.value.status_code == 400
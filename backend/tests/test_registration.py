@@ -0,0 +1,67 @@
+import asyncio
+from collections import Counter
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import func, select
+
+import models
+from database import engine
+from routers import auth as auth_router
+
+SIGNUPS = 20
+
+
+@pytest.fixture
+def app():
+    models.Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(models.User.__table__.delete())
+    app = FastAPI()
+    app.include_router(auth_router.router, prefix="/api/auth")
+    return app
+
+
+def _race(app, bodies):
+    async def run():
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(client.post("/api/auth/register", json=body) for body in bodies))
+    return asyncio.run(run())
+
+
+def _users(**where):
+    with engine.connect() as conn:
+        query = select(func.count()).select_from(models.User)
+        for column, value in where.items():
+            query = query.where(getattr(models.User, column) == value)
+        return conn.execute(query).scalar()
+
+
+@pytest.mark.parametrize("clash", ["email", "username"])
+def test_concurrent_signups_create_one_account(app, clash):
+    bodies = [
+        {
+            "email": "same@example.com" if clash == "email" else f"user{i}@example.com",
+            "username": "same" if clash == "username" else f"user{i}",
+            "password": "password",
+        }
+        for i in range(SIGNUPS)
+    ]
+    responses = _race(app, bodies)
+
+    assert Counter(r.status_code for r in responses) == {200: 1, 400: SIGNUPS - 1}
+    taken = "Email already registered" if clash == "email" else "Username already taken"
+    assert all(r.json()["detail"] == taken for r in responses if r.status_code == 400)
+    assert _users() == 1
+    assert _users(**{clash: "same@example.com" if clash == "email" else "same"}) == 1
+
+
+def test_distinct_signups_all_succeed(app):
+    bodies = [
+        {"email": f"user{i}@example.com", "username": f"user{i}", "password": "password"}
+        for i in range(5)
+    ]
+    assert [r.status_code for r in _race(app, bodies)] == [200] * 5
+    assert _users() == 5
@@ -0,0 +1,44 @@
+from team_search import TeamIndex, normalize, trigrams
+
+TEAMS = ["Arsenal", "Aston Villa", "Atlético Madrid", "Real Madrid", "Manchester United",
+         "Manchester City", "Bayern München", "Borussia Dortmund"]
+
+
+def test_normalize_folds_accents_and_punctuation():
+    assert normalize("Atlético  Madrid") == "atletico madrid"
+    assert normalize("Bayern-München!") == "bayern munchen"
+    assert normalize(None) == ""
+
+
+def test_trigrams_are_padded():
+    assert trigrams("ab") == {"  a", " ab", "ab "}
+
+
+def test_exact_then_prefix_matches():
+    index = TeamIndex(TEAMS)
+    assert index.search("arsenal")[0] == "Arsenal"
+    assert index.search("man") == ["Manchester City", "Manchester United"]
+    assert index.search("a", limit=2) == ["Arsenal", "Aston Villa"]
+
+
+def test_word_and_accent_insensitive_matches():
+    index = TeamIndex(TEAMS)
+    assert set(index.search("madrid")) == {"Atlético Madrid", "Real Madrid"}
+    assert index.search("munchen") == ["Bayern München"]
+    assert index.search("ATLETICO")[0] == "Atlético Madrid"
+
+
+def test_typos_match_by_trigram():
+    index = TeamIndex(TEAMS)
+    assert index.search("dortmnud")[0] == "Borussia Dortmund"
+    assert index.search("xyzzy") == []
+    assert index.search("") == []
+
+
+def test_items_with_several_names():
+    teams = [{"id": 1, "name": "Manchester United", "short": "Man Utd"},
+             {"id": 2, "name": "Tottenham Hotspur", "short": "Spurs"}]
+    index = TeamIndex(teams, names=lambda t: [t["name"], t["short"]])
+    assert index.search("spurs") == [teams[1]]
+    assert index.search("utd") == [teams[0]]
+    assert len(index) == 2
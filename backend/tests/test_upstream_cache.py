@@ -0,0 +1,22 @@
+import asyncio
+
+from upstream_cache import UpstreamCache
+
+
+def test_async_access_shares_the_disk_layer(tmp_path):
+    path = str(tmp_path / "upstream.sqlite3")
+
+    async def run():
+        writer, reader = UpstreamCache(path), UpstreamCache(path)
+        assert await reader.aget("teams:PL") is None
+
+        await writer.aset("teams:PL", [{"id": 57}], '"v1"')
+        entry = await reader.aget("teams:PL", ttl=60)
+        assert entry.payload == [{"id": 57}]
+        assert entry.etag == '"v1"'
+
+        touched = await reader.atouch("teams:PL")
+        assert touched.fetched_at >= entry.fetched_at
+        assert (await writer.aget("teams:PL", ttl=0)).fetched_at == touched.fetched_at
+
+    asyncio.run(run())
@@ -0,0 +1,144 @@
+"""
+Model tiers - the league forest, plus a fast linear model to fall back on.
+
+Every league gets two models trained on the same features:
+
+    forest   the Random Forest (most accurate, slowest)
+    fast     a standardized multinomial logistic regression, evaluated as
+             one small matrix product (LinearModel), so it costs
+             microseconds whatever the forest's size
+
+With tier "auto" (the default) each prediction uses the forest unless
+    - the forest's recent latency (an exponential moving average of whole
+      predict_match calls) is over the latency budget (per request, or
+      PREDICT_LATENCY_BUDGET_MS), or
+    - PREDICT_FAST_TIER_INFLIGHT or more predictions are already running
+      in this worker,
+in which case it uses the fast tier. While over budget, one auto request
+in PROBE_EVERY still goes to the forest so its latency estimate can
+recover. Responses say which tier answered and why.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import StandardScaler
+
+TIERS = ("forest", "fast")
+
+# Default latency budget for a prediction in ms (0 = no budget)
+LATENCY_BUDGET_MS = float(os.getenv("PREDICT_LATENCY_BUDGET_MS", 0))
+
+# Predictions running at once in this worker at which new ones go to the fast tier (0 = never)
+FAST_TIER_INFLIGHT = int(os.getenv("PREDICT_FAST_TIER_INFLIGHT", 8))
+
+# While over budget, send one auto request in this many to the forest anyway
+PROBE_EVERY = 20
+
+# Weight of the newest sample in the latency moving average
+_EWMA_ALPHA = 0.2
+
+_lock = threading.Lock()
+_in_flight = 0
+_latency = {}  # tier -> moving average in seconds
+_counts = {tier: 0 for tier in TIERS}
+_over_budget = 0
+
+
+class LinearModel:
+    """
+    A fitted StandardScaler + LogisticRegression folded into plain arrays;
+    predict/predict_proba match the sklearn pair they were built from.
+    """
+
+    def __init__(self, mean, scale, coef, intercept, classes, feature_names):
+        self.mean = mean
+        self.scale = scale
+        self.coef = coef
+        self.intercept = intercept
+        self.classes_ = np.asarray(classes)
+        self.feature_names = list(feature_names) if feature_names is not None else None
+
+    @classmethod
+    def fit(cls, X, y):
+        scaler = StandardScaler().fit(X)
+        model = LogisticRegression(class_weight='balanced', max_iter=1000)
+        model.fit(scaler.transform(X), y)
+        return cls(
+            scaler.mean_, scaler.scale_, model.coef_, model.intercept_,
+            model.classes_, getattr(X, "columns", None),
+        )
+
+    def predict_proba(self, X):
+        if self.feature_names is not None and hasattr(X, "columns"):
+            X = X[self.feature_names]
+        X = np.asarray(X, dtype=float)
+        scores = ((X - self.mean) / self.scale) @ self.coef.T + self.intercept
+        scores = np.exp(scores - scores.max(axis=1, keepdims=True))
+        return scores / scores.sum(axis=1, keepdims=True)
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+def choose(requested="auto", budget_ms=None):
+    """(tier, reason) for a prediction; requested is "auto" or a tier name"""
+    global _over_budget
+
+    if requested in TIERS:
+        return requested, "requested"
+
+    budget_ms = LATENCY_BUDGET_MS if budget_ms is None else budget_ms
+    with _lock:
+        forest_ms = _latency.get("forest", 0) * 1000
+        if budget_ms and forest_ms > budget_ms:
+            _over_budget += 1
+            if _over_budget % PROBE_EVERY:
+                return "fast", f"forest averaging {forest_ms:.1f}ms, budget {budget_ms:g}ms"
+            return "forest", "latency probe"
+        _over_budget = 0
+
+        if FAST_TIER_INFLIGHT and _in_flight >= FAST_TIER_INFLIGHT:
+            return "fast", f"{_in_flight} predictions in flight"
+
+    return "forest", "default"
+
+
+@contextmanager
+def track(tier):
+    """Count a prediction as in flight and record its latency under tier"""
+    global _in_flight
+
+    with _lock:
+        _in_flight += 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        with _lock:
+            _in_flight -= 1
+            _counts[tier] += 1
+            previous = _latency.get(tier)
+            _latency[tier] = elapsed if previous is None else previous + _EWMA_ALPHA * (elapsed - previous)
+
+
+def stats():
+    """Per-tier request counts and latency averages, and current load"""
+    with _lock:
+        return {
+            "in_flight": _in_flight,
+            "latency_budget_ms": LATENCY_BUDGET_MS,
+            "fast_tier_inflight": FAST_TIER_INFLIGHT,
+            "tiers": {
+                tier: {
+                    "requests": _counts[tier],
+                    "avg_latency_ms": round(_latency[tier] * 1000, 2) if tier in _latency else None,
+                }
+                for tier in TIERS
+            },
+        }
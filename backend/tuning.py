@@ -0,0 +1,118 @@
+"""
+Offline hyperparameter search for the league forests.
+
+    python -m tuning                      # every league, all cores
+    python -m tuning --leagues England Spain --splits 5 --jobs 4
+
+For each league, a GridSearchCV over PARAM_GRID with walk-forward
+TimeSeriesSplit folds (each fold trains on the past and scores the block
+after it) runs on the first 80% of matches, in parallel over all cores.
+The engineered features come from predictor.get_league_features, so they
+are computed once per dataset version (and shared through the artifact
+store) instead of per league per run. The best parameters are compared
+with DEFAULT_PARAMS on the held-out last 20% and written to the model
+registry ("params:<league>"), which train_model and the pipeline read.
+Running workers drop a tuned league's forest at their next artifact check
+(pipeline.sync_models); the forest is then trained with the new
+parameters once and shared, as artifacts are keyed by parameters.
+"""
+
+import argparse
+import time
+from datetime import datetime
+
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score, log_loss
+from sklearn.model_selection import GridSearchCV, TimeSeriesSplit
+
+PARAM_GRID = {
+    "n_estimators": [100, 300],
+    "max_depth": [5, 10, None],
+    "min_samples_split": [5, 20],
+    "min_samples_leaf": [1, 5],
+}
+
+
+def _forest(**params):
+    return RandomForestClassifier(**params, class_weight='balanced', random_state=42)
+
+
+def tune_league(league, n_splits=5, n_jobs=-1, param_grid=None):
+    """Search one league and return its registry entry"""
+    import predictor
+
+    start = time.perf_counter()
+    df_league = predictor.get_league_features(league).dropna(subset=predictor.FEATURES + ['winner'])
+    features_seconds = time.perf_counter() - start
+
+    X = df_league[predictor.FEATURES].to_numpy()
+    y = predictor._le.transform(df_league['winner'])
+    split = int(len(X) * 0.8)  # same holdout as train_model
+    X_train, X_test, y_train, y_test = X[:split], X[split:], y[:split], y[split:]
+
+    search = GridSearchCV(
+        _forest(),
+        param_grid or PARAM_GRID,
+        cv=TimeSeriesSplit(n_splits=n_splits),
+        scoring={"log_loss": "neg_log_loss", "accuracy": "accuracy"},
+        refit="log_loss",
+        n_jobs=n_jobs,
+    )
+    search.fit(X_train, y_train)
+
+    def holdout(model):
+        return {
+            "accuracy": round(float(accuracy_score(y_test, model.predict(X_test))), 4),
+            "log_loss": round(float(log_loss(y_test, model.predict_proba(X_test), labels=[0, 1, 2])), 4),
+        }
+
+    best = search.best_index_
+    return {
+        "params": search.best_params_,
+        "cv": {
+            "log_loss": round(float(-search.cv_results_["mean_test_log_loss"][best]), 4),
+            "accuracy": round(float(search.cv_results_["mean_test_accuracy"][best]), 4),
+            "splits": n_splits,
+            "candidates": len(search.cv_results_["params"]),
+        },
+        "holdout": holdout(search.best_estimator_),
+        "holdout_default": holdout(_forest(**predictor.DEFAULT_PARAMS).fit(X_train, y_train)),
+        "data_version": predictor.data_version(),
+        "tuned_at": datetime.now().isoformat(),
+        "features_seconds": round(features_seconds, 2),
+        "seconds": round(time.perf_counter() - start, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune the league forests and save the best parameters")
+    parser.add_argument("--leagues", nargs="*", help="default: every league in the dataset")
+    parser.add_argument("--splits", type=int, default=5, help="TimeSeriesSplit folds")
+    parser.add_argument("--jobs", type=int, default=-1, help="parallel fits (-1 = all cores)")
+    parser.add_argument("--dry-run", action="store_true", help="report without saving to the registry")
+    args = parser.parse_args()
+
+    import predictor
+    import registry
+
+    leagues = args.leagues or sorted(predictor._df['league'].unique())
+    total = time.perf_counter()
+
+    for league in leagues:
+        print(f"🔧 Tuning {league}...")
+        entry = tune_league(league, args.splits, args.jobs)
+        if not args.dry_run:
+            registry.put("params", league, entry)
+
+        print(f"  ✓ {league}: {entry['params']}")
+        print(f"    CV log-loss {entry['cv']['log_loss']:.4f}, accuracy {entry['cv']['accuracy']:.1%} "
+              f"({entry['cv']['candidates']} candidates x {entry['cv']['splits']} folds)")
+        print(f"    holdout accuracy {entry['holdout']['accuracy']:.1%} (defaults {entry['holdout_default']['accuracy']:.1%}), "
+              f"log-loss {entry['holdout']['log_loss']:.4f} (defaults {entry['holdout_default']['log_loss']:.4f})")
+        print(f"    wall time {entry['seconds']:.1f}s (features {entry['features_seconds']:.1f}s)")
+
+    print(f"✅ Tuned {len(leagues)} leagues in {time.perf_counter() - total:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Persistent cache for football-data.org responses.
+
+Normalized payloads built by the matches/teams routers are kept in memory
+and mirrored to a small SQLite file, so restarts and extra uvicorn workers
+on the same host can serve straight away instead of re-fetching everything
+and burning the API rate limit. Each entry remembers when it was fetched and
+the upstream ETag, so stale entries can be revalidated with If-None-Match.
+
+Async route handlers use aget/aset/atouch, which keep the SQLite reads and
+writes off the event loop (a fresh in-memory hit is still answered inline).
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# SQLite file shared by all workers on the host (override with UPSTREAM_CACHE_PATH)
+CACHE_PATH = os.getenv(
+    "UPSTREAM_CACHE_PATH",
+    os.path.join(os.path.dirname(__file__), "cache", "upstream.sqlite3"),
+)
+
+
+@dataclass
+class CacheEntry:
+    """A cached normalized payload plus its upstream metadata"""
+    payload: object
+    fetched_at: float
+    etag: str | None = None
+
+    def age(self) -> float:
+        """Seconds since the payload was fetched (or last revalidated)"""
+        return time.time() - self.fetched_at
+
+    def is_fresh(self, ttl: float) -> bool:
+        return self.age() < ttl
+
+
+class UpstreamCache:
+    """
+    Two-level cache: a per-process dict in front of a SQLite table.
+    SQLite handles locking between workers, so writes from one worker
+    are visible to the others on their next miss.
+    """
+
+    def __init__(self, path: str = CACHE_PATH):
+        self.path = path
+        self._memory: dict[str, CacheEntry] = {}
+        self._lock = threading.Lock()
+        self._ready = False
+
+    @contextmanager
+    def _connect(self):
+        """Open a short-lived connection, committing on success"""
+        if not self._ready:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5)
+        if not self._ready:
+            # WAL lets readers in other workers proceed while one worker writes
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " payload TEXT NOT NULL,"
+                " fetched_at REAL NOT NULL,"
+                " etag TEXT)"
+            )
+            self._ready = True
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def load(self) -> int:
+        """Warm the in-memory layer from disk (called at startup)"""
+        try:
+            with self._connect() as conn:
+                rows = conn.execute(
+                    "SELECT key, payload, fetched_at, etag FROM responses"
+                ).fetchall()
+        except (sqlite3.Error, OSError) as e:
+            print(f"Upstream cache unavailable: {e}")
+            return 0
+
+        with self._lock:
+            for key, payload, fetched_at, etag in rows:
+                self._memory[key] = CacheEntry(json.loads(payload), fetched_at, etag)
+
+        print(f"✓ Loaded {len(rows)} cached upstream responses")
+        return len(rows)
+
+    def _read_disk(self, key: str) -> CacheEntry | None:
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT payload, fetched_at, etag FROM responses WHERE key = ?",
+                    (key,),
+                ).fetchone()
+        except (sqlite3.Error, OSError) as e:
+            print(f"Upstream cache read failed for {key}: {e}")
+            return None
+        if row is None:
+            return None
+        return CacheEntry(json.loads(row[0]), row[1], row[2])
+
+    def get(self, key: str, ttl: float | None = None) -> CacheEntry | None:
+        """
+        Return the entry for key, or None if missing.
+        If the in-memory copy is older than ttl, disk is checked in case
+        another worker has refreshed it in the meantime. The returned entry
+        may still be stale - callers decide whether to revalidate it.
+        """
+        entry = self._memory.get(key)
+        if entry is not None and (ttl is None or entry.is_fresh(ttl)):
+            return entry
+
+        disk_entry = self._read_disk(key)
+        if disk_entry is not None and (entry is None or disk_entry.fetched_at > entry.fetched_at):
+            with self._lock:
+                self._memory[key] = disk_entry
+            return disk_entry
+        return entry
+
+    def set(self, key: str, payload, etag: str | None = None) -> CacheEntry:
+        """Store a freshly fetched payload in memory and on disk"""
+        entry = CacheEntry(payload, time.time(), etag)
+        with self._lock:
+            self._memory[key] = entry
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, payload, fetched_at, etag)"
+                    " VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(payload), entry.fetched_at, etag),
+                )
+        except (sqlite3.Error, OSError) as e:
+            # Disk problems shouldn't break requests - memory still works
+            print(f"Upstream cache write failed for {key}: {e}")
+        return entry
+
+    def touch(self, key: str) -> CacheEntry | None:
+        """Mark an entry as revalidated (upstream answered 304 Not Modified)"""
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        return self.set(key, entry.payload, entry.etag)
+
+    async def aget(self, key: str, ttl: float | None = None) -> CacheEntry | None:
+        """get() for async code: disk reads run in a worker thread"""
+        entry = self._memory.get(key)
+        if entry is not None and (ttl is None or entry.is_fresh(ttl)):
+            return entry
+        return await asyncio.to_thread(self.get, key, ttl)
+
+    async def aset(self, key: str, payload, etag: str | None = None) -> CacheEntry:
+        """set() for async code: the disk write runs in a worker thread"""
+        return await asyncio.to_thread(self.set, key, payload, etag)
+
+    async def atouch(self, key: str) -> CacheEntry | None:
+        """touch() for async code"""
+        return await asyncio.to_thread(self.touch, key)
+
+    def clear(self):
+        """Drop everything from memory and disk"""
+        with self._lock:
+            self._memory.clear()
+        try:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM responses")
+        except (sqlite3.Error, OSError) as e:
+            print(f"Upstream cache clear failed: {e}")
+
+
+def conditional_headers(headers: dict, entry: CacheEntry | None) -> dict:
+    """Add If-None-Match to the request headers when we hold an ETag"""
+    if entry is None or not entry.etag:
+        return headers
+    return {**headers, "If-None-Match": entry.etag}
+
+
+# Shared instance used by the routers
+cache = UpstreamCache()
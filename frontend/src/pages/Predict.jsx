@@ -118,6 +118,30 @@ function TeamInput({ label, value, onChange, teams }) {
   )
 }
 
+// Transient failures (network errors, 5xx, a 409 while the first attempt is
+// still in flight) are retried this many times
+const SAVE_RETRIES = 2
+
+// Save predictions to the user's history. One Idempotency-Key covers every
+// attempt of this save, so a retry of a save that did go through returns
+// the original response instead of inserting the rows twice.
+async function saveHistory(token, body) {
+  const headers = {
+    Authorization: `Bearer ${token}`,
+    'Idempotency-Key': crypto.randomUUID()
+  }
+  for (let attempt = 0; ; attempt++) {
+    try {
+      return await axios.post(`${API_URL}/api/prediction-history/bulk`, body, { headers })
+    } catch (err) {
+      const status = err.response?.status
+      const transient = !status || status >= 500 || status === 409
+      if (!transient || attempt >= SAVE_RETRIES) throw err
+      await new Promise((resolve) => setTimeout(resolve, 500 * 2 ** attempt))
+    }
+  }
+}
+
 export default function Predict() {
   // User selections
   const [homeTeam, setHomeTeam] = useState('')
@@ -168,16 +192,15 @@ const handlePredict = async () => {
       // Save prediction to history if user is logged in
       if (token) {
         try {
-          await axios.post(`${API_URL}/api/prediction-history/`, null, {
-            params: {
+          await saveHistory(token, {
+            predictions: [{
               home_team: homeTeam,
               away_team: awayTeam,
               predicted_outcome: predRes.data.prediction,
               home_win_prob: predRes.data.probabilities.home_win,
               draw_prob: predRes.data.probabilities.draw,
               away_win_prob: predRes.data.probabilities.away_win
-            },
-            headers: { Authorization: `Bearer ${token}` }
+            }]
           })
         } catch (err) {
           // Silently fail - don't break prediction if history save fails
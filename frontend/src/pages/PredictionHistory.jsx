@@ -8,6 +8,9 @@ export default function PredictionHistory() {
   const [predictions, setPredictions] = useState([])
   const [stats, setStats] = useState({ total: 0, correct: 0, pending: 0, accuracy: 0 })
   const [loading, setLoading] = useState(true)
+  // Cursor for the next page of history (null once everything is loaded)
+  const [nextCursor, setNextCursor] = useState(null)
+  const [loadingMore, setLoadingMore] = useState(false)
   const { token, user } = useStore()
   const navigate = useNavigate()
 
@@ -23,6 +26,7 @@ export default function PredictionHistory() {
       .then(res => {
         setPredictions(res.data.predictions)
         setStats(res.data.stats)
+        setNextCursor(res.data.next_cursor)
         setLoading(false)
       })
       .catch(() => {
@@ -30,6 +34,23 @@ export default function PredictionHistory() {
       })
   }, [token, navigate])
 
+  // Append the next page of older predictions
+  const loadMore = () => {
+    setLoadingMore(true)
+    axios.get(`${API_URL}/api/prediction-history/`, {
+      headers: { Authorization: `Bearer ${token}` },
+      params: { cursor: nextCursor }
+    })
+      .then(res => {
+        setPredictions(prev => [...prev, ...res.data.predictions])
+        setNextCursor(res.data.next_cursor)
+        setLoadingMore(false)
+      })
+      .catch(() => {
+        setLoadingMore(false)
+      })
+  }
+
   const formatDate = (dateStr) => {
     const d = new Date(dateStr)
     return d.toLocaleDateString('en-GB', { day: 'numeric', month: 'short', year: 'numeric' })
@@ -174,6 +195,24 @@ export default function PredictionHistory() {
               </div>
             </div>
           ))}
+
+          {nextCursor && (
+            <button
+              onClick={loadMore}
+              disabled={loadingMore}
+              style={{
+                background: 'transparent',
+                color: '#888',
+                border: '1px solid #2a2a2a',
+                borderRadius: '6px',
+                padding: '0.75rem',
+                fontSize: '0.85rem',
+                cursor: loadingMore ? 'default' : 'pointer'
+              }}
+            >
+              {loadingMore ? 'Loading...' : 'Load more'}
+            </button>
+          )}
         </div>
       )}
     </div>